@@ -0,0 +1,3052 @@
+import globalPluginHandler
+import scriptHandler
+import ui
+import collections
+import datetime
+import json
+import threading
+import time
+import math
+import os
+import config
+import core
+import extensionPoints
+import globalVars
+import addonHandler
+import gui
+import wx
+import logHandler
+try:
+    import tones
+except Exception:
+    tones = None
+from gui.settingsDialogs import SettingsPanel, NVDASettingsDialog
+from . import cache
+from . import cityindex
+from . import diagnostics
+from . import gazetteer
+from . import hijricalendar
+from . import imsakiyah
+from . import itinerary
+from . import locations
+from . import net
+from . import prayertimes
+from . import regions
+from . import schedule
+from . import scheduler
+from . import timezones
+from . import workers
+
+addonHandler.initTranslation()
+log = logHandler.log
+
+# Config
+config.conf.spec["muslimku"] = {
+    "language": "string(default='en')",
+    "country": "string(default='Indonesia')",
+    "city": "string(default='Jakarta')",
+    "province": "string(default='DKI Jakarta')",
+    "regency": "string(default='Jakarta Selatan')"
+}
+
+# Reminder config
+config.conf.spec["muslimku"].update({
+    "reminder_enabled": "boolean(default=True)",
+    "reminder_offset_minutes": "integer(default=0)",
+    "calculation_method": "integer(default=11)",
+    "madhab": "string(default='shafi')"
+})
+
+# Offline calculation config
+config.conf.spec["muslimku"].update({
+    "aladhan_crosscheck": "boolean(default=False)",
+    "hijri_adjustment": "integer(default=0, min=-3, max=3)"
+})
+
+# Indonesian sub-regency location config
+config.conf.spec["muslimku"].update({
+    "district": "string(default='')",
+    "village": "string(default='')",
+    "region_code": "string(default='')"
+})
+
+# Saved locations for announcements and reminders (JSON list, see locations.py)
+config.conf.spec["muslimku"].update({
+    "locations": "string(default='[]')"
+})
+
+# Per-event reminders: remind_<event> turns one on, remind_<event>_offset is
+# how many minutes before it to remind (-1 follows reminder_offset_minutes).
+config.conf.spec["muslimku"].update({
+    "remind_imsak": "boolean(default=False)",
+    "remind_fajr": "boolean(default=True)",
+    "remind_sunrise": "boolean(default=False)",
+    "remind_dhuha": "boolean(default=False)",
+    "remind_dhuhr": "boolean(default=True)",
+    "remind_asr": "boolean(default=True)",
+    "remind_sunset": "boolean(default=False)",
+    "remind_maghrib": "boolean(default=True)",
+    "remind_isha": "boolean(default=True)",
+    "remind_imsak_offset": "integer(default=-1, min=-1, max=120)",
+    "remind_fajr_offset": "integer(default=-1, min=-1, max=120)",
+    "remind_sunrise_offset": "integer(default=-1, min=-1, max=120)",
+    "remind_dhuha_offset": "integer(default=-1, min=-1, max=120)",
+    "remind_dhuhr_offset": "integer(default=-1, min=-1, max=120)",
+    "remind_asr_offset": "integer(default=-1, min=-1, max=120)",
+    "remind_sunset_offset": "integer(default=-1, min=-1, max=120)",
+    "remind_maghrib_offset": "integer(default=-1, min=-1, max=120)",
+    "remind_isha_offset": "integer(default=-1, min=-1, max=120)"
+})
+
+# Reminders missed while the computer slept or its clock jumped: announce
+# them late ("was due at") or skip them.
+config.conf.spec["muslimku"].update({
+    "announce_missed_reminders": "boolean(default=True)"
+})
+
+# Travel itinerary (JSON list of dated legs, see itinerary.py)
+config.conf.spec["muslimku"].update({
+    "itinerary": "string(default='[]')"
+})
+
+CALC_METHODS = {
+    # key: Aladhan method id
+    "Jafari / Ithna Ashari": 0,
+    "Karachi": 1,
+    "ISNA": 2,
+    "MWL": 3,
+    "Umm Al-Qura": 4,
+    "Egyptian": 5,
+    "Tehran": 7,
+    "Gulf": 8,
+    "Kuwait": 9,
+    "Qatar": 10,
+    "Singapore": 11,
+    "Turkey": 13,
+    "Kemenag RI": 20,
+    "Muhammadiyah": 99,
+}
+MUHAMMADIYAH_METHOD_SETTINGS = "18,0,18"
+MADHAB_MAP = {
+    "Shafi": "shafi",
+    "Hanafi": "hanafi",
+}
+FIXED_PRAYER_OFFSETS = {
+    "Fajr": 0,
+    "Dhuhr": 0,
+    "Asr": 0,
+    "Maghrib": 0,
+    "Isha": 0,
+}
+
+# Category label for Input Gestures (localized if needed)
+UI_GESTURE_CATEGORY = "Muslimku"
+try:
+    if config.conf["muslimku"].get("language", "en") == "id":
+        UI_GESTURE_CATEGORY = "Muslimku"
+    else:
+        UI_GESTURE_CATEGORY = "Muslimku"
+except Exception:
+    UI_GESTURE_CATEGORY = "Muslimku"
+
+# Localized descriptions for Input Gestures
+_ui_lang = config.conf.get("muslimku", {}).get("language", "en")
+if _ui_lang == "id":
+    GESTURE_DESC = {
+        "fajr": "Umumkan waktu Subuh",
+        "dhuhr": "Umumkan waktu Dzuhur",
+        "asr": "Umumkan waktu Ashar",
+        "maghrib": "Umumkan waktu Maghrib",
+        "isha": "Umumkan waktu Isya",
+        "imsak": "Umumkan waktu Imsak",
+        "sunrise": "Umumkan waktu Terbit Fajar",
+        "dhuha": "Umumkan waktu Dhuha",
+        "sunset": "Umumkan waktu Matahari terbenam",
+        "hari": "Umumkan hari dan tanggal",
+        "next_prayer": "Umumkan waktu solat berikutnya",
+        "location": "Umumkan lokasi saat ini",
+        "qibla": "Periksa arah kiblat",
+        "diagnostics": "Tulis laporan diagnostik Muslimku",
+        "next_location": "Pindah ke lokasi tersimpan berikutnya",
+        "previous_location": "Pindah ke lokasi tersimpan sebelumnya",
+        "imsakiyah": "Tampilkan jadwal Imsakiyah sebulan"
+    }
+else:
+    GESTURE_DESC = {
+        "fajr": "Announce Fajr time",
+        "dhuhr": "Announce Dhuhr time",
+        "asr": "Announce Asr time",
+        "maghrib": "Announce Maghrib time",
+        "isha": "Announce Isha time",
+        "imsak": "Announce Imsak time",
+        "sunrise": "Announce Sunrise time",
+        "dhuha": "Announce Dhuha time",
+        "sunset": "Announce Sunset time",
+        "hari": "Announce Hijri and Gregorian date",
+        "next_prayer": "Announce next prayer time",
+        "location": "Announce current location",
+        "qibla": "Check Qibla direction",
+        "diagnostics": "Write Muslimku diagnostics report",
+        "next_location": "Switch to the next saved location",
+        "previous_location": "Switch to the previous saved location",
+        "imsakiyah": "Show the month's Imsakiyah timetable"
+    }
+
+# Daftar negara (cukup umum dan stabil)
+COUNTRIES = [
+    "Afghanistan", "Albania", "Algeria", "Argentina",
+    "Australia", "Austria", "Bangladesh", "Belgium",
+    "Brazil", "Brunei", "Canada", "China",
+    "Egypt", "France", "Germany", "India",
+    "Indonesia", "Italy", "Japan", "Malaysia",
+    "Netherlands", "Pakistan", "Saudi Arabia",
+    "Singapore", "South Africa", "Thailand",
+    "Turkey", "United Kingdom", "United States"
+]
+INDONESIA_COUNTRY = "Indonesia"
+# Paths under net.service_url("emsifa").
+INDONESIA_PROVINCES_PATH = "/api/provinces.json"
+INDONESIA_REGENCIES_PATH = "/api/regencies/{}.json"
+INDONESIA_DISTRICTS_PATH = "/api/districts/{}.json"
+INDONESIA_VILLAGES_PATH = "/api/villages/{}.json"
+
+# Names of the events reminders can be set for.
+REMINDER_EVENT_LABELS = {
+    "Imsak": {"id": "Imsak", "en": "Imsak"},
+    "Fajr": {"id": "Subuh", "en": "Fajr"},
+    "Sunrise": {"id": "Terbit Fajar", "en": "Sunrise"},
+    "Dhuha": {"id": "Dhuha", "en": "Dhuha"},
+    "Dhuhr": {"id": "Dzuhur", "en": "Dhuhr"},
+    "Asr": {"id": "Ashar", "en": "Asr"},
+    "Sunset": {"id": "Matahari terbenam", "en": "Sunset"},
+    "Maghrib": {"id": "Maghrib", "en": "Maghrib"},
+    "Isha": {"id": "Isya", "en": "Isha"},
+}
+
+# Reminders are queued this far ahead, across today and the pre-warmed tomorrow.
+REMINDER_HORIZON_SECONDS = 48 * 3600
+
+# Most recent offline day payloads kept in memory, across all locations.
+LOCAL_PAYLOAD_MEMO_SIZE = 32
+
+# Month timetables (NVDA+control+shift+m) kept in memory, per location profile.
+IMSAKIYAH_MEMO_SIZE = 4
+
+# Written to the muslimku folder of the NVDA configuration by NVDA+control+shift+i.
+DIAGNOSTICS_FILE = "diagnostics.json"
+
+# Today's timings for one location profile, valid until the next local midnight.
+# Replaced as a whole, never mutated, so scripts can read it without locking.
+# Kept per profile: locations that share city, method and madhab share one.
+# next_day is the following day's snapshot once pre-warmed in the background;
+# it takes over at midnight without any work on the calling thread.
+TodaySnapshot = collections.namedtuple(
+    "TodaySnapshot", ("profile", "expires_ts", "payload", "schedule", "next_day"), defaults=(None,)
+)
+
+# Notified after the settings panel saves, so reminders can be re-armed.
+settingsChanged = extensionPoints.Action()
+
+# Persistent cache shared by the plugin and the settings panel.
+_cache_store = None
+_cache_store_lock = threading.Lock()
+# Set once terminate closes the store, so late workers cannot reopen it.
+_cache_store_closed = False
+
+
+def _get_cache_store():
+    global _cache_store
+    with _cache_store_lock:
+        if _cache_store_closed:
+            raise RuntimeError("Cache store is closed")
+        if _cache_store is None:
+            path = None
+            try:
+                path = os.path.join(globalVars.appArgs.configPath, "muslimku", "cache.sqlite3")
+            except Exception:
+                path = None
+            _cache_store = cache.PersistentCache(path)
+            if path and not _cache_store.persistent:
+                try:
+                    log.debugWarning("Muslimku: persistent cache unavailable, using memory only.")
+                except Exception:
+                    pass
+        return _cache_store
+
+
+def _run_in_background(fn, *args, key=None):
+    # Queues fn on the shared worker pool; a newer call with the same key
+    # replaces one that has not started yet. Returns False when rejected.
+    try:
+        workers.submit(fn, *args, key=key)
+        return True
+    except Exception:
+        try:
+            log.debugWarning("Muslimku: background task rejected.", exc_info=True)
+        except Exception:
+            pass
+        return False
+
+
+def _fetch_region_list(store_key, url):
+    items = net.get_json(url, timeout=6)
+    if not isinstance(items, list):
+        items = []
+    if items:
+        _get_cache_store().set("regions", store_key, items)
+    return items
+
+
+def _load_region_list(store_key, url):
+    # Returns (items, stale). Stale lists are served as-is; the caller then
+    # refreshes them with _refresh_region_list once the UI has been filled.
+    items, state = _get_cache_store().lookup("regions", store_key)
+    if items and state != cache.MISS:
+        return items, state == cache.STALE
+    return _fetch_region_list(store_key, url), False
+
+
+def _refresh_region_list(store_key, url):
+    try:
+        return _fetch_region_list(store_key, url)
+    except Exception:
+        try:
+            log.debugWarning("Muslimku: background refresh of %s failed." % store_key, exc_info=True)
+        except Exception:
+            pass
+        return None
+
+
+def _open_cache_store():
+    # Allows _get_cache_store to open the store again (plugin start).
+    global _cache_store_closed
+    with _cache_store_lock:
+        _cache_store_closed = False
+
+
+def _close_cache_store():
+    global _cache_store, _cache_store_closed
+    with _cache_store_lock:
+        _cache_store_closed = True
+        if _cache_store is not None:
+            _cache_store.close()
+            _cache_store = None
+
+class MuslimkuSettingsPanel(SettingsPanel):
+    title = "Muslimku"
+    _idnProvincesCache = None
+    _idnRegenciesCache = {}
+
+    @diagnostics.timed("panel.makeSettings")
+    def makeSettings(self, settingsSizer):
+        sHelper = gui.guiHelper.BoxSizerHelper(self, sizer=settingsSizer)
+
+        self.languageMap = {
+            "Indonesia": "id",
+            "English": "en"
+        }
+        self._provinceMap = {}
+        self._regencyMap = {}
+        self._panelClosed = False
+        self._provinceLoadToken = 0
+        self._regencyLoadToken = 0
+        self._fineLoadTokens = {"district": 0, "village": 0}
+        self._fineMaps = {"district": {}, "village": {}}
+        self._globalCitiesLoadToken = 0
+        self._globalCities = None
+        self.Bind(wx.EVT_WINDOW_DESTROY, self._onWindowDestroy)
+
+        ui_lang = config.conf["muslimku"].get("language", "en")
+        self._labels = {
+            "panel_title": {"id": "Pengaturan Muslimku", "en": "Muslimku Settings"},
+            "language": {"id": "Bahasa:", "en": "Language:"},
+            "country": {"id": "Negara:", "en": "Country:"},
+            "province": {"id": "Provinsi:", "en": "Province:"},
+            "regency": {"id": "Kota/Kabupaten:", "en": "City/Regency:"},
+            "city": {"id": "Kota:", "en": "City:"},
+            "city_search": {"id": "Cari kota:", "en": "Search city:"},
+            "district": {"id": "Kecamatan:", "en": "District:"},
+            "village": {"id": "Kelurahan/Desa:", "en": "Village:"},
+            "not_selected": {"id": "(Tidak dipilih)", "en": "(Not selected)"},
+            "calc_method": {"id": "Metode perhitungan:", "en": "Calculation method:"},
+            "madhab": {"id": "Madhab Ashar:", "en": "Asr madhab:"},
+            "enable_reminders": {"id": "Aktifkan pengingat:", "en": "Enable reminders:"},
+            "offset": {"id": "Ingatkan saya (menit) sebelum waktu solat:", "en": "Reminder offset (minutes):"},
+            "reminder_events": {"id": "Ingatkan saya untuk:", "en": "Remind me of:"},
+            "announce_missed": {
+                "id": "Umumkan pengingat yang terlewat saat komputer tidur:",
+                "en": "Announce reminders missed while the computer slept:"
+            },
+            "event_offset": {
+                "id": "Menit sebelum {name} (-1 = sama dengan di atas):",
+                "en": "Minutes before {name} (-1 = same as above):"
+            },
+            "crosscheck": {"id": "Periksa silang dengan Aladhan (daring):", "en": "Cross-check with Aladhan (online):"},
+            "hijri_adjustment": {"id": "Penyesuaian tanggal Hijriyah (hari):", "en": "Hijri date adjustment (days):"},
+            "saved_locations": {
+                "id": "Lokasi tersimpan (dicentang: dengan pengingat):",
+                "en": "Saved locations (checked: with reminders):"
+            },
+            "location_name": {"id": "Nama untuk lokasi di atas:", "en": "Name for the location above:"},
+            "add_location": {"id": "Simpan lokasi di atas", "en": "Save the location above"},
+            "remove_location": {"id": "Hapus lokasi terpilih", "en": "Remove selected location"},
+            "itinerary": {"id": "Rencana perjalanan:", "en": "Travel itinerary:"},
+            "leg_start": {"id": "Dari tanggal (TTTT-BB-HH):", "en": "From date (YYYY-MM-DD):"},
+            "leg_end": {"id": "Sampai tanggal (TTTT-BB-HH):", "en": "To date (YYYY-MM-DD):"},
+            "add_leg": {"id": "Tambahkan lokasi di atas ke rencana perjalanan", "en": "Add the location above to the itinerary"},
+            "remove_leg": {"id": "Hapus perjalanan terpilih", "en": "Remove selected itinerary leg"},
+            "leg_invalid": {
+                "id": "Tanggal tidak valid. Gunakan format TTTT-BB-HH, dan tanggal akhir tidak sebelum tanggal awal.",
+                "en": "Invalid dates. Use YYYY-MM-DD, with the end date not before the start date."
+            },
+            "itinerary_full": {
+                "id": f"Paling banyak {itinerary.MAX_LEGS} perjalanan.",
+                "en": f"At most {itinerary.MAX_LEGS} itinerary legs."
+            },
+            "locations_full": {
+                "id": f"Paling banyak {locations.MAX_LOCATIONS} lokasi tersimpan.",
+                "en": f"At most {locations.MAX_LOCATIONS} saved locations."
+            },
+            "province_load_failed": {
+                "id": "Gagal memuat daftar provinsi/kabupaten. Gunakan kolom Kota.",
+                "en": "Failed to load province/regency list. Please use the City field."
+            },
+            "city_load_failed": {
+                "id": "Daftar kota untuk negara ini tidak tersedia. Ketik nama kota di kolom Kota.",
+                "en": "City list for this country is unavailable. Please type the city name in the City field."
+            },
+        }
+
+        try:
+            self.title = self._labels["panel_title"].get(ui_lang, "Muslimku")
+        except Exception:
+            self.title = "Muslimku"
+
+        self.languageChoice = sHelper.addLabeledControl(
+            self._labels["language"].get(ui_lang, "Language:"),
+            wx.Choice,
+            choices=list(self.languageMap.keys())
+        )
+        currentLang = config.conf["muslimku"]["language"]
+        for label, code in self.languageMap.items():
+            if code == currentLang:
+                self.languageChoice.SetStringSelection(label)
+                break
+
+        self.countryChoice = sHelper.addLabeledControl(
+            self._labels["country"].get(ui_lang, "Country:"),
+            wx.Choice,
+            choices=COUNTRIES
+        )
+        currentCountry = config.conf["muslimku"]["country"]
+        if currentCountry in COUNTRIES:
+            self.countryChoice.SetStringSelection(currentCountry)
+        else:
+            self.countryChoice.SetStringSelection(INDONESIA_COUNTRY)
+        self.countryChoice.Bind(wx.EVT_CHOICE, self._onCountryChanged)
+
+        self.provinceChoice = sHelper.addLabeledControl(
+            self._labels["province"].get(ui_lang, "Province:"),
+            wx.Choice,
+            choices=[]
+        )
+        self.provinceChoice.Bind(wx.EVT_CHOICE, self._onProvinceChanged)
+
+        self.regencyChoice = sHelper.addLabeledControl(
+            self._labels["regency"].get(ui_lang, "City/Regency:"),
+            wx.Choice,
+            choices=[]
+        )
+        self.regencyChoice.Bind(wx.EVT_CHOICE, self._onRegencyChanged)
+
+        self.districtChoice = sHelper.addLabeledControl(
+            self._labels["district"].get(ui_lang, "District:"),
+            wx.Choice,
+            choices=[]
+        )
+        self.districtChoice.Bind(wx.EVT_CHOICE, self._onDistrictChanged)
+
+        self.villageChoice = sHelper.addLabeledControl(
+            self._labels["village"].get(ui_lang, "Village:"),
+            wx.Choice,
+            choices=[]
+        )
+
+        self.citySearchEdit = sHelper.addLabeledControl(
+            self._labels["city_search"].get(ui_lang, "Search city:"),
+            wx.TextCtrl
+        )
+        self.citySearchEdit.Bind(wx.EVT_TEXT, self._onCitySearch)
+
+        self.cityChoice = sHelper.addLabeledControl(
+            self._labels["city"].get(ui_lang, "City:"),
+            wx.Choice,
+            choices=[]
+        )
+
+        self.cityEdit = sHelper.addLabeledControl(
+            self._labels["city"].get(ui_lang, "City:"),
+            wx.TextCtrl
+        )
+        self.cityEdit.SetValue(config.conf["muslimku"].get("city", "Jakarta"))
+
+        self.calcMethodChoice = sHelper.addLabeledControl(
+            self._labels["calc_method"].get(ui_lang, "Calculation method:"),
+            wx.Choice,
+            choices=list(CALC_METHODS.keys())
+        )
+        current_method = int(config.conf["muslimku"].get("calculation_method", 11))
+        selected_method_label = None
+        for lbl, val in CALC_METHODS.items():
+            if int(val) == current_method:
+                selected_method_label = lbl
+                break
+        if selected_method_label:
+            self.calcMethodChoice.SetStringSelection(selected_method_label)
+        else:
+            self.calcMethodChoice.SetStringSelection("Singapore")
+
+        self.madhabChoice = sHelper.addLabeledControl(
+            self._labels["madhab"].get(ui_lang, "Asr madhab:"),
+            wx.Choice,
+            choices=list(MADHAB_MAP.keys())
+        )
+        saved_madhab = str(config.conf["muslimku"].get("madhab", "shafi")).lower()
+        selected_madhab_label = "Shafi" if saved_madhab != "hanafi" else "Hanafi"
+        self.madhabChoice.SetStringSelection(selected_madhab_label)
+
+        enable_label = self._labels["enable_reminders"].get(ui_lang, "Enable reminders:")
+        self.reminderCheck = sHelper.addLabeledControl(enable_label, wx.CheckBox)
+        try:
+            self.reminderCheck.SetLabel(enable_label)
+            self.reminderCheck.SetName(enable_label)
+            try:
+                self.reminderCheck.SetToolTip(enable_label)
+            except Exception:
+                pass
+        except Exception:
+            pass
+        try:
+            self.reminderCheck.SetValue(bool(config.conf["muslimku"]["reminder_enabled"]))
+        except Exception:
+            self.reminderCheck.SetValue(True)
+
+        self.offsetSpin = sHelper.addLabeledControl(
+            self._labels["offset"].get(ui_lang, "Reminder offset (minutes):"),
+            wx.SpinCtrl
+        )
+        self.offsetSpin.SetRange(0, 120)
+        try:
+            self.offsetSpin.SetValue(int(config.conf["muslimku"]["reminder_offset_minutes"]))
+        except Exception:
+            self.offsetSpin.SetValue(0)
+
+        # Which events to remind of, each with its own offset.
+        self.reminderEventsList = sHelper.addLabeledControl(
+            self._labels["reminder_events"].get(ui_lang, "Remind me of:"),
+            wx.CheckListBox,
+            choices=[REMINDER_EVENT_LABELS[name].get(ui_lang, name) for name in schedule.REMINDER_EVENTS]
+        )
+        self.eventOffsetSpins = {}
+        for i, name in enumerate(schedule.REMINDER_EVENTS):
+            key = f"remind_{name.lower()}"
+            try:
+                self.reminderEventsList.Check(i, bool(config.conf["muslimku"][key]))
+            except Exception:
+                self.reminderEventsList.Check(i, name in schedule.PRAYERS)
+            spin = sHelper.addLabeledControl(
+                self._labels["event_offset"].get(ui_lang, "Minutes before {name}:").format(
+                    name=REMINDER_EVENT_LABELS[name].get(ui_lang, name)
+                ),
+                wx.SpinCtrl
+            )
+            spin.SetRange(-1, 120)
+            try:
+                spin.SetValue(int(config.conf["muslimku"][f"{key}_offset"]))
+            except Exception:
+                spin.SetValue(-1)
+            self.eventOffsetSpins[name] = spin
+
+        missed_label = self._labels["announce_missed"].get(ui_lang, "Announce missed reminders:")
+        self.announceMissedCheck = sHelper.addLabeledControl(missed_label, wx.CheckBox)
+        try:
+            self.announceMissedCheck.SetLabel(missed_label)
+            self.announceMissedCheck.SetName(missed_label)
+        except Exception:
+            pass
+        try:
+            self.announceMissedCheck.SetValue(bool(config.conf["muslimku"]["announce_missed_reminders"]))
+        except Exception:
+            self.announceMissedCheck.SetValue(True)
+
+        self.hijriAdjustSpin = sHelper.addLabeledControl(
+            self._labels["hijri_adjustment"].get(ui_lang, "Hijri date adjustment (days):"),
+            wx.SpinCtrl
+        )
+        self.hijriAdjustSpin.SetRange(-3, 3)
+        try:
+            self.hijriAdjustSpin.SetValue(int(config.conf["muslimku"]["hijri_adjustment"]))
+        except Exception:
+            self.hijriAdjustSpin.SetValue(0)
+
+        crosscheck_label = self._labels["crosscheck"].get(ui_lang, "Cross-check with Aladhan (online):")
+        self.crosscheckCheck = sHelper.addLabeledControl(crosscheck_label, wx.CheckBox)
+        try:
+            self.crosscheckCheck.SetLabel(crosscheck_label)
+            self.crosscheckCheck.SetName(crosscheck_label)
+        except Exception:
+            pass
+        try:
+            self.crosscheckCheck.SetValue(bool(config.conf["muslimku"]["aladhan_crosscheck"]))
+        except Exception:
+            self.crosscheckCheck.SetValue(False)
+
+        # Further locations, each with the method and madhab chosen when saved.
+        try:
+            self._savedLocations = locations.parse(config.conf["muslimku"].get("locations", "[]"))
+        except Exception:
+            self._savedLocations = []
+        self.savedLocationsList = sHelper.addLabeledControl(
+            self._labels["saved_locations"].get(ui_lang, "Saved locations (checked: with reminders):"),
+            wx.CheckListBox,
+            choices=[]
+        )
+        self.locationNameEdit = sHelper.addLabeledControl(
+            self._labels["location_name"].get(ui_lang, "Name for the location above:"),
+            wx.TextCtrl
+        )
+        self.addLocationButton = sHelper.addItem(
+            wx.Button(self, label=self._labels["add_location"].get(ui_lang, "Save the location above"))
+        )
+        self.addLocationButton.Bind(wx.EVT_BUTTON, self._onAddLocation)
+        self.removeLocationButton = sHelper.addItem(
+            wx.Button(self, label=self._labels["remove_location"].get(ui_lang, "Remove selected location"))
+        )
+        self.removeLocationButton.Bind(wx.EVT_BUTTON, self._onRemoveLocation)
+        self._refreshSavedLocations()
+
+        # Itinerary legs replace the location above on their dates.
+        try:
+            self._itineraryLegs = itinerary.parse(config.conf["muslimku"].get("itinerary", "[]"))
+        except Exception:
+            self._itineraryLegs = []
+        self.itineraryList = sHelper.addLabeledControl(
+            self._labels["itinerary"].get(ui_lang, "Travel itinerary:"),
+            wx.ListBox,
+            choices=[]
+        )
+        today = datetime.date.today().isoformat()
+        self.legStartEdit = sHelper.addLabeledControl(
+            self._labels["leg_start"].get(ui_lang, "From date (YYYY-MM-DD):"),
+            wx.TextCtrl
+        )
+        self.legStartEdit.SetValue(today)
+        self.legEndEdit = sHelper.addLabeledControl(
+            self._labels["leg_end"].get(ui_lang, "To date (YYYY-MM-DD):"),
+            wx.TextCtrl
+        )
+        self.legEndEdit.SetValue(today)
+        self.addLegButton = sHelper.addItem(
+            wx.Button(self, label=self._labels["add_leg"].get(ui_lang, "Add the location above to the itinerary"))
+        )
+        self.addLegButton.Bind(wx.EVT_BUTTON, self._onAddLeg)
+        self.removeLegButton = sHelper.addItem(
+            wx.Button(self, label=self._labels["remove_leg"].get(ui_lang, "Remove selected itinerary leg"))
+        )
+        self.removeLegButton.Bind(wx.EVT_BUTTON, self._onRemoveLeg)
+        self._refreshItinerary()
+
+        self._syncLocationControls(initial=True)
+
+    @diagnostics.timed("panel.onSave")
+    def onSave(self):
+        try:
+            selectedLabel = self.languageChoice.GetStringSelection()
+            config.conf["muslimku"]["language"] = self.languageMap.get(selectedLabel, "en")
+            loc = self._collectLocation()
+            for field in ("country", "city", "province", "regency", "district", "village", "region_code"):
+                config.conf["muslimku"][field] = getattr(loc, field)
+            try:
+                config.conf["muslimku"]["reminder_enabled"] = bool(self.reminderCheck.GetValue())
+            except Exception:
+                config.conf["muslimku"]["reminder_enabled"] = True
+            try:
+                config.conf["muslimku"]["reminder_offset_minutes"] = int(self.offsetSpin.GetValue())
+            except Exception:
+                config.conf["muslimku"]["reminder_offset_minutes"] = 0
+            for i, name in enumerate(schedule.REMINDER_EVENTS):
+                key = f"remind_{name.lower()}"
+                try:
+                    config.conf["muslimku"][key] = bool(self.reminderEventsList.IsChecked(i))
+                    config.conf["muslimku"][f"{key}_offset"] = int(self.eventOffsetSpins[name].GetValue())
+                except Exception:
+                    pass
+            try:
+                config.conf["muslimku"]["announce_missed_reminders"] = bool(self.announceMissedCheck.GetValue())
+            except Exception:
+                config.conf["muslimku"]["announce_missed_reminders"] = True
+            try:
+                method_label = self.calcMethodChoice.GetStringSelection()
+                config.conf["muslimku"]["calculation_method"] = int(CALC_METHODS.get(method_label, 11))
+            except Exception:
+                config.conf["muslimku"]["calculation_method"] = 11
+            try:
+                madhab_label = self.madhabChoice.GetStringSelection()
+                config.conf["muslimku"]["madhab"] = MADHAB_MAP.get(madhab_label, "shafi")
+            except Exception:
+                config.conf["muslimku"]["madhab"] = "shafi"
+            try:
+                config.conf["muslimku"]["hijri_adjustment"] = int(self.hijriAdjustSpin.GetValue())
+            except Exception:
+                config.conf["muslimku"]["hijri_adjustment"] = 0
+            try:
+                config.conf["muslimku"]["aladhan_crosscheck"] = bool(self.crosscheckCheck.GetValue())
+            except Exception:
+                config.conf["muslimku"]["aladhan_crosscheck"] = False
+            try:
+                config.conf["muslimku"]["locations"] = locations.dump(self._checkedSavedLocations())
+            except Exception:
+                log.exception("Muslimku: failed to save the location list.")
+            try:
+                config.conf["muslimku"]["itinerary"] = itinerary.dump(self._itineraryLegs)
+            except Exception:
+                log.exception("Muslimku: failed to save the itinerary.")
+        except Exception as e:
+            try:
+                ui.message("Failed to save Muslimku settings.")
+            except Exception:
+                pass
+            return False
+        try:
+            settingsChanged.notify()
+        except Exception:
+            log.exception("Muslimku: failed to notify settings change.")
+        # indicate success so the settings dialog may close
+        return True
+
+    def _collectLocation(self, name=""):
+        # The location described by the form's current selections.
+        selectedCountry = self.countryChoice.GetStringSelection()
+        fields = {"province": "", "regency": "", "district": "", "village": "", "region_code": ""}
+        provinceSelection = self.provinceChoice.GetStringSelection()
+        regencySelection = self.regencyChoice.GetStringSelection()
+        if selectedCountry == INDONESIA_COUNTRY and provinceSelection and regencySelection:
+            city = self._normalizeIndonesiaCityName(regencySelection)
+            district = self.districtChoice.GetStringSelection()
+            district_id = self._fineMaps["district"].get(district, "")
+            village = self.villageChoice.GetStringSelection()
+            village_id = self._fineMaps["village"].get(village, "") if district_id else ""
+            fields.update({
+                "province": provinceSelection,
+                "regency": regencySelection,
+                "district": district if district_id else "",
+                "village": village if village_id else "",
+                "region_code": str(village_id or district_id or self._regencyMap.get(regencySelection, "") or ""),
+            })
+        else:
+            if self.cityEdit.IsShown():
+                city = self.cityEdit.GetValue().strip()
+            else:
+                city = self.cityChoice.GetStringSelection().strip()
+            city = city or config.conf["muslimku"].get("city", "Jakarta")
+        try:
+            method = int(CALC_METHODS.get(self.calcMethodChoice.GetStringSelection(), 11))
+        except Exception:
+            method = 11
+        try:
+            madhab = MADHAB_MAP.get(self.madhabChoice.GetStringSelection(), "shafi")
+        except Exception:
+            madhab = "shafi"
+        return locations.make_location(
+            name=name, country=selectedCountry, city=city, method=method, madhab=madhab, **fields
+        )
+
+    def _refreshSavedLocations(self):
+        self.savedLocationsList.Set([locations.describe(loc) for loc in self._savedLocations])
+        for i, loc in enumerate(self._savedLocations):
+            self.savedLocationsList.Check(i, loc.reminders)
+
+    def _checkedSavedLocations(self):
+        # Reminder flags follow the check boxes.
+        return [
+            loc._replace(reminders=bool(self.savedLocationsList.IsChecked(i)))
+            for i, loc in enumerate(self._savedLocations)
+        ]
+
+    def _onAddLocation(self, evt):
+        ui_lang = config.conf["muslimku"].get("language", "en")
+        if len(self._savedLocations) >= locations.MAX_LOCATIONS:
+            ui.message(self._labels["locations_full"].get(ui_lang, ""))
+            return
+        loc = self._collectLocation(self.locationNameEdit.GetValue())
+        if not loc.city or not loc.country:
+            return
+        self._savedLocations = [
+            other for other in self._checkedSavedLocations() if not locations.same_place(other, loc)
+        ] + [loc]
+        self._refreshSavedLocations()
+        self.locationNameEdit.SetValue("")
+        self.savedLocationsList.SetSelection(len(self._savedLocations) - 1)
+
+    def _onRemoveLocation(self, evt):
+        index = self.savedLocationsList.GetSelection()
+        if index == wx.NOT_FOUND:
+            return
+        saved = self._checkedSavedLocations()
+        del saved[index]
+        self._savedLocations = saved
+        self._refreshSavedLocations()
+        if saved:
+            self.savedLocationsList.SetSelection(min(index, len(saved) - 1))
+
+    def _refreshItinerary(self):
+        self.itineraryList.Set([itinerary.describe(leg) for leg in self._itineraryLegs])
+
+    def _onAddLeg(self, evt):
+        ui_lang = config.conf["muslimku"].get("language", "en")
+        if len(self._itineraryLegs) >= itinerary.MAX_LEGS:
+            ui.message(self._labels["itinerary_full"].get(ui_lang, ""))
+            return
+        leg = itinerary.make_leg(
+            self.legStartEdit.GetValue(),
+            self.legEndEdit.GetValue(),
+            self._collectLocation(self.locationNameEdit.GetValue())
+        )
+        if leg is None or not leg.location.city:
+            ui.message(self._labels["leg_invalid"].get(ui_lang, ""))
+            return
+        self._itineraryLegs = sorted(self._itineraryLegs + [leg], key=lambda item: (item.start, item.end))
+        self._refreshItinerary()
+        self.itineraryList.SetSelection(self._itineraryLegs.index(leg))
+
+    def _onRemoveLeg(self, evt):
+        index = self.itineraryList.GetSelection()
+        if index == wx.NOT_FOUND:
+            return
+        del self._itineraryLegs[index]
+        self._refreshItinerary()
+        if self._itineraryLegs:
+            self.itineraryList.SetSelection(min(index, len(self._itineraryLegs) - 1))
+
+    @diagnostics.timed("panel.onCountryChanged")
+    def _onCountryChanged(self, evt):
+        self._syncLocationControls(initial=False)
+        evt.Skip()
+
+    @diagnostics.timed("panel.onProvinceChanged")
+    def _onProvinceChanged(self, evt):
+        self._startRegenciesLoad(initial=False)
+        evt.Skip()
+
+    @diagnostics.timed("panel.onRegencyChanged")
+    def _onRegencyChanged(self, evt):
+        self._startFineRegionLoad("district", initial=False)
+        evt.Skip()
+
+    @diagnostics.timed("panel.onDistrictChanged")
+    def _onDistrictChanged(self, evt):
+        self._startFineRegionLoad("village", initial=False)
+        evt.Skip()
+
+    def _syncLocationControls(self, initial=False):
+        is_indonesia = (self.countryChoice.GetStringSelection() == INDONESIA_COUNTRY)
+        self.provinceChoice.Show(is_indonesia)
+        self.regencyChoice.Show(is_indonesia)
+        self.districtChoice.Show(is_indonesia)
+        self.villageChoice.Show(is_indonesia)
+        self.provinceChoice.Enable(False)
+        self.regencyChoice.Enable(False)
+        self.districtChoice.Enable(False)
+        self.villageChoice.Enable(False)
+        self.citySearchEdit.Show(not is_indonesia)
+        self.cityChoice.Show(not is_indonesia)
+        self.cityChoice.Enable(False)
+        self.cityEdit.Show(False)
+        self.cityEdit.Enable(False)
+        if is_indonesia:
+            self._startProvincesLoad(initial=initial)
+        else:
+            self._startGlobalCitiesLoad(initial=initial)
+        self.Layout()
+        if self.Parent:
+            self.Parent.Layout()
+
+    def _onWindowDestroy(self, evt):
+        self._panelClosed = True
+        evt.Skip()
+
+    def _setChoiceLoading(self, choiceCtrl, loadingText):
+        try:
+            choiceCtrl.SetItems([loadingText])
+            choiceCtrl.SetSelection(0)
+            choiceCtrl.Enable(False)
+        except Exception:
+            pass
+
+    def _bundledRegionItems(self, parent_id=None):
+        # Items from the bundled regions dataset, or None when it is not shipped.
+        try:
+            store = regions.get_region_store()
+        except Exception:
+            store = None
+        if store is None:
+            return None
+        return [{"id": r.id, "name": r.name} for r in store.children(parent_id)]
+
+    def _startProvincesLoad(self, initial=False):
+        self._provinceLoadToken += 1
+        token = self._provinceLoadToken
+        bundled = self._bundledRegionItems()
+        if bundled:
+            self._applyProvincesLoad(token, initial, bundled)
+            return
+        self._setChoiceLoading(self.provinceChoice, "Loading provinces...")
+        self._setChoiceLoading(self.regencyChoice, "Loading city/regency...")
+
+        def worker():
+            try:
+                provinces = MuslimkuSettingsPanel._idnProvincesCache
+                stale = False
+                if not provinces:
+                    provinces, stale = _load_region_list("idn:provinces", net.service_url("emsifa", INDONESIA_PROVINCES_PATH))
+                    MuslimkuSettingsPanel._idnProvincesCache = provinces
+                wx.CallAfter(self._applyProvincesLoad, token, initial, provinces)
+            except Exception:
+                wx.CallAfter(self._applyProvincesLoad, token, initial, None)
+                return
+            if stale:
+                fresh = _refresh_region_list("idn:provinces", net.service_url("emsifa", INDONESIA_PROVINCES_PATH))
+                if fresh:
+                    MuslimkuSettingsPanel._idnProvincesCache = fresh
+                    wx.CallAfter(self._applyRefreshedRegions, "province", token, fresh)
+
+        if not _run_in_background(worker, key="panel:provinces"):
+            self._applyProvincesLoad(token, initial, None)
+
+    @diagnostics.timed("panel.applyProvincesLoad")
+    def _applyProvincesLoad(self, token, initial, provinces):
+        if self._panelClosed or token != self._provinceLoadToken:
+            return
+        if not provinces:
+            try:
+                self.provinceChoice.Show(False)
+                self.regencyChoice.Show(False)
+                self.districtChoice.Show(False)
+                self.villageChoice.Show(False)
+                self.cityChoice.Show(False)
+                self.citySearchEdit.Show(False)
+                self.cityEdit.Show(True)
+                self.cityEdit.Enable(True)
+                self.Layout()
+                if self.Parent:
+                    self.Parent.Layout()
+                ui_lang = config.conf["muslimku"].get("language", "en")
+                ui.message(self._labels["province_load_failed"].get(ui_lang, "Failed to load province/regency list. Please use the City field."))
+            except Exception:
+                pass
+            return
+
+        self._provinceMap = {p.get("name", ""): p.get("id", "") for p in provinces if p.get("name") and p.get("id")}
+        province_names = list(self._provinceMap.keys())
+        self.provinceChoice.SetItems(province_names)
+        saved_province = config.conf["muslimku"].get("province", "")
+        if initial and saved_province in self._provinceMap:
+            self.provinceChoice.SetStringSelection(saved_province)
+        elif province_names:
+            self.provinceChoice.SetSelection(0)
+        self.provinceChoice.Enable(bool(province_names))
+        self._startRegenciesLoad(initial=initial)
+
+    def _startRegenciesLoad(self, initial=False):
+        province_name = self.provinceChoice.GetStringSelection()
+        province_id = self._provinceMap.get(province_name)
+        if not province_id:
+            self.regencyChoice.SetItems([])
+            return
+        self._regencyLoadToken += 1
+        token = self._regencyLoadToken
+        bundled = self._bundledRegionItems(province_id)
+        if bundled is not None:
+            self._applyRegenciesLoad(token, initial, bundled)
+            return
+        self._setChoiceLoading(self.regencyChoice, "Loading city/regency...")
+
+        def worker():
+            store_key = f"idn:regencies:{province_id}"
+            url = net.service_url("emsifa", INDONESIA_REGENCIES_PATH.format(province_id))
+            try:
+                regencies = MuslimkuSettingsPanel._idnRegenciesCache.get(province_id)
+                stale = False
+                if not regencies:
+                    regencies, stale = _load_region_list(store_key, url)
+                    MuslimkuSettingsPanel._idnRegenciesCache[province_id] = regencies
+                wx.CallAfter(self._applyRegenciesLoad, token, initial, regencies)
+            except Exception:
+                wx.CallAfter(self._applyRegenciesLoad, token, initial, None)
+                return
+            if stale:
+                fresh = _refresh_region_list(store_key, url)
+                if fresh:
+                    MuslimkuSettingsPanel._idnRegenciesCache[province_id] = fresh
+                    wx.CallAfter(self._applyRefreshedRegions, "regency", token, fresh)
+
+        if not _run_in_background(worker, key="panel:regencies"):
+            self._applyRegenciesLoad(token, initial, None)
+
+    @diagnostics.timed("panel.applyRegenciesLoad")
+    def _applyRegenciesLoad(self, token, initial, regencies):
+        if self._panelClosed or token != self._regencyLoadToken:
+            return
+        if regencies is None:
+            try:
+                log.exception("Muslimku: failed loading Indonesia regency list.")
+            except Exception:
+                pass
+            self.regencyChoice.SetItems([])
+            self.regencyChoice.Enable(False)
+            return
+        self._regencyMap = {r.get("name", ""): r.get("id", "") for r in regencies if r.get("name") and r.get("id")}
+        regency_names = list(self._regencyMap.keys())
+        self.regencyChoice.SetItems(regency_names)
+        saved_regency = config.conf["muslimku"].get("regency", "")
+        saved_city = config.conf["muslimku"].get("city", "")
+        if initial and saved_regency in self._regencyMap:
+            self.regencyChoice.SetStringSelection(saved_regency)
+        elif initial and saved_city:
+            for name in regency_names:
+                norm = self._normalizeIndonesiaCityName(name).lower()
+                if saved_city.lower() in norm or norm in saved_city.lower():
+                    self.regencyChoice.SetStringSelection(name)
+                    break
+        elif regency_names:
+            self.regencyChoice.SetSelection(0)
+        self.regencyChoice.Enable(bool(regency_names))
+        self._startFineRegionLoad("district", initial=initial)
+
+    def _startFineRegionLoad(self, level, initial=False):
+        # Districts (kecamatan) and villages are optional finer locations.
+        if level == "district":
+            choice = self.districtChoice
+            parent_id = self._regencyMap.get(self.regencyChoice.GetStringSelection())
+            url = net.service_url("emsifa", INDONESIA_DISTRICTS_PATH)
+        else:
+            choice = self.villageChoice
+            parent_id = self._fineMaps["district"].get(self.districtChoice.GetStringSelection())
+            url = net.service_url("emsifa", INDONESIA_VILLAGES_PATH)
+        self._fineLoadTokens[level] += 1
+        token = self._fineLoadTokens[level]
+        if not parent_id:
+            self._applyFineRegionLoad(level, token, initial, [])
+            return
+        bundled = self._bundledRegionItems(parent_id)
+        if bundled is not None:
+            self._applyFineRegionLoad(level, token, initial, bundled)
+            return
+        self._setChoiceLoading(choice, "Loading...")
+
+        def worker():
+            store_key = f"idn:{level}s:{parent_id}"
+            try:
+                items, stale = _load_region_list(store_key, url.format(parent_id))
+                wx.CallAfter(self._applyFineRegionLoad, level, token, initial, items)
+            except Exception:
+                wx.CallAfter(self._applyFineRegionLoad, level, token, initial, None)
+                return
+            if stale:
+                fresh = _refresh_region_list(store_key, url.format(parent_id))
+                if fresh:
+                    wx.CallAfter(self._applyRefreshedRegions, level, token, fresh)
+
+        if not _run_in_background(worker, key=f"panel:{level}"):
+            self._applyFineRegionLoad(level, token, initial, None)
+
+    @diagnostics.timed("panel.applyRefreshedRegions")
+    def _applyRefreshedRegions(self, level, token, items):
+        # A background refresh of a stale list: swaps it in when it differs
+        # from the one shown, keeping the selection if it still exists.
+        if self._panelClosed:
+            return
+        if level == "province":
+            current, choice, latest = self._provinceMap, self.provinceChoice, self._provinceLoadToken
+        elif level == "regency":
+            current, choice, latest = self._regencyMap, self.regencyChoice, self._regencyLoadToken
+        elif level == "district":
+            current, choice, latest = self._fineMaps[level], self.districtChoice, self._fineLoadTokens[level]
+        else:
+            current, choice, latest = self._fineMaps[level], self.villageChoice, self._fineLoadTokens[level]
+        if token != latest:
+            return
+        mapping = {r.get("name", ""): r.get("id", "") for r in items if r.get("name") and r.get("id")}
+        if not mapping or list(mapping.items()) == list(current.items()):
+            return
+        selected = choice.GetStringSelection()
+        names = list(mapping.keys())
+        if level in self._fineMaps:
+            ui_lang = config.conf["muslimku"].get("language", "en")
+            names = [self._labels["not_selected"].get(ui_lang, "(Not selected)")] + names
+            self._fineMaps[level] = mapping
+        elif level == "province":
+            self._provinceMap = mapping
+        else:
+            self._regencyMap = mapping
+        choice.SetItems(names)
+        if selected in names:
+            choice.SetStringSelection(selected)
+        else:
+            choice.SetSelection(0)
+        choice.Enable(bool(mapping))
+        if current.get(selected) == mapping.get(selected):
+            return
+        # The selection is gone or changed its code: reload what depends on it.
+        if level == "province":
+            self._startRegenciesLoad()
+        elif level == "regency":
+            self._startFineRegionLoad("district")
+        elif level == "district":
+            self._startFineRegionLoad("village")
+
+    @diagnostics.timed("panel.applyFineRegionLoad")
+    def _applyFineRegionLoad(self, level, token, initial, items):
+        if self._panelClosed or token != self._fineLoadTokens[level]:
+            return
+        choice = self.districtChoice if level == "district" else self.villageChoice
+        ui_lang = config.conf["muslimku"].get("language", "en")
+        not_selected = self._labels["not_selected"].get(ui_lang, "(Not selected)")
+        mapping = {r.get("name", ""): r.get("id", "") for r in (items or []) if r.get("name") and r.get("id")}
+        self._fineMaps[level] = mapping
+        choice.SetItems([not_selected] + list(mapping.keys()))
+        saved = config.conf["muslimku"].get(level, "")
+        if initial and saved in mapping:
+            choice.SetStringSelection(saved)
+        else:
+            choice.SetSelection(0)
+        choice.Enable(bool(mapping))
+        if level == "district":
+            self._startFineRegionLoad("village", initial=initial)
+
+    def _startGlobalCitiesLoad(self, initial=False):
+        if self._panelClosed:
+            return
+        country = self.countryChoice.GetStringSelection()
+        if country == INDONESIA_COUNTRY:
+            return
+        self._globalCitiesLoadToken += 1
+        token = self._globalCitiesLoadToken
+        # Bundled per-country index; decompressing the largest country takes a few ms.
+        try:
+            self._globalCities = cityindex.get_country(country)
+        except Exception:
+            self._globalCities = None
+            try:
+                log.debugWarning("Muslimku: bundled city index unavailable.", exc_info=True)
+            except Exception:
+                pass
+        self.citySearchEdit.ChangeValue("")
+        names = self._globalCities.names if self._globalCities else None
+        self._applyGlobalCitiesLoad(token, names, initial)
+
+    @diagnostics.timed("panel.onCitySearch")
+    def _onCitySearch(self, evt):
+        if self._globalCities is not None:
+            names = self._globalCities.search(self.citySearchEdit.GetValue())
+            self.cityChoice.SetItems(names)
+            if names:
+                self.cityChoice.SetSelection(0)
+            self.cityChoice.Enable(bool(names))
+        evt.Skip()
+
+    @diagnostics.timed("panel.applyGlobalCitiesLoad")
+    def _applyGlobalCitiesLoad(self, token, names, initial):
+        if self._panelClosed or token != self._globalCitiesLoadToken:
+            return
+        if self.countryChoice.GetStringSelection() == INDONESIA_COUNTRY:
+            return
+        if names is None:
+            self.cityChoice.Show(False)
+            self.citySearchEdit.Show(False)
+            self.cityEdit.Show(True)
+            self.cityEdit.Enable(True)
+            ui_lang = config.conf["muslimku"].get("language", "en")
+            ui.message(self._labels["city_load_failed"].get(ui_lang, "City list for this country is unavailable. Please type the city name in the City field."))
+            self.Layout()
+            if self.Parent:
+                self.Parent.Layout()
+            return
+        self.cityChoice.Show(True)
+        self.cityEdit.Show(False)
+        self.cityEdit.Enable(False)
+        self.cityChoice.SetItems(names)
+        saved_city = config.conf["muslimku"].get("city", "")
+        saved_place = self._globalCities.find(saved_city) if initial and self._globalCities else None
+        if initial and saved_city in names:
+            self.cityChoice.SetStringSelection(saved_city)
+        elif saved_place:
+            # Cities saved with other spelling or accents, e.g. "Sanliurfa".
+            self.cityChoice.SetStringSelection(saved_place.name)
+        elif names:
+            self.cityChoice.SetSelection(0)
+        self.cityChoice.Enable(bool(names))
+        self.Layout()
+        if self.Parent:
+            self.Parent.Layout()
+
+    def _normalizeIndonesiaCityName(self, regency_name):
+        if not regency_name:
+            return ""
+        name = regency_name.strip()
+        prefixes = ("KABUPATEN ", "KOTA ")
+        upper = name.upper()
+        for p in prefixes:
+            if upper.startswith(p):
+                return name[len(p):].strip().title()
+        return name.title()
+
+
+class GlobalPlugin(globalPluginHandler.GlobalPlugin):
+
+    def __init__(self):
+        super().__init__()
+        _open_cache_store()
+        if MuslimkuSettingsPanel not in NVDASettingsDialog.categoryClasses:
+            NVDASettingsDialog.categoryClasses.append(MuslimkuSettingsPanel)
+        # Double-press clipboard helper
+        self._last_invoke = {}
+        self._double_threshold = 1.5
+        # Reminder runtime cache/state. Monthly timetables per location profile.
+        self._timings_cache = {}
+        self._timings_lock = threading.Lock()
+        # Coalesces concurrent network fetches for the same location/method/day.
+        self._flights = workers.SingleFlight()
+        # How announcements were answered: local engine, cache hit, stale or miss.
+        self._timings_stats = collections.Counter()
+        self._today = {}
+        # Serializes writers of _today; readers take the dict as it is.
+        self._today_lock = threading.Lock()
+        self._hijri_memo = collections.OrderedDict()
+        # Offline engine state: coordinates/timezone learned per location key.
+        self._location_infos = {}
+        self._local_payload_cache = collections.OrderedDict()
+        self._imsakiyah_memo = collections.OrderedDict()
+        self._notified_keys = set()
+        # Saved locations, parsed once per config value; index into _all_locations().
+        self._saved_locations_memo = (None, [])
+        self._itinerary_memo = (None, [])
+        # (legs remaining, legs resolved for offline use) after the last preparation.
+        self._itinerary_ready = (0, 0)
+        self._active_location_index = 0
+        self._qibla_lock = threading.Lock()
+        self._qibla_busy = False
+        # Reminder scheduler; its thread is started once NVDA is ready.
+        self._stop_event = threading.Event()
+        self._reminder_scheduler = scheduler.ReminderScheduler(
+            self._build_reminder_events,
+            self._fire_reminder,
+            on_error=self._on_reminder_error,
+            on_missed=self._fire_missed_reminder
+        )
+        settingsChanged.register(self._on_settings_changed)
+        config.post_configProfileSwitch.register(self._on_settings_changed)
+        # The reminder thread's first pass loads location data and computes
+        # today's schedule, so it waits until NVDA has finished starting.
+        self._reminder_thread = None
+        self._reminder_start_lock = threading.Lock()
+        try:
+            core.postNvdaStartup.register(self._start_reminders)
+        except Exception:
+            pass
+        # Fallback for a reload after startup, when postNvdaStartup has already
+        # fired: queued work runs as soon as the main loop is idle.
+        try:
+            wx.CallAfter(self._start_reminders)
+        except Exception:
+            self._start_reminders()
+
+    def _start_reminders(self, *args, **kwargs):
+        # Whichever of postNvdaStartup and the CallAfter fallback comes first starts it.
+        with self._reminder_start_lock:
+            if self._reminder_thread is not None or self._stop_event.is_set():
+                return
+            self._reminder_thread = threading.Thread(target=self._reminder_loop, name="muslimku-reminders", daemon=True)
+            self._reminder_thread.start()
+        if self._itinerary():
+            _run_in_background(self._prepare_itinerary, key="itinerary")
+
+    def terminate(self):
+        try:
+            NVDASettingsDialog.categoryClasses.remove(MuslimkuSettingsPanel)
+        except ValueError:
+            pass
+        try:
+            settingsChanged.unregister(self._on_settings_changed)
+            config.post_configProfileSwitch.unregister(self._on_settings_changed)
+            core.postNvdaStartup.unregister(self._start_reminders)
+        except Exception:
+            pass
+        # Stop reminder thread
+        try:
+            with self._reminder_start_lock:
+                self._stop_event.set()
+                thread = self._reminder_thread
+            self._reminder_scheduler.stop()
+            if thread:
+                thread.join(timeout=2)
+        except Exception:
+            pass
+        # Workers may still be writing to the store; stop them first and
+        # close the store last.
+        try:
+            workers.shutdown_executor(timeout=2)
+        except Exception:
+            pass
+        try:
+            net.close_client()
+        except Exception:
+            pass
+        try:
+            _close_cache_store()
+        except Exception:
+            pass
+        super().terminate()
+
+    def _reminder_loop(self):
+        # Sleeps until the next reminder trigger or day rollover.
+        self._reminder_scheduler.run()
+
+    def _on_reminder_error(self):
+        try:
+            log.exception("Muslimku: unexpected error in reminder loop.")
+        except Exception:
+            pass
+
+    def _on_settings_changed(self, *args, **kwargs):
+        # Keep what still belongs to a configured location or a coming leg;
+        # drop the rest.
+        try:
+            locs = self._all_locations()
+            if self._active_location_index >= len(locs):
+                self._active_location_index = 0
+            locs = locs + [leg.location for leg in itinerary.upcoming(self._itinerary(), datetime.date.today())]
+            keys = set(locations.location_key(loc) for loc in locs)
+            profiles = set(self._get_timetable_profile(loc) for loc in locs)
+        except Exception:
+            keys, profiles = set(), set()
+        with self._today_lock:
+            self._today = {}
+        self._location_infos = {k: v for k, v in self._location_infos.items() if k in keys}
+        with self._timings_lock:
+            self._timings_cache = {k: v for k, v in self._timings_cache.items() if k in profiles}
+        self._reminder_scheduler.rearm()
+        _run_in_background(self._prepare_itinerary, key="itinerary")
+
+    def _primary_location(self):
+        # Today's itinerary leg while travelling, else the location edited
+        # in the settings panel.
+        leg = itinerary.leg_for(self._itinerary(), datetime.date.today())
+        if leg is not None:
+            return leg.location
+        section = config.conf["muslimku"]
+        return locations.make_location(
+            country=section.get("country", ""),
+            city=section.get("city", ""),
+            province=section.get("province", ""),
+            regency=section.get("regency", ""),
+            district=section.get("district", ""),
+            village=section.get("village", ""),
+            region_code=section.get("region_code", ""),
+            method=section.get("calculation_method", locations.DEFAULT_METHOD),
+            madhab=section.get("madhab", "shafi"),
+        )
+
+    def _saved_locations(self):
+        try:
+            raw = config.conf["muslimku"].get("locations", "[]")
+        except Exception:
+            raw = "[]"
+        memo = self._saved_locations_memo
+        if memo[0] != raw:
+            memo = (raw, locations.parse(raw))
+            self._saved_locations_memo = memo
+        return memo[1]
+
+    def _itinerary(self):
+        try:
+            raw = config.conf["muslimku"].get("itinerary", "[]")
+        except Exception:
+            raw = "[]"
+        memo = self._itinerary_memo
+        if memo[0] != raw:
+            memo = (raw, itinerary.parse(raw))
+            self._itinerary_memo = memo
+        return memo[1]
+
+    def _prepare_itinerary(self):
+        # Resolves every remaining leg ahead of the trip, so it needs no
+        # network: coordinates and timezone are persisted with the learned
+        # locations, and a leg the bundled data cannot place gets its monthly
+        # timetables cached, which also teaches its coordinates. Timings, Hijri
+        # dates and Qibla are then computed locally from those.
+        today = datetime.date.today()
+        legs = itinerary.upcoming(self._itinerary(), today)
+        ready = 0
+        for leg in legs:
+            loc = leg.location
+            start = max(leg.start, today)
+            try:
+                info = self._get_location_info(loc)
+                if info is None:
+                    for month_start in itinerary.months(start, leg.end):
+                        payload = self._get_timetable_payload(max(month_start, start), timeout=10, loc=loc)
+                        if payload:
+                            self._remember_location_from_payload(payload, loc)
+                    info = self._get_location_info(loc)
+                if not info:
+                    continue
+                if info.get("source") in ("regions", "gazetteer", "cities"):
+                    _get_cache_store().set("geocode", info["key"], info)
+                # Loads the zone and proves the offline engine can serve the leg.
+                if self._compute_local_payload(start, loc):
+                    ready += 1
+            except Exception:
+                try:
+                    log.debugWarning(f"Muslimku: could not prepare itinerary leg {itinerary.describe(leg)}.", exc_info=True)
+                except Exception:
+                    pass
+        self._itinerary_ready = (len(legs), ready)
+
+    def _all_locations(self):
+        # Primary first, then saved locations that name a different timetable.
+        result = [self._primary_location()]
+        for loc in self._saved_locations():
+            if not any(locations.same_place(loc, other) for other in result):
+                result.append(loc)
+        return result
+
+    def _active_location(self):
+        locs = self._all_locations()
+        index = self._active_location_index
+        return locs[index] if 0 <= index < len(locs) else locs[0]
+
+    def _get_today_snapshot(self, loc=None):
+        # Called on the main thread by scripts; None means a worker must load.
+        try:
+            profile = self._get_timetable_profile(loc)
+        except Exception:
+            return None
+        snapshot = self._today.get(profile)
+        if snapshot is None:
+            return None
+        now_ts = time.time()
+        if now_ts >= snapshot.expires_ts:
+            # Past midnight: the pre-warmed day takes over as is.
+            next_day = snapshot.next_day
+            if next_day is None or now_ts >= next_day.expires_ts:
+                return None
+            self._store_snapshot(profile, next_day, replacing=snapshot)
+            self._schedule_prewarm(loc)
+            return next_day
+        return snapshot
+
+    def _store_snapshot(self, profile, snapshot, replacing=None):
+        # Copied, not mutated, so readers never see a half-updated dict.
+        # With replacing, only swaps when that snapshot is still current.
+        with self._today_lock:
+            if replacing is not None and self._today.get(profile) is not replacing:
+                return False
+            now_ts = time.time()
+            today = {
+                p: s for p, s in self._today.items()
+                if s.expires_ts > now_ts or (s.next_day is not None and s.next_day.expires_ts > now_ts)
+            }
+            today[profile] = snapshot
+            self._today = today
+            return True
+
+    def _schedule_prewarm(self, loc=None):
+        loc = loc or self._active_location()
+        try:
+            key = ("prewarm",) + self._get_timetable_profile(loc)
+        except Exception:
+            return
+        _run_in_background(self._prewarm_next_day, loc, key=key)
+
+    def _prewarm_next_day(self, loc):
+        # Builds tomorrow's schedule and the Hijri dates around it well before
+        # midnight and Maghrib, and attaches it to today's snapshot.
+        try:
+            profile = self._get_timetable_profile(loc)
+            snapshot = self._today.get(profile)
+            if snapshot is None or snapshot.next_day is not None:
+                return
+            tomorrow = snapshot.schedule.date + datetime.timedelta(days=1)
+            payload = self._load_today_payload(loc, tomorrow)
+            if not payload:
+                return
+            next_day = self._make_snapshot(profile, payload, loc, day=tomorrow)
+            for offset in range(3):
+                self._get_hijri_for_date(snapshot.schedule.date + datetime.timedelta(days=offset))
+            current = snapshot._replace(next_day=next_day)
+            if self._store_snapshot(profile, current, replacing=snapshot):
+                self._merge_next_day_reminders(loc, current)
+        except Exception:
+            try:
+                log.debugWarning("Muslimku: failed to pre-warm tomorrow's schedule.", exc_info=True)
+            except Exception:
+                pass
+
+    def _get_reminder_offset(self):
+        try:
+            return int(config.conf["muslimku"].get("reminder_offset_minutes", 0))
+        except Exception:
+            return 0
+
+    def _get_reminder_offsets(self):
+        # {event: minutes before} for every event with its reminder on.
+        general = self._get_reminder_offset()
+        offsets = {}
+        for name in schedule.REMINDER_EVENTS:
+            key = f"remind_{name.lower()}"
+            try:
+                if not bool(config.conf["muslimku"].get(key, name in schedule.PRAYERS)):
+                    continue
+                offset = int(config.conf["muslimku"].get(f"{key}_offset", -1))
+            except Exception:
+                offset = -1
+            offsets[name] = general if offset < 0 else offset
+        return offsets
+
+    def _make_snapshot(self, profile, payload, loc=None, day=None):
+        # Parses the payload once into a DaySchedule for the location's today,
+        # or for day when given.
+        now = self._get_location_now(payload, loc)
+        if day is not None:
+            now = datetime.datetime(day.year, day.month, day.day, tzinfo=now.tzinfo)
+        day_schedule = schedule.build_day_schedule(
+            profile + (now.date().isoformat(),),
+            payload.get("timings", {}) or {},
+            now.date(),
+            now.tzinfo,
+            offsets=FIXED_PRAYER_OFFSETS,
+            reminder_offsets=self._get_reminder_offsets()
+        )
+        return TodaySnapshot(profile, self._next_local_midnight_ts(now) - 1, payload, day_schedule)
+
+    def _get_cached_snapshot(self, loc=None, interactive=False):
+        # interactive: someone is waiting; see _load_today_payload.
+        loc = loc or self._active_location()
+        snapshot = self._get_today_snapshot(loc)
+        if snapshot is not None:
+            return snapshot
+        profile = self._get_timetable_profile(loc)
+        payload = self._load_today_payload(loc, interactive=interactive)
+        if not payload:
+            return None
+        try:
+            snapshot = self._make_snapshot(profile, payload, loc)
+        except Exception:
+            try:
+                log.exception("Muslimku: failed to compile day schedule.")
+            except Exception:
+                pass
+            return None
+        date_str = payload.get("date", {}).get("gregorian", {}).get("date")
+        if not date_str or date_str == snapshot.schedule.date.strftime("%d-%m-%Y"):
+            self._store_snapshot(profile, snapshot)
+            self._schedule_prewarm(loc)
+        return snapshot
+
+    def _get_cached_timings_payload(self, loc=None):
+        snapshot = self._get_cached_snapshot(loc)
+        return snapshot.payload if snapshot else None
+
+    def _load_today_payload(self, loc=None, target_date=None, interactive=False):
+        # Today's payload at the location, or target_date's when given.
+        # interactive: one short network attempt; on failure the offline
+        # engine is tried again and the month is retried in the background,
+        # with full retries, for the next press.
+        loc = loc or self._active_location()
+        try:
+            # Local engine answers whenever the location coordinates are known.
+            payload = self._try_local_payload(target_date, loc)
+            if payload:
+                self._timings_stats["local"] += 1
+                return payload
+
+            day = target_date or datetime.date.today()
+            if interactive:
+                timeout, attempts = net.INTERACTIVE_TIMEOUT, net.INTERACTIVE_ATTEMPTS
+            else:
+                timeout, attempts = 10, None
+            try:
+                payload = self._get_timetable_payload(day, timeout=timeout, loc=loc, attempts=attempts)
+            except Exception:
+                payload = None
+                try:
+                    log.debugWarning("Muslimku: monthly timetable unavailable, falling back to daily timings.")
+                except Exception:
+                    pass
+            if not payload and interactive:
+                profile = self._get_timetable_profile(loc)
+                _run_in_background(
+                    self._refresh_timetable_month, profile, day, 10, loc,
+                    key=("refresh",) + profile + (day.strftime("%Y-%m"),)
+                )
+                return self._try_local_payload(target_date, loc)
+            if not payload:
+                day_key = ("day",) + self._get_timetable_profile(loc) + (day.isoformat(),)
+                date_str = day.strftime("%d-%m-%Y") if target_date else None
+                payload = self._flights.do(day_key, self._fetch_timings, date_str, timeout=10, loc=loc).get("data", {}) or {}
+            self._remember_location_from_payload(payload, loc)
+            return self._try_local_payload(target_date, loc) or payload
+        except Exception:
+            try:
+                log.exception("Muslimku: failed to fetch prayer timings payload.")
+            except Exception:
+                pass
+            return None
+
+    def get_cache_stats(self):
+        try:
+            store = _get_cache_store().counters()
+        except Exception:
+            store = {}
+        return {"timings": dict(self._timings_stats), "store": store}
+
+    def get_diagnostics(self):
+        try:
+            http = net.get_client().stats()
+        except Exception:
+            http = {}
+        try:
+            executor = workers.get_executor().stats()
+        except Exception:
+            executor = {}
+        flights = self._flights
+        key = self._get_location_key()
+        info = self._location_infos.get(key) or {}
+        return {
+            "generated": datetime.datetime.now().astimezone().isoformat(timespec="seconds"),
+            "location": {
+                "key": key,
+                "source": info.get("source"),
+                "timezone": info.get("timezone"),
+                "saved": len(self._all_locations()) - 1,
+                "profiles_cached": len(self._today),
+            },
+            "itinerary": {
+                "legs": len(self._itinerary()),
+                "remaining": self._itinerary_ready[0],
+                "prepared": self._itinerary_ready[1],
+            },
+            "cache": self.get_cache_stats(),
+            "http": http,
+            "executor": executor,
+            "single_flight": {"calls": flights.calls, "shared": flights.shared, "inflight": flights.inflight()},
+            "reminders": self._reminder_scheduler.stats(),
+            "threads": sorted(t.name for t in threading.enumerate()),
+            "timings_ms": diagnostics.snapshot(),
+        }
+
+    def _get_location_key(self, loc=None):
+        return locations.location_key(loc or self._active_location())
+
+    def _remember_location_from_payload(self, payload, loc=None):
+        try:
+            meta = payload.get("meta", {}) or {}
+            lat = float(meta["latitude"])
+            lon = float(meta["longitude"])
+        except Exception:
+            return
+        self._remember_location(lat, lon, meta.get("timezone"), "aladhan", loc)
+
+    def _remember_location(self, lat, lon, tz_name, source, loc=None):
+        info = {
+            "key": self._get_location_key(loc),
+            "lat": float(lat),
+            "lon": float(lon),
+            "timezone": tz_name,
+            "source": source,
+        }
+        self._location_infos[info["key"]] = info
+        try:
+            _get_cache_store().set("geocode", info["key"], info)
+        except Exception:
+            pass
+        return info
+
+    def _get_location_info(self, loc=None):
+        loc = loc or self._active_location()
+        key = self._get_location_key(loc)
+        info = self._location_infos.get(key)
+        if info:
+            return info
+        try:
+            info = _get_cache_store().get("geocode", key)
+        except Exception:
+            info = None
+        if info and info.get("key") == key:
+            self._location_infos[key] = info
+            return info
+        region = self._find_region_centroid(loc)
+        if region:
+            info = {
+                "key": key,
+                "lat": region.lat,
+                "lon": region.lon,
+                "timezone": self._timezone_for_coordinates(region.lat, region.lon, loc),
+                "source": "regions",
+            }
+            if info["timezone"]:
+                self._location_infos[key] = info
+                return info
+        place = self._find_gazetteer_place(loc)
+        if place:
+            info = {
+                "key": key,
+                "lat": place.lat,
+                "lon": place.lon,
+                "timezone": place.timezone,
+                "source": "gazetteer",
+            }
+            self._location_infos[key] = info
+            return info
+        place = self._find_city_index_place(loc)
+        if place:
+            info = {
+                "key": key,
+                "lat": place.lat,
+                "lon": place.lon,
+                "timezone": self._timezone_for_coordinates(place.lat, place.lon, loc),
+                "source": "cities",
+            }
+            if info["timezone"]:
+                self._location_infos[key] = info
+                return info
+        return None
+
+    def _location_name_candidates(self, loc):
+        # Exact names only: every Indonesian regency and city is in the
+        # gazetteer, and dropping words would match unrelated villages.
+        candidates = [loc.city] if loc.city else []
+        return loc.country, candidates
+
+    def _find_region_centroid(self, loc):
+        if loc.country != INDONESIA_COUNTRY or not loc.region_code:
+            return None
+        try:
+            store = regions.get_region_store()
+            return store.centroid(loc.region_code) if store else None
+        except Exception:
+            return None
+
+    def _find_gazetteer_place(self, loc):
+        try:
+            gaz = gazetteer.get_gazetteer()
+        except Exception:
+            try:
+                log.debugWarning("Muslimku: bundled gazetteer unavailable.", exc_info=True)
+            except Exception:
+                pass
+            return None
+        country, candidates = self._location_name_candidates(loc)
+        for name in candidates:
+            place = gaz.find(name, country or None)
+            if place:
+                return place
+        return None
+
+    def _find_city_index_place(self, loc):
+        # Smaller towns listed in the settings panel but not in the gazetteer.
+        country, candidates = self._location_name_candidates(loc)
+        if not country:
+            return None
+        try:
+            cities = cityindex.get_country(country)
+        except Exception:
+            return None
+        for name in candidates:
+            place = cities.find(name) if cities else None
+            if place:
+                return place
+        return None
+
+    def _timezone_for_coordinates(self, lat, lon, loc=None):
+        try:
+            loc = loc or self._active_location()
+            return timezones.zone_for_coordinates(lat, lon, loc.country or None, loc.region_code or None)
+        except Exception:
+            return None
+
+    def _get_zoneinfo(self, tz_name):
+        return timezones.get_zone(tz_name)
+
+    def _compute_local_payload(self, target_date=None, loc=None):
+        loc = loc or self._active_location()
+        info = self._get_location_info(loc)
+        if not info:
+            return None
+        tz_name = info.get("timezone")
+        tzinfo = self._get_zoneinfo(tz_name)
+        if tzinfo is None:
+            tzinfo = datetime.datetime.now().astimezone().tzinfo
+        if target_date is None:
+            target_date = datetime.datetime.now(tzinfo).date()
+        method_id = self._get_calc_method(loc)
+        school = self._get_madhab_school(loc)
+        adjustment = self._get_hijri_adjustment()
+        key = (info["key"], target_date.isoformat(), method_id, school, adjustment)
+        memo = self._local_payload_cache
+        payload = memo.get(key)
+        if payload:
+            return payload
+        payload = self._build_local_payload(info, target_date, tzinfo, loc)
+        # Bounded across locations; the oldest day payload goes first.
+        try:
+            memo[key] = payload
+            while len(memo) > LOCAL_PAYLOAD_MEMO_SIZE:
+                memo.popitem(last=False)
+        except KeyError:
+            pass
+        if bool(config.conf["muslimku"].get("aladhan_crosscheck", False)):
+            _run_in_background(self._crosscheck_timings, payload, target_date, loc, key=("crosscheck", info["key"]))
+        return payload
+
+    def _try_local_payload(self, target_date=None, loc=None):
+        # The offline engine's day, or None when it fails, so the caller
+        # falls through to the network instead of giving up.
+        try:
+            return self._compute_local_payload(target_date, loc)
+        except Exception:
+            try:
+                log.debugWarning("Muslimku: offline prayer time engine failed.", exc_info=True)
+            except Exception:
+                pass
+            return None
+
+    def _build_local_payload(self, info, target_date, tzinfo, loc=None):
+        # One day from the offline engine, without the memo.
+        method_id = self._get_calc_method(loc)
+        hijri_info = hijricalendar.to_aladhan_dict(target_date, self._get_hijri_adjustment())
+        payload = prayertimes.build_day_payload(
+            target_date,
+            info["lat"],
+            info["lon"],
+            tzinfo,
+            tz_name=info.get("timezone"),
+            method_id=method_id,
+            school=self._get_madhab_school(loc),
+            method_settings=self._get_calc_method_settings(method_id),
+            ramadan=(hijri_info["month"]["number"] == 9)
+        )
+        payload["date"]["hijri"] = hijri_info
+        return payload
+
+    def _crosscheck_timings(self, local_payload, target_date, loc=None):
+        # Optional comparison against Aladhan; mismatches are only logged.
+        try:
+            remote_payload = self._get_timetable_payload(target_date, timeout=10, loc=loc) or {}
+            remote = remote_payload.get("timings", {}) or {}
+            local = local_payload.get("timings", {})
+            base = datetime.datetime(target_date.year, target_date.month, target_date.day)
+            for name in ("Imsak", "Fajr", "Sunrise", "Dhuhr", "Asr", "Sunset", "Maghrib", "Isha"):
+                local_dt = self._parse_api_time_to_datetime(local.get(name), base)
+                remote_dt = self._parse_api_time_to_datetime(remote.get(name), base)
+                if not local_dt or not remote_dt:
+                    continue
+                diff = abs((local_dt - remote_dt).total_seconds()) / 60.0
+                if diff > 1:
+                    log.info(f"Muslimku: offline {name} {local.get(name)} differs from Aladhan {remote.get(name)}.")
+        except Exception:
+            try:
+                log.debug("Muslimku: Aladhan cross-check unavailable.")
+            except Exception:
+                pass
+
+    def _reminder_entries(self, snapshot, place, now_ts):
+        # (trigger_ts, event, "HH:MM", notify_key, place) for today and, once
+        # pre-warmed, tomorrow, up to the horizon. Keyed by the whole profile
+        # (places differing only in method or madhab share a location key)
+        # and the event's instant, so the same reminder has one key whichever
+        # day built it.
+        horizon_ts = now_ts + REMINDER_HORIZON_SECONDS
+        profile_key = "|".join(str(part) for part in snapshot.profile)
+        for day in (snapshot, snapshot.next_day):
+            if day is None:
+                continue
+            for trigger_ts, name, time_str, event_ts in day.schedule.reminders:
+                if trigger_ts <= horizon_ts:
+                    yield trigger_ts, name, time_str, f"{profile_key}:{name}:{event_ts}", place
+
+    def _reminder_locations(self):
+        # (location, place name or None for the primary) with reminders on.
+        if not bool(config.conf["muslimku"].get("reminder_enabled", True)):
+            return []
+        return [(loc, loc.name if index else None) for index, loc in enumerate(self._all_locations()) if loc.reminders]
+
+    def _build_reminder_events(self, now_ts):
+        # Returns the reminders due in the next 48 hours for every location
+        # and when to rebuild (the earliest next local midnight among them,
+        # when today's snapshots turn over). Tomorrow's reminders that are
+        # pre-warmed later are merged in without a rebuild.
+        if not bool(config.conf["muslimku"].get("reminder_enabled", True)):
+            return [], self._next_local_midnight_ts(datetime.datetime.now().astimezone())
+        snapshots = []
+        rebuild_ts = None
+        for loc, place in self._reminder_locations():
+            snapshot = self._get_cached_snapshot(loc)
+            if not snapshot:
+                continue
+            expires_ts = snapshot.expires_ts + 1
+            rebuild_ts = expires_ts if rebuild_ts is None else min(rebuild_ts, expires_ts)
+            snapshots.append((snapshot, place))
+        if rebuild_ts is None:
+            return [], None
+        if self._itinerary():
+            # The itinerary switches legs at the computer's midnight.
+            rebuild_ts = min(rebuild_ts, self._next_local_midnight_ts(datetime.datetime.now().astimezone()))
+        events, keys = self._group_reminder_events(snapshots, now_ts)
+        # Forget notifications that left the window.
+        self._notified_keys &= keys
+        return events, rebuild_ts
+
+    def _group_reminder_events(self, snapshots, now_ts):
+        # snapshots: (snapshot, place) per location. Locations whose reminders
+        # land on the same instant share one event keyed "instant:prayer", so
+        # wakeups grow with distinct instants, not with locations. Returns the
+        # events and the notification keys they carry.
+        grouped = collections.OrderedDict()
+        keys = set()
+        for snapshot, place in snapshots:
+            for trigger_ts, name, time_str, notify_key, place in self._reminder_entries(snapshot, place, now_ts):
+                keys.add(notify_key)
+                grouped.setdefault((trigger_ts, name, time_str), []).append((notify_key, place))
+        events = [
+            (trigger_ts, f"{int(trigger_ts)}:{name}", (name, time_str, entries))
+            for (trigger_ts, name, time_str), entries in grouped.items()
+        ]
+        return events, keys
+
+    def _merge_next_day_reminders(self, loc, snapshot):
+        # Queues a freshly pre-warmed tomorrow without rebuilding. Events are
+        # grouped with the other locations' held snapshots exactly as a
+        # rebuild would, so they carry the same keys: the scheduler updates
+        # an event it already holds instead of queueing the instant twice.
+        reminder_locations = self._reminder_locations()
+        if not any(locations.same_place(reminder_loc, loc) for reminder_loc, place in reminder_locations):
+            return
+        snapshots = []
+        for reminder_loc, place in reminder_locations:
+            if locations.same_place(reminder_loc, loc):
+                snapshots.append((snapshot, place))
+                continue
+            try:
+                other = self._today.get(self._get_timetable_profile(reminder_loc))
+            except Exception:
+                other = None
+            if other is not None:
+                snapshots.append((other, place))
+        events = self._group_reminder_events(snapshots, time.time())[0]
+        self._reminder_scheduler.merge(events)
+
+    def _next_local_midnight_ts(self, now):
+        clock = timezones.get_clock(getattr(now.tzinfo, "key", None))
+        if clock is not None:
+            return clock.next_local_midnight(now.timestamp()) + 1
+        tomorrow = now.date() + datetime.timedelta(days=1)
+        midnight = datetime.datetime(tomorrow.year, tomorrow.month, tomorrow.day, tzinfo=now.tzinfo)
+        # A second past midnight so the rebuild lands on the new day.
+        return midnight.timestamp() + 1
+
+    def _fire_reminder(self, event_key, data, late=False):
+        prayer, time_str, entries = data
+        places = []
+        for notify_key, place in entries:
+            if notify_key in self._notified_keys:
+                continue
+            self._notified_keys.add(notify_key)
+            places.append(place)
+        if places:
+            self._notify(prayer, time_str, places, late=late)
+
+    def _fire_missed_reminder(self, event_key, data, trigger_ts, now_ts):
+        # A reminder slept through or skipped by a clock jump. While the
+        # timing is still ahead it is simply given now; once it has passed it
+        # is announced as overdue, or dropped when that is turned off.
+        prayer, time_str, entries = data
+        try:
+            # Notification keys end with the event's instant.
+            event_ts = float(entries[0][0].rsplit(":", 1)[1])
+        except (IndexError, ValueError):
+            event_ts = trigger_ts
+        if event_ts > now_ts:
+            self._fire_reminder(event_key, data)
+        elif bool(config.conf["muslimku"].get("announce_missed_reminders", True)):
+            self._fire_reminder(event_key, data, late=True)
+        else:
+            self._notified_keys.update(notify_key for notify_key, place in entries)
+
+    @diagnostics.timed("main.deliver_notification")
+    def _deliver_notification(self, prayer, message, title):
+        # Speech is primary channel for automatic reminders.
+        try:
+            self._handle_message(f"notify:{prayer}", message)
+        except Exception:
+            try:
+                log.exception("Muslimku: failed to deliver reminder speech via _handle_message.")
+            except Exception:
+                pass
+            try:
+                ui.message(message)
+            except Exception:
+                try:
+                    log.exception("Muslimku: failed to deliver reminder speech via ui.message fallback.")
+                except Exception:
+                    pass
+
+        # Visual notification is optional and non-blocking.
+        try:
+            # Prefer OS-level toast notification for taskbar/Notification Center behavior.
+            import wx.adv
+            notif = wx.adv.NotificationMessage(title=title, message=message)
+            try:
+                notif.SetFlags(wx.ICON_INFORMATION)
+            except Exception:
+                pass
+            notif.Show(timeout=wx.adv.NotificationMessage.Timeout_Auto)
+        except Exception:
+            try:
+                if hasattr(gui, "notification"):
+                    gui.notification(message)
+            except Exception:
+                try:
+                    log.exception("Muslimku: failed to show optional reminder notification.")
+                except Exception:
+                    pass
+
+    def _notify(self, prayer, time_str, places=None, late=False):
+        # places: saved location names, None standing for the primary city.
+        # late: the timing has passed; say when it was due instead.
+        try:
+            lang = config.conf["muslimku"].get("language", "en")
+            city = self._primary_location().city
+            names = [place or city for place in (places or [None])]
+            saved = [place for place in (places or []) if place]
+            city = ", ".join(names)
+            if lang == "id":
+                nama = REMINDER_EVENT_LABELS.get(prayer, {}).get("id", prayer)
+                # Indonesian notification with region mention
+                if late:
+                    message = f"Pengingat terlewat: waktu {nama} pukul {time_str}, untuk Wilayah {city} dan Sekitarnya."
+                elif prayer in schedule.PRAYERS:
+                    message = (
+                        f"Waktu {nama} telah tiba, untuk Wilayah {city} dan Sekitarnya! "
+                        f"Mari tinggalkan komputer sejenak, lalu tunaikan Solat {nama}."
+                    )
+                else:
+                    message = f"Waktu {nama} pukul {time_str}, untuk Wilayah {city} dan Sekitarnya."
+                title = f"Waktu {nama}"
+            else:
+                if late:
+                    message = f"Missed reminder: {prayer} was due at {time_str}" + (f" in {city}." if saved else ".")
+                elif saved:
+                    message = f"Reminder: {prayer} at {time_str} in {city}."
+                else:
+                    message = f"Reminder: {prayer} at {time_str}."
+                title = f"{prayer} reminder"
+            # Ensure delivery runs on NVDA main/UI thread.
+            try:
+                wx.CallAfter(self._deliver_notification, prayer, message, title)
+            except Exception:
+                self._deliver_notification(prayer, message, title)
+        except Exception:
+            try:
+                log.exception("Muslimku: unexpected error while preparing reminder notification.")
+            except Exception:
+                pass
+
+    def _get_location_now(self, resp_data=None, loc=None):
+        tz_name = None
+        try:
+            tz_name = resp_data.get("meta", {}).get("timezone")
+        except Exception:
+            tz_name = None
+        if not tz_name:
+            # No payload timezone: use the one resolved offline for the location.
+            try:
+                tz_name = (self._get_location_info(loc) or {}).get("timezone")
+            except Exception:
+                tz_name = None
+        clock = timezones.get_clock(tz_name)
+        if clock is not None:
+            return clock.now()
+        if tz_name:
+            try:
+                log.debug(f"Muslimku: failed to load timezone '{tz_name}', using local timezone.")
+            except Exception:
+                pass
+        return datetime.datetime.now().astimezone()
+
+    def _get_calc_method(self, loc=None):
+        return (loc or self._active_location()).method
+
+    def _get_calc_method_settings(self, method_id):
+        # Aladhan method settings for Muhammadiyah profile.
+        if int(method_id) == 99:
+            return MUHAMMADIYAH_METHOD_SETTINGS
+        return None
+
+    def _get_madhab_school(self, loc=None):
+        return locations.madhab_school(loc or self._active_location())
+
+    def _parse_api_time_to_datetime(self, time_str, base_now):
+        if not time_str:
+            return None
+        tpart = str(time_str).split()[0]
+        try:
+            hour, minute = [int(x) for x in tpart.split(":")]
+        except Exception:
+            return None
+        return datetime.datetime(
+            base_now.year, base_now.month, base_now.day, hour, minute, tzinfo=base_now.tzinfo
+        )
+
+    def _get_api_params(self, loc=None):
+        loc = loc or self._active_location()
+        method_id = self._get_calc_method(loc)
+        params = {
+            "city": loc.city,
+            "country": loc.country,
+            "method": method_id,
+            "school": self._get_madhab_school(loc)
+        }
+        method_settings = self._get_calc_method_settings(method_id)
+        if method_settings:
+            params["methodSettings"] = method_settings
+        return params
+
+    def _fetch_timings(self, date_str=None, timeout=10, loc=None):
+        base_url = net.service_url("aladhan", "/v1/timingsByCity")
+        if date_str:
+            base_url = f"{base_url}/{date_str}"
+        return net.get_json(base_url, params=self._get_api_params(loc), timeout=timeout) or {}
+
+    def _fetch_calendar_month(self, year, month, timeout=10, loc=None, attempts=None):
+        # One calendarByCity request returns every day of the month.
+        payload = net.get_json(
+            net.service_url("aladhan", f"/v1/calendarByCity/{year}/{month}"),
+            params=self._get_api_params(loc),
+            timeout=timeout,
+            attempts=attempts
+        ) or {}
+        data = payload.get("data", []) or []
+        days = {}
+        for day in data:
+            try:
+                greg = day["date"]["gregorian"]["date"]
+                date_key = datetime.datetime.strptime(greg, "%d-%m-%Y").strftime("%Y-%m-%d")
+            except Exception:
+                continue
+            days[date_key] = day
+        return days
+
+    def _get_timetable_profile(self, loc=None):
+        loc = loc or self._active_location()
+        method_id = self._get_calc_method(loc)
+        return (
+            self._get_location_key(loc),
+            method_id,
+            self._get_madhab_school(loc),
+            self._get_calc_method_settings(method_id) or ""
+        )
+
+    def _timetable_entry(self, profile):
+        # Caller holds _timings_lock.
+        entry = self._timings_cache.get(profile)
+        if entry is None:
+            entry = {"days": {}, "failed": {}}
+            self._timings_cache[profile] = entry
+        return entry
+
+    def _get_timetable_payload(self, target_date, timeout=10, loc=None, attempts=None):
+        # Timetable is filled a month at a time per location profile; profiles
+        # no longer configured are dropped when settings change.
+        loc = loc or self._active_location()
+        date_key = target_date.strftime("%Y-%m-%d")
+        month_key = date_key[:7]
+        profile = self._get_timetable_profile(loc)
+        with self._timings_lock:
+            entry = self._timetable_entry(profile)
+            payload = entry["days"].get(date_key)
+            if payload:
+                self._timings_stats[cache.HIT] += 1
+                return payload
+            failed_ts = entry["failed"].get(month_key)
+            if failed_ts and (time.time() - failed_ts) < 60:
+                return None
+        store = _get_cache_store()
+        payload, state = store.lookup("timings", cache.make_key(*profile, date_key))
+        self._timings_stats[state] += 1
+        if payload:
+            with self._timings_lock:
+                self._timetable_entry(profile)["days"][date_key] = payload
+            if state == cache.STALE:
+                # Same location, method and date: answer now, refresh behind.
+                _run_in_background(
+                    self._refresh_timetable_month, profile, target_date, timeout, loc,
+                    key=("refresh",) + profile + (month_key,)
+                )
+            return payload
+        # Concurrent callers for the same profile and month share one request.
+        days = self._flights.do(
+            ("month",) + profile + (month_key,),
+            self._load_timetable_month, profile, target_date, timeout, False, loc, attempts
+        )
+        return days.get(date_key)
+
+    def _refresh_timetable_month(self, profile, target_date, timeout, loc=None):
+        try:
+            self._flights.do(
+                ("month",) + profile + (target_date.strftime("%Y-%m"),),
+                self._load_timetable_month, profile, target_date, timeout, True, loc
+            )
+        except Exception:
+            try:
+                log.debugWarning("Muslimku: background timetable refresh failed.", exc_info=True)
+            except Exception:
+                pass
+
+    def _load_timetable_month(self, profile, target_date, timeout, force=False, loc=None, attempts=None):
+        date_key = target_date.strftime("%Y-%m-%d")
+        month_key = date_key[:7]
+        with self._timings_lock:
+            # A flight that finished just before this one already filled it.
+            days = self._timetable_entry(profile)["days"]
+            if not force and date_key in days:
+                return {date_key: days[date_key]}
+        store = _get_cache_store()
+        try:
+            days = self._fetch_calendar_month(
+                target_date.year, target_date.month, timeout=timeout, loc=loc, attempts=attempts
+            )
+        except Exception:
+            with self._timings_lock:
+                self._timetable_entry(profile)["failed"][month_key] = time.time()
+            raise
+        with self._timings_lock:
+            entry = self._timetable_entry(profile)
+            entry["days"].update(days)
+            entry["failed"].pop(month_key, None)
+        try:
+            store.set_many("timings", {cache.make_key(*profile, k): v for k, v in days.items()})
+        except Exception:
+            try:
+                log.debugWarning("Muslimku: failed to persist timetable month.", exc_info=True)
+            except Exception:
+                pass
+        return days
+
+    def _get_hijri_adjustment(self):
+        try:
+            return int(config.conf["muslimku"].get("hijri_adjustment", 0))
+        except Exception:
+            return 0
+
+    def _get_hijri_for_date(self, target_date):
+        # Memoized so the pre-warmed days answer without recomputing.
+        key = (target_date, self._get_hijri_adjustment())
+        hijri = self._hijri_memo.get(key)
+        if hijri is None:
+            hijri = hijricalendar.to_aladhan_dict(target_date, key[1])
+            try:
+                self._hijri_memo[key] = hijri
+                while len(self._hijri_memo) > 8:
+                    self._hijri_memo.popitem(last=False)
+            except KeyError:
+                pass
+        return hijri
+
+    def _copy_to_clipboard(self, text):
+        try:
+            if not text:
+                return False
+            # Use wx clipboard
+            if wx.TheClipboard.Open():
+                try:
+                    data = wx.TextDataObject()
+                    data.SetText(text)
+                    wx.TheClipboard.SetData(data)
+                    return True
+                finally:
+                    wx.TheClipboard.Close()
+        except Exception:
+            try:
+                # Fallback: try wx on newer API
+                cb = wx.Clipboard.Get()
+                cb.SetData(wx.TextDataObject(text))
+                return True
+            except Exception:
+                return False
+
+    def _post_ui_message(self, message):
+        try:
+            wx.CallAfter(ui.message, message)
+        except Exception:
+            ui.message(message)
+
+    def _handle_message(self, key, message):
+        try:
+            if not wx.IsMainThread():
+                wx.CallAfter(self._handle_message, key, message)
+                return
+        except Exception:
+            pass
+        with diagnostics.timed("main.handle_message"):
+            self._speak_or_copy(key, message)
+
+    def _speak_or_copy(self, key, message):
+        now = time.time()
+        last = self._last_invoke.get(key)
+        if last and (now - last.get("ts", 0) <= self._double_threshold):
+            # double-press detected: copy last message to clipboard
+            text_to_copy = last.get("msg") or message
+            copied = self._copy_to_clipboard(text_to_copy)
+            lang = config.conf["muslimku"].get("language", "en")
+            if lang == "id":
+                confirm = "Teks hasil disalin ke clipboard."
+            else:
+                confirm = "Result copied to clipboard."
+            if copied:
+                ui.message(confirm)
+            else:
+                ui.message("Failed to copy to clipboard.")
+            # reset last to avoid repeated copies on subsequent presses
+            self._last_invoke.pop(key, None)
+            return
+
+        # not a double-press: show message and record it
+        ui.message(message)
+        self._last_invoke[key] = {"ts": now, "msg": message}
+
+    @scriptHandler.script(description=GESTURE_DESC["fajr"], gesture="kb:NVDA+control+shift+1", category=UI_GESTURE_CATEGORY)
+    def script_subuh(self, gesture):
+        self.announce_prayer("Fajr")
+
+    @scriptHandler.script(description=GESTURE_DESC["dhuhr"], gesture="kb:NVDA+control+shift+2", category=UI_GESTURE_CATEGORY)
+    def script_dzuhur(self, gesture):
+        self.announce_prayer("Dhuhr")
+
+    @scriptHandler.script(description=GESTURE_DESC["asr"], gesture="kb:NVDA+control+shift+3", category=UI_GESTURE_CATEGORY)
+    def script_ashar(self, gesture):
+        self.announce_prayer("Asr")
+
+    @scriptHandler.script(description=GESTURE_DESC["maghrib"], gesture="kb:NVDA+control+shift+4", category=UI_GESTURE_CATEGORY)
+    def script_maghrib(self, gesture):
+        self.announce_prayer("Maghrib")
+
+    @scriptHandler.script(description=GESTURE_DESC["isha"], gesture="kb:NVDA+control+shift+5", category=UI_GESTURE_CATEGORY)
+    def script_isya(self, gesture):
+        self.announce_prayer("Isha")
+
+    @scriptHandler.script(description=GESTURE_DESC["next_prayer"], gesture="kb:NVDA+control+shift+w", category=UI_GESTURE_CATEGORY)
+    def script_next_prayer(self, gesture):
+        self.announce_next_prayer()
+
+    @scriptHandler.script(description=GESTURE_DESC["location"], gesture="kb:NVDA+control+shift+l", category=UI_GESTURE_CATEGORY)
+    def script_location(self, gesture):
+        self.announce_location()
+
+    @scriptHandler.script(description=GESTURE_DESC["qibla"], gesture="kb:NVDA+control+shift+q", category=UI_GESTURE_CATEGORY)
+    def script_qibla(self, gesture):
+        with self._qibla_lock:
+            if self._qibla_busy:
+                lang = config.conf["muslimku"].get("language", "en")
+                msg = (
+                    "Pemeriksaan Qiblat dari lokasi Anda, dalam proses."
+                    if lang == "id"
+                    else "Checking the Qibla from your location: in progress."
+                )
+                self._beep()
+                self._handle_message("qibla:progress", msg)
+                return
+            self._qibla_busy = True
+
+        # Known coordinates answer at once; the network is only a last resort.
+        loc = self._active_location()
+        info = None
+        try:
+            info = self._get_location_info(loc)
+        except Exception:
+            info = None
+        if info:
+            self._finish_qibla(self._get_qibla_message(info["lat"], info["lon"]))
+            return
+
+        lang = config.conf["muslimku"].get("language", "en")
+        progress_msg = (
+            "Pemeriksaan Qiblat dari lokasi Anda, dalam proses."
+            if lang == "id"
+            else "Checking the Qibla from your location: in progress."
+        )
+        self._beep()
+        self._handle_message("qibla:progress", progress_msg)
+        if not _run_in_background(self._compute_qibla_async, loc, key="qibla"):
+            with self._qibla_lock:
+                self._qibla_busy = False
+
+    def _place_prefix(self, loc):
+        # Announcements for a saved location start with its name.
+        try:
+            if locations.same_place(loc, self._primary_location()):
+                return ""
+        except Exception:
+            return ""
+        return f"{loc.name}: "
+
+    def _announce(self, task_key, build_message, failure_message="Failed to retrieve prayer time."):
+        # build_message(snapshot) -> (message_key, message) or None.
+        # A valid today snapshot is answered on the calling thread; only a
+        # real miss goes to a worker.
+        loc = self._active_location()
+        prefix = self._place_prefix(loc)
+        snapshot = self._get_today_snapshot(loc)
+        if snapshot is not None:
+            try:
+                result = build_message(snapshot)
+            except Exception:
+                result = None
+            if result:
+                self._timings_stats["snapshot"] += 1
+                self._handle_message(result[0], prefix + result[1])
+                return
+
+        def worker():
+            try:
+                snapshot = self._get_cached_snapshot(loc, interactive=True)
+                if not snapshot:
+                    self._post_ui_message(failure_message)
+                    return
+                result = build_message(snapshot)
+                if result:
+                    wx.CallAfter(self._handle_message, result[0], prefix + result[1])
+            except Exception:
+                self._post_ui_message(failure_message)
+
+        _run_in_background(worker, key=task_key)
+
+    def announce_time(self, api_key, name_en, name_id):
+        def build_message(snapshot):
+            time_str = snapshot.schedule.label_of(api_key)
+            if not time_str:
+                return None
+
+            lang = config.conf["muslimku"].get("language", "en")
+            if lang == "id":
+                message = f"Waktu {name_id} hari ini adalah pukul {time_str}."
+            else:
+                message = f"{name_en} time today: {time_str}."
+            return f"time:{api_key}", message
+
+        self._announce(f"time:{api_key}", build_message)
+
+    @scriptHandler.script(description=GESTURE_DESC["imsak"], gesture="kb:NVDA+control+shift+6", category=UI_GESTURE_CATEGORY)
+    def script_imsak(self, gesture):
+        self.announce_time("Imsak", "Imsak", "Imsak")
+
+    @scriptHandler.script(description=GESTURE_DESC["sunrise"], gesture="kb:NVDA+control+shift+7", category=UI_GESTURE_CATEGORY)
+    def script_sunrise(self, gesture):
+        self.announce_time("Sunrise", "Sunrise", "Terbit Fajar")
+
+    @scriptHandler.script(description=GESTURE_DESC["dhuha"], gesture="kb:NVDA+control+shift+8", category=UI_GESTURE_CATEGORY)
+    def script_dhuha_time(self, gesture):
+        self.announce_time("Dhuha", "Dhuha", "Dhuha")
+
+    @scriptHandler.script(description=GESTURE_DESC["sunset"], gesture="kb:NVDA+control+shift+9", category=UI_GESTURE_CATEGORY)
+    def script_sunset(self, gesture):
+        # "Sunset" is the API key for sunset/terbenam
+        self.announce_time("Sunset", "Sunset", "Matahari terbenam")
+
+    # test notification script removed per user request
+
+    @scriptHandler.script(description=GESTURE_DESC["hari"], gesture="kb:NVDA+control+shift+h", category=UI_GESTURE_CATEGORY)
+    def script_hari(self, gesture):
+        loc = self._active_location()
+
+        def build_message(snapshot):
+            return "hari", self._day_info_message(snapshot, loc)
+
+        self._announce("hari", build_message, failure_message="Failed to retrieve calendar data.")
+
+    def _day_info_message(self, snapshot, loc):
+        # Hijri dates come from the memo the pre-warm fills, so this runs on
+        # the calling thread.
+        resp_data = snapshot.payload
+        date_info = resp_data.get("date", {})
+        greg = date_info.get("gregorian", {})
+        now_loc = self._get_location_now(resp_data, loc)
+        hijri = self._get_hijri_for_date(now_loc.date())
+
+        # If local time is past Maghrib for the configured location, advance Hijri day
+        try:
+            maghrib_ts = snapshot.schedule.time_of("Maghrib")
+            if maghrib_ts is not None and now_loc.timestamp() >= maghrib_ts:
+                hijri = self._get_hijri_for_date(now_loc.date() + datetime.timedelta(days=1))
+        except Exception:
+            pass
+
+        hijri_day = hijri.get("day")
+        hijri_year = hijri.get("year")
+        hijri_month_number = int(hijri.get("month", {}).get("number", 1))
+
+        # Mapping bulan Hijriyah berdasarkan nomor (bukan string API)
+        hijri_month_map_id = {
+            1: "Muharram",
+            2: "Safar",
+            3: "Rabiul Awal",
+            4: "Rabiul Akhir",
+            5: "Jumadil Awal",
+            6: "Jumadil Akhir",
+            7: "Rajab",
+            8: "Sya'ban",
+            9: "Ramadan",
+            10: "Syawal",
+            11: "Zulkaidah",
+            12: "Zulhijah"
+        }
+
+        hijri_month_id = hijri_month_map_id.get(
+            hijri_month_number,
+            hijri["month"]["en"]
+        )
+
+        greg_day = greg["day"]
+        greg_month = greg["month"]["en"]
+        greg_year = greg["year"]
+        weekday_en = greg["weekday"]["en"]
+
+        hari_map = {
+            "Monday": "Senin",
+            "Tuesday": "Selasa",
+            "Wednesday": "Rabu",
+            "Thursday": "Kamis",
+            "Friday": "Jumat",
+            "Saturday": "Sabtu",
+            "Sunday": "Minggu"
+        }
+
+        bulan_map = {
+            "January": "Januari",
+            "February": "Februari",
+            "March": "Maret",
+            "April": "April",
+            "May": "Mei",
+            "June": "Juni",
+            "July": "Juli",
+            "August": "Agustus",
+            "September": "September",
+            "October": "Oktober",
+            "November": "November",
+            "December": "Desember"
+        }
+
+        date_obj = datetime.datetime(
+            int(greg_year),
+            int(greg["month"]["number"]),
+            int(greg_day)
+        )
+
+        base_date = datetime.datetime(2024, 1, 1)
+        selisih = (date_obj - base_date).days
+        pasaran_list = ["Legi", "Pahing", "Pon", "Wage", "Kliwon"]
+        pasaran = pasaran_list[selisih % 5]
+
+        lang = config.conf["muslimku"]["language"]
+        country = loc.country
+
+        # Only include Javanese pasaran when country is Indonesia
+        include_pasaran = (country == "Indonesia")
+
+        if lang == "id":
+            # Indonesian message: include pasaran only for Indonesia
+            if include_pasaran:
+                message = (
+                    f"{hari_map.get(weekday_en, weekday_en)} {pasaran}, "
+                    f"{hijri_day} {hijri_month_id} {hijri_year} Hijriyah/"
+                    f"{greg_day} {bulan_map.get(greg_month, greg_month)} {greg_year} Miladiyah."
+                )
+            else:
+                message = (
+                    f"{hari_map.get(weekday_en, weekday_en)}, "
+                    f"{hijri_day} {hijri_month_id} {hijri_year} Hijriyah/"
+                    f"{greg_day} {bulan_map.get(greg_month, greg_month)} {greg_year} Miladiyah."
+                )
+        else:
+            # English message: append pasaran note only for Indonesia
+            if include_pasaran:
+                message = (
+                    f"{weekday_en}, "
+                    f"{hijri_day} {hijri['month']['en']} {hijri_year} AH/"
+                    f"{greg_day} {greg_month} {greg_year} AD. Pasaran: {pasaran}"
+                )
+            else:
+                message = (
+                    f"{weekday_en}, "
+                    f"{hijri_day} {hijri['month']['en']} {hijri_year} AH/"
+                    f"{greg_day} {greg_month} {greg_year} AD."
+                )
+
+        return message
+
+    def announce_prayer(self, prayer):
+        def build_message(snapshot):
+            time_str = snapshot.schedule.label_of(prayer)
+            if not time_str:
+                return None
+
+            lang = config.conf["muslimku"]["language"]
+
+            if lang == "id":
+                nama = {
+                    "Fajr": "Subuh",
+                    "Dhuhr": "Dzuhur",
+                    "Asr": "Ashar",
+                    "Maghrib": "Maghrib",
+                    "Isha": "Isya"
+                }.get(prayer, prayer)
+
+                message = f"Waktu {nama} hari ini: pukul {time_str}."
+            else:
+                message = f"{prayer} time today: {time_str}."
+
+            return f"prayer:{prayer}", message
+
+        self._announce(f"prayer:{prayer}", build_message)
+
+    def announce_next_prayer(self):
+        def build_message(snapshot):
+            day_schedule = snapshot.schedule
+            now_ts = time.time()
+            names = {
+                "Fajr": ("Subuh", "Fajr"),
+                "Dhuhr": ("Dzuhur", "Dhuhr"),
+                "Asr": ("Ashar", "Asr"),
+                "Maghrib": ("Maghrib", "Maghrib"),
+                "Isha": ("Isya", "Isha")
+            }
+
+            upcoming = day_schedule.next_prayer_after(now_ts)
+            if upcoming:
+                next_key, next_ts = upcoming[0], upcoming[1]
+            else:
+                # If all daily prayers have passed, next is tomorrow's Fajr,
+                # from the pre-warmed day when it is ready.
+                next_day = snapshot.next_day
+                fajr_ts = next_day.schedule.time_of("Fajr") if next_day else None
+                if fajr_ts is None:
+                    fajr_ts = day_schedule.time_of("Fajr")
+                    if fajr_ts is None:
+                        return None
+                    fajr_ts += 86400
+                next_key, next_ts = "Fajr", fajr_ts
+            next_prayer = (next_key,) + names[next_key]
+
+            total_minutes = int(max(0, next_ts - now_ts) // 60)
+            hours = total_minutes // 60
+            minutes = total_minutes % 60
+
+            lang = config.conf["muslimku"].get("language", "en")
+            if lang == "id":
+                message = (
+                    f"Menuju waktu solat berikutnya adalah Solat {next_prayer[1]}: "
+                    f"Dalam {hours} jam, dan {minutes} menit lagi."
+                )
+            else:
+                message = (
+                    f"Next prayer is {next_prayer[2]}: "
+                    f"In {hours} hours and {minutes} minutes."
+                )
+
+            return "next_prayer", message
+
+        self._announce("next_prayer", build_message)
+
+    def announce_location(self):
+        try:
+            lang = config.conf["muslimku"].get("language", "en")
+            loc = self._active_location()
+            country = loc.country
+            city = loc.city
+            province = loc.province
+            regency = loc.regency
+
+            if country == INDONESIA_COUNTRY and regency and province:
+                district = loc.district
+                village = loc.village
+                if lang == "id":
+                    prefix = "".join(
+                        f"{label} {name}, " for label, name in (("Desa/Kelurahan", village), ("Kecamatan", district)) if name
+                    )
+                    message = f"Lokasi Anda saat ini: {prefix}{regency}, Provinsi {province}, {country}."
+                else:
+                    reg_name = regency
+                    up = reg_name.upper()
+                    if up.startswith("KABUPATEN "):
+                        reg_name = f"{reg_name[10:].strip().title()} Regency"
+                    elif up.startswith("KOTA "):
+                        reg_name = f"{reg_name[5:].strip().title()} City"
+                    prefix = "".join(
+                        f"{name.title()} {label}, " for label, name in (("Village", village), ("District", district)) if name
+                    )
+                    message = f"Your current location is: {prefix}{reg_name}, {province} Province, {country}."
+            else:
+                if lang == "id":
+                    if city and country:
+                        message = f"Lokasi Anda saat ini: {city}, {country}."
+                    elif city:
+                        message = f"Lokasi Anda saat ini: {city}."
+                    else:
+                        message = "Lokasi belum diatur."
+                else:
+                    if city and country:
+                        message = f"Your current location is: {city}, {country}."
+                    elif city:
+                        message = f"Your current location is: {city}."
+                    else:
+                        message = "Location is not set yet."
+
+            self._handle_message("location", self._place_prefix(loc) + message)
+        except Exception:
+            ui.message("Failed to announce location.")
+
+    @scriptHandler.script(description=GESTURE_DESC["next_location"], gesture="kb:NVDA+control+shift+n", category=UI_GESTURE_CATEGORY)
+    def script_next_location(self, gesture):
+        self._cycle_location(1)
+
+    @scriptHandler.script(description=GESTURE_DESC["previous_location"], gesture="kb:NVDA+control+shift+b", category=UI_GESTURE_CATEGORY)
+    def script_previous_location(self, gesture):
+        self._cycle_location(-1)
+
+    def _cycle_location(self, step):
+        # Selects which location the announcement gestures speak about.
+        # Reminders keep covering every location with reminders enabled.
+        lang = config.conf["muslimku"].get("language", "en")
+        locs = self._all_locations()
+        if len(locs) < 2:
+            self._active_location_index = 0
+            ui.message(
+                "Belum ada lokasi tersimpan lainnya. Tambahkan di pengaturan Muslimku."
+                if lang == "id"
+                else "No other saved locations. Add them in Muslimku settings."
+            )
+            return
+        index = (self._active_location_index + step) % len(locs)
+        self._active_location_index = index
+        loc = locs[index]
+        # Not through _handle_message: quick repeated presses cycle, not copy.
+        if lang == "id":
+            ui.message(f"Lokasi {index + 1} dari {len(locs)}: {locations.describe(loc)}.")
+        else:
+            ui.message(f"Location {index + 1} of {len(locs)}: {locations.describe(loc)}.")
+        # Warm today's schedule so the next announcement is answered at once.
+        if self._get_today_snapshot(loc) is None:
+            _run_in_background(self._get_cached_snapshot, loc, key="location:warm")
+
+    @scriptHandler.script(description=GESTURE_DESC["imsakiyah"], gesture="kb:NVDA+control+shift+m", category=UI_GESTURE_CATEGORY)
+    def script_imsakiyah(self, gesture):
+        # A month already built for today's location opens at once.
+        loc = self._active_location()
+        snapshot = self._get_today_snapshot(loc)
+        if snapshot is not None:
+            key = self._imsakiyah_key(loc, snapshot.schedule.date)
+            rows = self._imsakiyah_memo.get(key)
+            if rows is not None:
+                self._show_imsakiyah(loc, key, snapshot.schedule.date, rows)
+                return
+        _run_in_background(self._imsakiyah_worker, loc, key="imsakiyah")
+
+    def _imsakiyah_key(self, loc, day):
+        adjustment = self._get_hijri_adjustment()
+        return self._get_timetable_profile(loc) + (adjustment,) + imsakiyah.month_for(day, adjustment)
+
+    def _imsakiyah_worker(self, loc):
+        try:
+            today = self._get_location_now(None, loc).date()
+            key = self._imsakiyah_key(loc, today)
+            rows = self._imsakiyah_memo.get(key)
+            if rows is None:
+                rows = self._imsakiyah_rows(loc, key[-2], key[-1])
+                if not rows:
+                    self._post_ui_message("Failed to retrieve prayer time.")
+                    return
+                try:
+                    self._imsakiyah_memo[key] = rows
+                    while len(self._imsakiyah_memo) > IMSAKIYAH_MEMO_SIZE:
+                        self._imsakiyah_memo.popitem(last=False)
+                except KeyError:
+                    pass
+            wx.CallAfter(self._show_imsakiyah, loc, key, today, rows)
+        except Exception:
+            try:
+                log.exception("Muslimku: failed to build the month timetable.")
+            except Exception:
+                pass
+            self._post_ui_message("Failed to retrieve prayer time.")
+
+    def _imsakiyah_rows(self, loc, year, month):
+        # The whole month in one batch: the offline engine when the location
+        # can be placed, else the monthly timetable (one calendarByCity
+        # request per Gregorian month touched, cached like the daily ones).
+        days = imsakiyah.month_days(year, month, self._get_hijri_adjustment())
+        info = self._get_location_info(loc)
+        if not info:
+            first = self._get_timetable_payload(
+                days[0][1], timeout=net.INTERACTIVE_TIMEOUT, loc=loc, attempts=net.INTERACTIVE_ATTEMPTS
+            )
+            self._remember_location_from_payload(first or {}, loc)
+            info = self._get_location_info(loc)
+        tzinfo = None
+        if info:
+            tzinfo = self._get_zoneinfo(info.get("timezone")) or datetime.datetime.now().astimezone().tzinfo
+        rows = []
+        for hijri_day, day in days:
+            if info:
+                payload = self._build_local_payload(info, day, tzinfo, loc)
+            else:
+                payload = self._get_timetable_payload(day, timeout=10, loc=loc)
+            if not payload:
+                return None
+            if tzinfo is None:
+                tzinfo = self._get_location_now(payload, loc).tzinfo
+            day_schedule = schedule.build_day_schedule(
+                ("imsakiyah", day.isoformat()),
+                payload.get("timings", {}) or {},
+                day,
+                tzinfo,
+                offsets=FIXED_PRAYER_OFFSETS,
+                reminder_offsets={}
+            )
+            rows.append((hijri_day, day, tuple(day_schedule.label_of(name) for name in imsakiyah.COLUMNS)))
+        return rows
+
+    @diagnostics.timed("main.show_imsakiyah")
+    def _show_imsakiyah(self, loc, key, today, rows):
+        lang = config.conf["muslimku"].get("language", "en")
+        is_id = lang == "id"
+        year, month = key[-2], key[-1]
+        month_name = imsakiyah.month_name(month, lang)
+        if month == imsakiyah.RAMADAN:
+            title = f"Jadwal Imsakiyah {month_name} {year} H" if is_id else f"{month_name} {year} AH Imsakiyah timetable"
+        else:
+            title = f"Jadwal Solat {month_name} {year} H" if is_id else f"{month_name} {year} AH prayer timetable"
+        method = next((label for label, method_id in CALC_METHODS.items() if method_id == loc.method), str(loc.method))
+        subtitle = f"{locations.describe(loc)}. " + (f"Metode: {method}." if is_id else f"Method: {method}.")
+        headers = ["Tanggal Hijriyah" if is_id else "Hijri date", "Tanggal Masehi" if is_id else "Gregorian date"]
+        headers.extend(REMINDER_EVENT_LABELS[name].get(lang, name) for name in imsakiyah.COLUMNS)
+        weekdays = imsakiyah.WEEKDAYS.get(lang, imsakiyah.WEEKDAYS["en"])
+        table = []
+        for hijri_day, day, labels in rows:
+            date_label = f"{hijri_day} {month_name}"
+            if day == today:
+                date_label += " (hari ini)" if is_id else " (today)"
+            table.append(
+                [date_label, f"{weekdays[day.weekday()]}, {day.strftime('%d-%m-%Y')}"]
+                + [label or "-" for label in labels]
+            )
+        try:
+            ui.browseableMessage(imsakiyah.render(title, subtitle, headers, table), title, True)
+        except Exception:
+            try:
+                log.exception("Muslimku: failed to show the month timetable.")
+            except Exception:
+                pass
+            ui.message("Failed to retrieve prayer time.")
+
+    @scriptHandler.script(description=GESTURE_DESC["diagnostics"], gesture="kb:NVDA+control+shift+i", category=UI_GESTURE_CATEGORY)
+    def script_diagnostics(self, gesture):
+        _run_in_background(self._write_diagnostics_worker, key="diagnostics")
+
+    def _write_diagnostics_worker(self):
+        try:
+            report = self.get_diagnostics()
+            text = json.dumps(report, indent=1, ensure_ascii=False, default=str)
+            path = None
+            try:
+                folder = os.path.join(globalVars.appArgs.configPath, "muslimku")
+                os.makedirs(folder, exist_ok=True)
+                path = os.path.join(folder, DIAGNOSTICS_FILE)
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(text)
+            except Exception:
+                path = None
+            try:
+                if path:
+                    log.info(f"Muslimku: diagnostics report written to {path}")
+                else:
+                    # No writable config folder: the log gets the full report.
+                    log.info(f"Muslimku diagnostics report:\n{text}")
+            except Exception:
+                pass
+            wx.CallAfter(self._handle_message, "diagnostics", self._diagnostics_summary(report, path))
+        except Exception:
+            try:
+                log.exception("Muslimku: failed to build diagnostics report.")
+            except Exception:
+                pass
+            self._post_ui_message("Failed to write diagnostics report.")
+
+    def _diagnostics_summary(self, report, path):
+        lang = config.conf["muslimku"].get("language", "en")
+        is_id = lang == "id"
+        parts = []
+        if path:
+            parts.append(f"Diagnostik disimpan ke {DIAGNOSTICS_FILE}." if is_id else f"Diagnostics saved to {DIAGNOSTICS_FILE}.")
+        else:
+            parts.append("Diagnostik ditulis ke log NVDA." if is_id else "Diagnostics written to the NVDA log.")
+        hosts = report.get("http", {}).values()
+        requests_total = sum(h.get("requests", 0) for h in hosts)
+        if requests_total:
+            worst = max((h.get("histogram", {}).get("p95_ms") or 0) for h in hosts)
+            parts.append(
+                f"{requests_total} permintaan jaringan, p95 terburuk {worst:.0f} milidetik."
+                if is_id
+                else f"{requests_total} network requests, slowest host p95 {worst:.0f} milliseconds."
+            )
+        hits = looked_up = 0
+        for counters in report.get("cache", {}).get("store", {}).values():
+            hits += counters.get(cache.HIT, 0)
+            looked_up += sum(counters.values())
+        if looked_up:
+            percent = round(100.0 * hits / looked_up)
+            parts.append(f"Cache hit {percent} persen." if is_id else f"Cache hits {percent} percent.")
+        late_ms = report.get("reminders", {}).get("lateness", {}).get("max_ms")
+        if late_ms is not None:
+            seconds = late_ms / 1000.0
+            parts.append(
+                f"Pengingat paling terlambat {seconds:.1f} detik."
+                if is_id
+                else f"Reminders late by at most {seconds:.1f} seconds."
+            )
+        main_p95 = report.get("timings_ms", {}).get("main.handle_message", {}).get("p95_ms")
+        if main_p95 is not None:
+            parts.append(f"Thread utama p95 {main_p95:.1f} milidetik." if is_id else f"Main thread p95 {main_p95:.1f} milliseconds.")
+        return " ".join(parts)
+
+    def _beep(self):
+        try:
+            if tones:
+                tones.beep(880, 90)
+            else:
+                wx.Bell()
+        except Exception:
+            pass
+
+    def _compute_qibla_async(self, loc=None):
+        try:
+            lang = config.conf["muslimku"].get("language", "en")
+            loc = loc or self._active_location()
+            country = loc.country
+            city = loc.city
+            province = loc.province
+            regency = loc.regency
+
+            query_parts = []
+            if country == INDONESIA_COUNTRY and regency:
+                query_parts.append(loc.village)
+                query_parts.append(loc.district)
+                query_parts.append(regency)
+            elif city:
+                query_parts.append(city)
+            if province:
+                query_parts.append(province)
+            if country:
+                query_parts.append(country)
+            query = ", ".join([x for x in query_parts if x])
+
+            if not query:
+                msg = "Lokasi belum diatur." if lang == "id" else "Location is not set yet."
+                wx.CallAfter(self._finish_qibla, msg)
+                return
+
+            try:
+                store = _get_cache_store()
+                store_key = cache.make_key("nominatim", query)
+                results = store.get("geocode", store_key)
+                if not results:
+                    results = net.get_json(
+                        net.service_url("nominatim", "/search"),
+                        params={"q": query, "format": "jsonv2", "limit": 1},
+                        timeout=net.INTERACTIVE_TIMEOUT,
+                        attempts=net.INTERACTIVE_ATTEMPTS
+                    )
+                    if results:
+                        # Geocodes never change; keep them for good.
+                        store.set("geocode", store_key, [{"lat": results[0]["lat"], "lon": results[0]["lon"]}])
+            except net.OFFLINE_ERRORS:
+                msg = (
+                    "Tidak ada koneksi Internet. Hubungkan ke Internet dan coba lagi."
+                    if lang == "id"
+                    else "No Internet connection. Connect to the Internet first and try again."
+                )
+                wx.CallAfter(self._finish_qibla, msg)
+                return
+
+            if not results:
+                msg = (
+                    "Lokasi tidak ditemukan. Periksa pengaturan lokasi Anda."
+                    if lang == "id"
+                    else "Location not found. Please check your location settings."
+                )
+                wx.CallAfter(self._finish_qibla, msg)
+                return
+
+            lat = float(results[0]["lat"])
+            lon = float(results[0]["lon"])
+            tz_name = self._timezone_for_coordinates(lat, lon, loc)
+            if tz_name:
+                self._remember_location(lat, lon, tz_name, "nominatim", loc)
+            wx.CallAfter(self._finish_qibla, self._get_qibla_message(lat, lon))
+        except Exception:
+            try:
+                log.exception("Muslimku: unexpected error while checking Qibla.")
+            except Exception:
+                pass
+            lang = config.conf["muslimku"].get("language", "en")
+            msg = (
+                "Gagal memeriksa arah kiblat. Coba lagi."
+                if lang == "id"
+                else "Failed to check Qibla direction. Please try again."
+            )
+            wx.CallAfter(self._finish_qibla, msg)
+
+    def _get_qibla_message(self, lat, lon):
+        lang = config.conf["muslimku"].get("language", "en")
+        deg = int(round(self._calculate_qibla_bearing(lat, lon)))
+        dir_id, dir_en = self._direction_label_8(deg)
+        return (
+            f"Qiblat Diperoleh! Arah kiblat dari lokasi Anda adalah {deg} derajat ({dir_id})."
+            if lang == "id"
+            else f"Qibla Detected! Qibla direction from your location is {deg} degrees ({dir_en})."
+        )
+
+    def _finish_qibla(self, message):
+        try:
+            self._beep()
+            self._handle_message("qibla:result", message)
+        finally:
+            with self._qibla_lock:
+                self._qibla_busy = False
+
+    def _calculate_qibla_bearing(self, lat_deg, lon_deg):
+        kaaba_lat = math.radians(21.4225)
+        kaaba_lon = math.radians(39.8262)
+        lat = math.radians(lat_deg)
+        lon = math.radians(lon_deg)
+        dlon = kaaba_lon - lon
+        x = math.sin(dlon)
+        y = (math.cos(lat) * math.tan(kaaba_lat)) - (math.sin(lat) * math.cos(dlon))
+        brng = math.degrees(math.atan2(x, y))
+        return (brng + 360.0) % 360.0
+
+    def _direction_label_8(self, bearing):
+        dirs_id = ["utara", "timur laut", "timur", "tenggara", "selatan", "barat daya", "barat", "barat laut"]
+        dirs_en = ["north", "northeast", "east", "southeast", "south", "southwest", "west", "northwest"]
+        idx = int((bearing + 22.5) // 45) % 8
+        return dirs_id[idx], dirs_en[idx]
@@ -0,0 +1,248 @@
+# Persistent cache for network results.
+# Backed by SQLite (WAL mode) when available, otherwise an in-memory store with
+# the same behaviour. Values are JSON documents grouped in namespaces, each
+# with its own time-to-live; the whole store is kept under a byte budget by
+# evicting least recently used entries. Reads do not write: access times are
+# kept in memory and written in one batch every few minutes, before an
+# eviction and on close.
+import collections
+import json
+import os
+import threading
+import time
+
+# Seconds; None means the entry never expires.
+NAMESPACE_TTLS = {
+    "timings": 45 * 86400,
+    "hijri": 400 * 86400,
+    "geocode": None,
+    "regions": 30 * 86400,
+}
+DEFAULT_TTL = 86400
+# Lookup outcomes; a stale entry is past its TTL but still stored.
+HIT = "hit"
+STALE = "stale"
+MISS = "miss"
+DEFAULT_BUDGET_BYTES = 4 * 1024 * 1024
+# Seconds between writes of the access times collected by reads.
+ACCESS_FLUSH_SECONDS = 300
+
+
+def make_key(*parts):
+    return "|".join(str(p if p is not None else "").strip().lower() for p in parts)
+
+
+class PersistentCache(object):
+
+    def __init__(self, path=None, budget_bytes=DEFAULT_BUDGET_BYTES, ttls=None):
+        self.path = path
+        self.budget_bytes = int(budget_bytes)
+        self.ttls = dict(NAMESPACE_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._memory = {}
+        # (ns, key) -> last read time, not yet written to the database.
+        self._accessed = {}
+        self._accessed_flushed = time.monotonic()
+        self._counters = collections.defaultdict(collections.Counter)
+        if path:
+            try:
+                self._conn = self._open(path)
+            except Exception:
+                self._conn = None
+
+    @property
+    def persistent(self):
+        return self._conn is not None
+
+    def _open(self, path):
+        # Imported here: the store is only opened on the first cache access.
+        import sqlite3
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "ns TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "size INTEGER NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL, "
+            "PRIMARY KEY (ns, key))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        return conn
+
+    def _ttl(self, ns):
+        return self.ttls.get(ns, DEFAULT_TTL)
+
+    def get_with_age(self, ns, key):
+        # Returns (value, age_seconds) regardless of TTL, or (None, None).
+        now = time.time()
+        with self._lock:
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, created FROM entries WHERE ns=? AND key=?", (ns, key)
+                ).fetchone()
+                if not row:
+                    return None, None
+                self._accessed[(ns, key)] = now
+                if time.monotonic() - self._accessed_flushed >= ACCESS_FLUSH_SECONDS:
+                    self._flush_accessed_locked()
+                raw, created = row
+            else:
+                entry = self._memory.get((ns, key))
+                if not entry:
+                    return None, None
+                entry["accessed"] = now
+                raw, created = entry["value"], entry["created"]
+        try:
+            return json.loads(raw), max(0.0, now - created)
+        except Exception:
+            return None, None
+
+    def lookup(self, ns, key):
+        # Returns (value, HIT | STALE | MISS); stale values are still returned
+        # so callers can answer at once and refresh in the background.
+        value, age = self.get_with_age(ns, key)
+        if value is None:
+            state = MISS
+        else:
+            ttl = self._ttl(ns)
+            state = STALE if ttl is not None and age > ttl else HIT
+        with self._lock:
+            self._counters[ns][state] += 1
+        return value, state
+
+    def get(self, ns, key):
+        value, state = self.lookup(ns, key)
+        return value if state == HIT else None
+
+    def counters(self):
+        with self._lock:
+            return {ns: dict(c) for ns, c in self._counters.items()}
+
+    def set(self, ns, key, value):
+        self.set_many(ns, {key: value})
+
+    def set_many(self, ns, items):
+        now = time.time()
+        rows = []
+        for key, value in items.items():
+            raw = json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+            rows.append((ns, key, raw, len(raw.encode("utf-8")), now, now))
+        if not rows:
+            return
+        with self._lock:
+            for row in rows:
+                self._accessed.pop((ns, row[1]), None)
+            if self._conn is not None:
+                self._conn.execute("BEGIN")
+                try:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO entries (ns, key, value, size, created, accessed) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        rows
+                    )
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            else:
+                for ns_, key, raw, size, created, accessed in rows:
+                    self._memory[(ns_, key)] = {
+                        "value": raw, "size": size, "created": created, "accessed": accessed
+                    }
+            self._evict_locked()
+
+    def delete(self, ns, key):
+        with self._lock:
+            self._accessed.pop((ns, key), None)
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM entries WHERE ns=? AND key=?", (ns, key))
+            else:
+                self._memory.pop((ns, key), None)
+
+    def clear(self, ns=None):
+        with self._lock:
+            if ns is None:
+                self._accessed.clear()
+            else:
+                for k in [k for k in self._accessed if k[0] == ns]:
+                    del self._accessed[k]
+            if self._conn is not None:
+                if ns is None:
+                    self._conn.execute("DELETE FROM entries")
+                else:
+                    self._conn.execute("DELETE FROM entries WHERE ns=?", (ns,))
+            elif ns is None:
+                self._memory.clear()
+            else:
+                for k in [k for k in self._memory if k[0] == ns]:
+                    del self._memory[k]
+
+    def total_bytes(self):
+        with self._lock:
+            return self._total_bytes_locked()
+
+    def _total_bytes_locked(self):
+        if self._conn is not None:
+            row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+            return int(row[0])
+        return sum(e["size"] for e in self._memory.values())
+
+    def _flush_accessed_locked(self):
+        self._accessed_flushed = time.monotonic()
+        if not self._accessed or self._conn is None:
+            self._accessed.clear()
+            return
+        rows = [(accessed, ns, key) for (ns, key), accessed in self._accessed.items()]
+        self._accessed.clear()
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany("UPDATE entries SET accessed=? WHERE ns=? AND key=?", rows)
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _evict_locked(self):
+        total = self._total_bytes_locked()
+        if total <= self.budget_bytes:
+            return
+        # Trim to 90% of the budget so eviction does not run on every write.
+        target = int(self.budget_bytes * 0.9)
+        if self._conn is not None:
+            # Eviction orders by access time, so pending reads count first.
+            self._flush_accessed_locked()
+            rows = self._conn.execute(
+                "SELECT ns, key, size FROM entries ORDER BY accessed ASC"
+            ).fetchall()
+            victims = []
+            for ns, key, size in rows:
+                if total <= target:
+                    break
+                victims.append((ns, key))
+                total -= size
+            self._conn.executemany("DELETE FROM entries WHERE ns=? AND key=?", victims)
+        else:
+            for k, entry in sorted(self._memory.items(), key=lambda item: item[1]["accessed"]):
+                if total <= target:
+                    break
+                del self._memory[k]
+                total -= entry["size"]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._flush_accessed_locked()
+                except Exception:
+                    pass
+                try:
+                    self._conn.close()
+                except Exception:
+                    pass
+                self._conn = None
@@ -0,0 +1,146 @@
+# Bundled offline city index for the settings panel.
+# data/cities.bin holds one zlib compressed block per country (GeoNames
+# cities1000, CC BY 4.0) built by tools/build_cities.py. Each block is sorted
+# by normalized name, so the display order and the bisect order are the same
+# and prefix search is two bisections over one list. Blocks are only read and
+# decompressed the first time a country is requested.
+import os
+import struct
+import sys
+import threading
+import zlib
+from array import array
+
+try:
+    from . import gazetteer
+except ImportError:
+    import gazetteer
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "cities.bin")
+MAGIC = b"MKCI"
+VERSION = 1
+# magic, version, reserved, countries
+HEADER = struct.Struct("<4sHHI")
+# country code, rows, block offset, block bytes
+ENTRY = struct.Struct("<2sIII")
+# Coordinates are stored as int16 hundredths of a degree (about 1 km).
+COORD_SCALE = 100
+
+normalize_name = gazetteer.normalize_name
+
+
+class CountryCities(object):
+
+    def __init__(self, code, names, lat, lon):
+        self.code = code
+        self.names = names
+        self.keys = [normalize_name(n) for n in names]
+        self._lat = lat
+        self._lon = lon
+
+    def __len__(self):
+        return len(self.names)
+
+    def _lower(self, key):
+        keys = self.keys
+        lo, hi = 0, len(keys)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if keys[mid] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def search(self, prefix, limit=None):
+        # Case and accent insensitive: "sanli" finds "Şanlıurfa".
+        key = normalize_name(prefix)
+        if not key:
+            return list(self.names if limit is None else self.names[:limit])
+        start = self._lower(key)
+        # Every key starting with the prefix sorts below prefix + U+10FFFF.
+        end = self._lower(key + "\U0010ffff")
+        if limit is not None:
+            end = min(end, start + limit)
+        return self.names[start:end]
+
+    def find(self, name):
+        key = normalize_name(name)
+        i = self._lower(key)
+        if key and i < len(self.keys) and self.keys[i] == key:
+            return gazetteer.Place(
+                self.names[i],
+                self._lat[i] / COORD_SCALE,
+                self._lon[i] / COORD_SCALE,
+                self.code,
+                None,
+            )
+        return None
+
+
+def _unpack_block(code, rows, block):
+    # int16 latitudes, int16 longitudes, then the "\n" joined names.
+    data = zlib.decompress(block)
+    size = array("h").itemsize * rows
+    lat = array("h")
+    lat.frombytes(data[:size])
+    lon = array("h")
+    lon.frombytes(data[size:2 * size])
+    if sys.byteorder != "little":
+        lat.byteswap()
+        lon.byteswap()
+    names = data[2 * size:].decode("utf-8").split("\n") if rows else []
+    return CountryCities(code, names, lat, lon)
+
+
+class CityIndex(object):
+
+    def __init__(self, path=DATA_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._loaded = {}
+        with open(path, "rb") as f:
+            magic, version, _reserved, count = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("Unsupported city index file")
+            directory = f.read(ENTRY.size * count)
+        self._entries = {}
+        for i in range(count):
+            code, rows, offset, length = ENTRY.unpack_from(directory, i * ENTRY.size)
+            self._entries[code.decode("ascii")] = (rows, offset, length)
+
+    def countries(self):
+        return sorted(self._entries)
+
+    def get(self, country):
+        code = gazetteer.COUNTRY_CODES.get(country, country)
+        with self._lock:
+            cities = self._loaded.get(code)
+            if cities is not None:
+                return cities
+            entry = self._entries.get(code)
+            if entry is None:
+                return None
+            rows, offset, length = entry
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                block = f.read(length)
+            cities = _unpack_block(code, rows, block)
+            self._loaded[code] = cities
+            return cities
+
+
+_instance = None
+_instance_lock = threading.Lock()
+
+
+def get_city_index():
+    global _instance
+    with _instance_lock:
+        if _instance is None:
+            _instance = CityIndex()
+        return _instance
+
+
+def get_country(country):
+    return get_city_index().get(country)
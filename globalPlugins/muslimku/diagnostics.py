@@ -0,0 +1,128 @@
+# Cheap in-process instrumentation for the diagnostics report.
+# Histogram keeps counts in fixed millisecond buckets, so recording is a
+# bisect and two additions under a lock and memory stays constant however
+# long NVDA runs. Named histograms live in a module registry; timed() wraps
+# a block or a function and records its wall time.
+import bisect
+import functools
+import threading
+import time
+
+# Upper bounds in milliseconds; the last bucket takes everything slower.
+BUCKET_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+
+class Histogram(object):
+    __slots__ = ("_lock", "_buckets", "count", "total_ms", "min_ms", "max_ms")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = None
+
+    def observe(self, seconds):
+        ms = seconds * 1000.0
+        i = bisect.bisect_left(BUCKET_BOUNDS_MS, ms)
+        with self._lock:
+            self._buckets[i] += 1
+            self.count += 1
+            self.total_ms += ms
+            if self.min_ms is None or ms < self.min_ms:
+                self.min_ms = ms
+            if self.max_ms is None or ms > self.max_ms:
+                self.max_ms = ms
+
+    def percentile(self, fraction):
+        # Interpolated inside the bucket holding the wanted rank, clamped to
+        # the observed min and max.
+        with self._lock:
+            if not self.count:
+                return None
+            wanted = max(1, int(round(fraction * self.count)))
+            seen = 0
+            for i, n in enumerate(self._buckets):
+                if seen + n >= wanted:
+                    lower = BUCKET_BOUNDS_MS[i - 1] if i else 0.0
+                    upper = BUCKET_BOUNDS_MS[i] if i < len(BUCKET_BOUNDS_MS) else self.max_ms
+                    value = lower + (upper - lower) * (wanted - seen) / n
+                    return max(self.min_ms, min(value, self.max_ms))
+                seen += n
+        return self.max_ms
+
+    def snapshot(self):
+        p50 = self.percentile(0.5)
+        p95 = self.percentile(0.95)
+        with self._lock:
+            if not self.count:
+                return {"count": 0}
+            buckets = {}
+            for i, n in enumerate(self._buckets):
+                if n:
+                    label = f"<={BUCKET_BOUNDS_MS[i]}" if i < len(BUCKET_BOUNDS_MS) else f">{BUCKET_BOUNDS_MS[-1]}"
+                    buckets[label] = n
+            return {
+                "count": self.count,
+                "mean_ms": round(self.total_ms / self.count, 2),
+                "min_ms": round(self.min_ms, 2),
+                "p50_ms": round(p50, 2),
+                "p95_ms": round(p95, 2),
+                "max_ms": round(self.max_ms, 2),
+                "buckets_ms": buckets,
+            }
+
+
+_histograms = {}
+_lock = threading.Lock()
+
+
+def histogram(name):
+    with _lock:
+        h = _histograms.get(name)
+        if h is None:
+            h = Histogram()
+            _histograms[name] = h
+        return h
+
+
+def observe(name, seconds):
+    histogram(name).observe(seconds)
+
+
+class timed(object):
+    # with timed("name"): ...   or   @timed("name") on a function.
+
+    def __init__(self, name):
+        self.name = name
+        self._started = threading.local()
+
+    def __enter__(self):
+        self._started.value = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self._started.value)
+        return False
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(self.name, time.perf_counter() - started)
+        return wrapper
+
+
+def snapshot():
+    with _lock:
+        items = list(_histograms.items())
+    return {name: h.snapshot() for name, h in sorted(items)}
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
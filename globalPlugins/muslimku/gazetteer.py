@@ -0,0 +1,225 @@
+# Bundled offline gazetteer.
+# data/gazetteer.bin is a packed, memory-mapped table of cities (GeoNames,
+# CC BY 4.0) built by tools/build_gazetteer.py. Rows are ordered by a one
+# degree grid cell so nearest-city queries only scan neighbouring cells, and a
+# separate permutation orders rows by normalized name for bisect lookups.
+import collections
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import unicodedata
+from array import array
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gazetteer.bin")
+MAGIC = b"MKGZ"
+VERSION = 1
+# magic, version, order typecode flag (0 = "H", 1 = "I"), rows, names bytes, meta bytes
+HEADER = struct.Struct("<4sHHIII")
+EARTH_RADIUS_KM = 6371.0088
+
+# Keys match the COUNTRIES list shown in the settings panel.
+COUNTRY_CODES = {
+    "Afghanistan": "AF", "Albania": "AL", "Algeria": "DZ", "Argentina": "AR",
+    "Australia": "AU", "Austria": "AT", "Bangladesh": "BD", "Belgium": "BE",
+    "Brazil": "BR", "Brunei": "BN", "Canada": "CA", "China": "CN",
+    "Egypt": "EG", "France": "FR", "Germany": "DE", "India": "IN",
+    "Indonesia": "ID", "Italy": "IT", "Japan": "JP", "Malaysia": "MY",
+    "Netherlands": "NL", "Pakistan": "PK", "Saudi Arabia": "SA",
+    "Singapore": "SG", "South Africa": "ZA", "Thailand": "TH",
+    "Turkey": "TR", "United Kingdom": "GB", "United States": "US",
+}
+
+Place = collections.namedtuple("Place", ("name", "lat", "lon", "country", "timezone"))
+
+
+# Plain ASCII names (most of the data) skip the Unicode decomposition.
+_ASCII_SEPARATORS = {i: " " for i in range(128) if not chr(i).isalnum()}
+
+
+def normalize_name(name):
+    # Case and accent insensitive key: "Şanlıurfa" and "sanliurfa" compare equal.
+    text = str(name or "")
+    if text.isascii():
+        return " ".join(text.translate(_ASCII_SEPARATORS).lower().split())
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    text = text.replace("ı", "i")
+    text = "".join(c if c.isalnum() else " " for c in text)
+    return " ".join(text.split())
+
+
+def grid_cell(lat, lon):
+    row = min(179, max(0, int(math.floor(lat)) + 90))
+    col = min(359, max(0, int(math.floor(lon)) + 180))
+    return row * 360 + col
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    p1 = math.radians(lat1)
+    p2 = math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _view(buf, offset, typecode, count):
+    size = array(typecode).itemsize * count
+    view = memoryview(buf)[offset:offset + size]
+    if sys.byteorder == "little":
+        return view.cast(typecode), offset + size
+    values = array(typecode)
+    values.frombytes(view.tobytes())
+    values.byteswap()
+    return values, offset + size
+
+
+class Gazetteer(object):
+
+    def __init__(self, path=DATA_FILE):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, order_flag, rows, names_len, meta_len = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Unsupported gazetteer file")
+        offset = HEADER.size
+        meta = json.loads(bytes(self._mm[offset:offset + meta_len]).decode("utf-8"))
+        offset += meta_len
+        self.countries = meta["countries"]
+        self.timezones = meta["timezones"]
+        self.rows = rows
+        self._lat, offset = _view(self._mm, offset, "f", rows)
+        self._lon, offset = _view(self._mm, offset, "f", rows)
+        self._country, offset = _view(self._mm, offset, "B", rows)
+        self._tz, offset = _view(self._mm, offset, "B", rows)
+        self._name_offsets, offset = _view(self._mm, offset, "I", rows + 1)
+        self._order, offset = _view(self._mm, offset, "I" if order_flag else "H", rows)
+        self._names = memoryview(self._mm)[offset:offset + names_len]
+
+    def __len__(self):
+        return self.rows
+
+    def name(self, i):
+        return bytes(self._names[self._name_offsets[i]:self._name_offsets[i + 1]]).decode("utf-8")
+
+    def place(self, i):
+        return Place(
+            self.name(i),
+            float(self._lat[i]),
+            float(self._lon[i]),
+            self.countries[self._country[i]],
+            self.timezones[self._tz[i]],
+        )
+
+    def _country_index(self, country):
+        if not country:
+            return None
+        code = COUNTRY_CODES.get(country, country)
+        try:
+            return self.countries.index(code)
+        except ValueError:
+            return -1
+
+    def find(self, name, country=None):
+        # Exact match on the normalized name; most populous row wins ties.
+        key = normalize_name(name)
+        if not key:
+            return None
+        cidx = self._country_index(country)
+        if cidx == -1:
+            return None
+        order = self._order
+        lo, hi = 0, self.rows
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if normalize_name(self.name(order[mid])) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        while lo < self.rows:
+            i = order[lo]
+            if normalize_name(self.name(i)) != key:
+                break
+            if cidx is None or self._country[i] == cidx:
+                return self.place(i)
+            lo += 1
+        return None
+
+    def _cell_range(self, cell_lo, cell_hi):
+        # Rows are sorted by grid cell, so each band of cells is contiguous.
+        lat, lon = self._lat, self._lon
+        lo, hi = 0, self.rows
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if grid_cell(lat[mid], lon[mid]) < cell_lo:
+                lo = mid + 1
+            else:
+                hi = mid
+        start = lo
+        hi = self.rows
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if grid_cell(lat[mid], lon[mid]) <= cell_hi:
+                lo = mid + 1
+            else:
+                hi = mid
+        return start, lo
+
+    def _scan(self, lat, lon, radius, cidx):
+        best = None
+        row0 = min(179, max(0, int(math.floor(lat)) + 90))
+        col0 = min(359, max(0, int(math.floor(lon)) + 180))
+        lon_radius = int(math.ceil(radius / max(0.05, math.cos(math.radians(min(89.0, abs(lat)) + radius)))))
+        lon_radius = min(lon_radius, 180)
+        for row in range(max(0, row0 - radius), min(179, row0 + radius) + 1):
+            spans = []
+            first, last = col0 - lon_radius, col0 + lon_radius
+            if first < 0:
+                spans.append((first + 360, 359))
+                first = 0
+            if last > 359:
+                spans.append((0, last - 360))
+                last = 359
+            spans.append((first, last))
+            for c_lo, c_hi in spans:
+                start, end = self._cell_range(row * 360 + c_lo, row * 360 + c_hi)
+                for i in range(start, end):
+                    if cidx is not None and self._country[i] != cidx:
+                        continue
+                    d = distance_km(lat, lon, self._lat[i], self._lon[i])
+                    if best is None or d < best[0]:
+                        best = (d, i)
+        return best
+
+    def nearest(self, lat, lon, country=None, max_radius=16):
+        cidx = self._country_index(country)
+        if cidx == -1:
+            return None
+        radius = 1
+        while radius <= max_radius:
+            best = self._scan(lat, lon, radius, cidx)
+            if best is not None:
+                # One more ring guarantees nothing closer sits just outside.
+                wider = self._scan(lat, lon, radius + 1, cidx)
+                if wider is not None and wider[0] < best[0]:
+                    best = wider
+                return self.place(best[1])
+            radius *= 2
+        return None
+
+
+_instance = None
+_instance_lock = threading.Lock()
+
+
+def get_gazetteer():
+    global _instance
+    with _instance_lock:
+        if _instance is None:
+            _instance = Gazetteer()
+        return _instance
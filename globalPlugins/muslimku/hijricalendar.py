@@ -0,0 +1,137 @@
+# Offline Hijri calendar.
+# Umm al-Qura month lengths for 1343-1500 AH are packed two bits per month
+# (length - 28, first month in the high bits), six hex digits per year. The
+# table is derived from the hijridate project (MIT licence, Mohammed
+# Alshehri). Dates outside that range use the arithmetical (tabular) calendar,
+# shifted to meet the table's first and last month so no month at the seams
+# comes out shorter than 29 days.
+import datetime
+import math
+
+UMM_AL_QURA_FIRST_YEAR = 1343
+UMM_AL_QURA_FIRST_DAY = datetime.date(1924, 8, 1)
+_UMM_AL_QURA_LENGTHS = (
+    "9a6a2a59999999d8a65a69695a69a5999a5c999a8e6659a69995a69999999a6696666999"
+    "9999a6599a5999999aa65969a9965999999a99999999999999999a9998a999999a999999"
+    "99999999999a999a6999999999666a66659a666666999a5a99996965a99996669a999999"
+    "6666669999999a65999a69666699999999999a59a9a5999a59999a69999999999a999a65"
+    "99999a59999a99599a9999699a65999a9966669999999a66666669a6599a666599a99966"
+    "6a665969a9965a69999999a66666669999669a66599a9996669a65969a9965a69a5966a6"
+    "6659a699996699a66599a9996669a6659aa6595aa69656a69996669a65999a66996669a6"
+    "599a69965a9a65969a6966666999966a66659a69996669a59999a66666669a59969a9659"
+    "9a999666a66599a69966669999999a6696666a65966a69659a9999669a66599a69996669"
+    "a65999a996666a59996a66665a66999666a665969a9965a6a65969a6665a6699999999a6"
+    "659a6999666a66596a9996669a65999a66665a69a59699a9659a699996699a6599a69966"
+    "66a65966a69659a6a59669a66599a669666669a6599a69965a6a65969a6965a66a59999a"
+    "66659a6999666a66599a699666699a5999a69665a6a59666a66599a9996669a59999a666"
+    "666669a5966a"
+)
+# Julian 16 July 622, first day of the tabular (civil) Islamic calendar.
+TABULAR_EPOCH_ORDINAL = 227015
+MEAN_MONTH_DAYS = 29.530588853
+
+MONTHS_EN = [
+    "Muḥarram", "Ṣafar", "Rabīʿ al-awwal", "Rabīʿ al-thānī",
+    "Jumādá al-ūlá", "Jumādá al-ākhirah", "Rajab", "Shaʿbān",
+    "Ramaḍān", "Shawwāl", "Dhū al-Qaʿdah", "Dhū al-Ḥijjah",
+]
+
+_month_starts = None
+_seam_offsets = None
+
+
+def _get_month_starts():
+    # Ordinal of the first day of every table month, plus one past the end.
+    global _month_starts
+    if _month_starts is None:
+        starts = [UMM_AL_QURA_FIRST_DAY.toordinal()]
+        for i in range(0, len(_UMM_AL_QURA_LENGTHS), 6):
+            bits = int(_UMM_AL_QURA_LENGTHS[i:i + 6], 16)
+            for shift in range(22, -1, -2):
+                starts.append(starts[-1] + 28 + ((bits >> shift) & 3))
+        _month_starts = starts
+    return _month_starts
+
+
+def _get_seam_offsets():
+    # Days added to tabular ordinals before and after the table.
+    global _seam_offsets
+    if _seam_offsets is None:
+        starts = _get_month_starts()
+        last_year = UMM_AL_QURA_FIRST_YEAR + (len(starts) - 1) // 12
+        _seam_offsets = (
+            starts[0] - _tabular_to_ordinal(UMM_AL_QURA_FIRST_YEAR, 1, 1),
+            starts[-1] - _tabular_to_ordinal(last_year, 1, 1),
+        )
+    return _seam_offsets
+
+
+def _tabular_to_ordinal(year, month, day):
+    return (
+        day + int(math.ceil(29.5 * (month - 1))) + (year - 1) * 354
+        + (3 + 11 * year) // 30 + TABULAR_EPOCH_ORDINAL - 1
+    )
+
+
+def _tabular_from_ordinal(ordinal):
+    year = (30 * (ordinal - TABULAR_EPOCH_ORDINAL) + 10646) // 10631
+    month = int(math.ceil((ordinal - 29 - _tabular_to_ordinal(year, 1, 1)) / 29.5)) + 1
+    month = max(1, min(12, month))
+    day = ordinal - _tabular_to_ordinal(year, month, 1) + 1
+    return year, month, day
+
+
+def _ordinal_to_hijri(ordinal):
+    starts = _get_month_starts()
+    if ordinal < starts[0]:
+        return _tabular_from_ordinal(ordinal - _get_seam_offsets()[0])
+    if ordinal >= starts[-1]:
+        return _tabular_from_ordinal(ordinal - _get_seam_offsets()[1])
+    # Estimate the month index from the mean lunation, then correct by a step.
+    idx = int((ordinal - starts[0]) / MEAN_MONTH_DAYS)
+    idx = min(idx, len(starts) - 2)
+    while starts[idx] > ordinal:
+        idx -= 1
+    while starts[idx + 1] <= ordinal:
+        idx += 1
+    year = UMM_AL_QURA_FIRST_YEAR + idx // 12
+    month = idx % 12 + 1
+    return year, month, ordinal - starts[idx] + 1
+
+
+def _hijri_to_ordinal(year, month, day):
+    starts = _get_month_starts()
+    idx = (year - UMM_AL_QURA_FIRST_YEAR) * 12 + (month - 1)
+    if 0 <= idx < len(starts) - 1:
+        return starts[idx] + day - 1
+    offset = _get_seam_offsets()[0 if idx < 0 else 1]
+    return _tabular_to_ordinal(year, month, day) + offset
+
+
+def gregorian_to_hijri(date, adjustment=0):
+    # adjustment shifts the result by whole days to follow local sighting.
+    return _ordinal_to_hijri(date.toordinal() + int(adjustment))
+
+
+def hijri_to_gregorian(year, month, day, adjustment=0):
+    return datetime.date.fromordinal(_hijri_to_ordinal(year, month, day) - int(adjustment))
+
+
+def month_length(year, month):
+    if month == 12:
+        next_start = _hijri_to_ordinal(year + 1, 1, 1)
+    else:
+        next_start = _hijri_to_ordinal(year, month + 1, 1)
+    return next_start - _hijri_to_ordinal(year, month, 1)
+
+
+def to_aladhan_dict(date, adjustment=0):
+    # Same keys as the "hijri" object of Aladhan responses.
+    year, month, day = gregorian_to_hijri(date, adjustment)
+    return {
+        "date": f"{day:02d}-{month:02d}-{year}",
+        "format": "DD-MM-YYYY",
+        "day": str(day),
+        "month": {"number": month, "en": MONTHS_EN[month - 1], "days": month_length(year, month)},
+        "year": str(year),
+    }
@@ -0,0 +1,69 @@
+# Month timetable (Imsakiyah): every day of one Hijri month with its times,
+# rendered as an HTML table for NVDA's browseable message, where table
+# navigation (Ctrl+Alt+arrows) reads the date with every cell.
+# During Sha'ban the table is for the coming Ramadan, as printed
+# Imsakiyah schedules are.
+import datetime
+
+try:
+    from . import hijricalendar
+except ImportError:
+    import hijricalendar
+
+COLUMNS = ("Imsak", "Fajr", "Sunrise", "Dhuhr", "Asr", "Maghrib", "Isha")
+RAMADAN = 9
+HIJRI_MONTHS = {
+    "id": (
+        "Muharram", "Safar", "Rabiul Awal", "Rabiul Akhir", "Jumadil Awal", "Jumadil Akhir",
+        "Rajab", "Sya'ban", "Ramadan", "Syawal", "Zulkaidah", "Zulhijah",
+    ),
+    "en": (
+        "Muharram", "Safar", "Rabi al-Awwal", "Rabi al-Thani", "Jumada al-Awwal", "Jumada al-Thani",
+        "Rajab", "Sha'ban", "Ramadan", "Shawwal", "Dhu al-Qadah", "Dhu al-Hijjah",
+    ),
+}
+WEEKDAYS = {
+    "id": ("Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"),
+    "en": ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"),
+}
+
+
+def month_for(day, adjustment=0):
+    # (Hijri year, month) to show on day: its own month, or Ramadan from Sha'ban.
+    year, month, _ = hijricalendar.gregorian_to_hijri(day, adjustment)
+    if month == RAMADAN - 1:
+        month = RAMADAN
+    return year, month
+
+
+def month_days(year, month, adjustment=0):
+    # [(Hijri day, Gregorian date)] for every day of the month.
+    first = hijricalendar.hijri_to_gregorian(year, month, 1, adjustment)
+    return [
+        (i + 1, first + datetime.timedelta(days=i))
+        for i in range(hijricalendar.month_length(year, month))
+    ]
+
+
+def month_name(month, lang="en"):
+    return HIJRI_MONTHS.get(lang, HIJRI_MONTHS["en"])[month - 1]
+
+
+def _escape(text):
+    return str(text).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def render(title, subtitle, headers, rows):
+    # rows: lists of cell text; the first cell is the row header.
+    parts = [f"<h1>{_escape(title)}</h1>"]
+    if subtitle:
+        parts.append(f"<p>{_escape(subtitle)}</p>")
+    parts.append("<table><thead><tr>")
+    parts.extend(f'<th scope="col">{_escape(h)}</th>' for h in headers)
+    parts.append("</tr></thead><tbody>")
+    for row in rows:
+        parts.append(f'<tr><th scope="row">{_escape(row[0])}</th>')
+        parts.extend(f"<td>{_escape(cell)}</td>" for cell in row[1:])
+        parts.append("</tr>")
+    parts.append("</tbody></table>")
+    return "".join(parts)
@@ -0,0 +1,92 @@
+# Travel itinerary: dated legs, each naming the location to use from its
+# first to its last day, both inclusive, by the computer's local date.
+# Kept as a JSON list in config.conf["muslimku"]["itinerary"]. On a travel
+# day where one leg ends and the next begins, the later leg wins.
+import collections
+import datetime
+import json
+
+try:
+    from . import locations
+except ImportError:
+    import locations
+
+MAX_LEGS = 20
+Leg = collections.namedtuple("Leg", ("start", "end", "location"))
+
+
+def _to_date(value):
+    if isinstance(value, datetime.date):
+        return value
+    try:
+        return datetime.date.fromisoformat(str(value or "").strip())
+    except ValueError:
+        return None
+
+
+def make_leg(start, end, location):
+    # None unless both dates parse and start is not after end.
+    start = _to_date(start)
+    end = _to_date(end)
+    if start is None or end is None or end < start or location is None:
+        return None
+    return Leg(start, end, location)
+
+
+def parse(text):
+    try:
+        items = json.loads(text or "[]")
+    except (TypeError, ValueError):
+        return []
+    if not isinstance(items, list):
+        return []
+    legs = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        leg = make_leg(item.get("start"), item.get("end"), locations.from_dict(item.get("location")))
+        if leg is not None:
+            legs.append(leg)
+        if len(legs) >= MAX_LEGS:
+            break
+    legs.sort(key=lambda leg: (leg.start, leg.end))
+    return legs
+
+
+def dump(legs):
+    return json.dumps(
+        [
+            {"start": leg.start.isoformat(), "end": leg.end.isoformat(), "location": locations.to_dict(leg.location)}
+            for leg in legs[:MAX_LEGS]
+        ],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+def leg_for(legs, day):
+    # legs are sorted by start, so the last match is the latest arrival.
+    found = None
+    for leg in legs:
+        if leg.start > day:
+            break
+        if leg.end >= day:
+            found = leg
+    return found
+
+
+def upcoming(legs, day):
+    # The current leg and every later one.
+    return [leg for leg in legs if leg.end >= day]
+
+
+def months(start, end):
+    # First day of every month touched by [start, end].
+    day = start.replace(day=1)
+    while day <= end:
+        yield day
+        day = (day + datetime.timedelta(days=32)).replace(day=1)
+
+
+def describe(leg):
+    return f"{leg.start.isoformat()} - {leg.end.isoformat()}: {locations.describe(leg.location)}"
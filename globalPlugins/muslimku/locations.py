@@ -0,0 +1,95 @@
+# Saved locations for multi-location announcements and reminders.
+# The primary location is the one edited in the settings panel; further
+# locations are kept as a JSON list in config.conf["muslimku"]["locations"].
+# A Location carries everything that decides a timetable, so entries that
+# differ only in name share one profile, one schedule and one set of
+# reminders.
+import collections
+import json
+
+MAX_LOCATIONS = 12
+DEFAULT_METHOD = 11
+FIELDS = (
+    "name", "country", "city", "province", "regency", "district", "village",
+    "region_code", "method", "madhab", "reminders",
+)
+Location = collections.namedtuple("Location", FIELDS)
+
+
+def make_location(name="", country="", city="", province="", regency="", district="", village="",
+                  region_code="", method=DEFAULT_METHOD, madhab="shafi", reminders=True):
+    city = str(city or "").strip()
+    try:
+        method = int(method)
+    except (TypeError, ValueError):
+        method = DEFAULT_METHOD
+    madhab = "hanafi" if str(madhab or "").strip().lower() == "hanafi" else "shafi"
+    return Location(
+        str(name or "").strip() or city,
+        str(country or "").strip(),
+        city,
+        str(province or "").strip(),
+        str(regency or "").strip(),
+        str(district or "").strip(),
+        str(village or "").strip(),
+        str(region_code or "").strip(),
+        method,
+        madhab,
+        bool(reminders),
+    )
+
+
+def from_dict(data):
+    # None when the entry cannot name a place.
+    if not isinstance(data, dict):
+        return None
+    loc = make_location(**{k: data[k] for k in FIELDS if k in data})
+    if not loc.city or not loc.country:
+        return None
+    return loc
+
+
+def to_dict(loc):
+    return dict(loc._asdict())
+
+
+def parse(text):
+    try:
+        items = json.loads(text or "[]")
+    except (TypeError, ValueError):
+        return []
+    if not isinstance(items, list):
+        return []
+    result = []
+    for item in items:
+        loc = from_dict(item)
+        if loc is not None:
+            result.append(loc)
+        if len(result) >= MAX_LOCATIONS:
+            break
+    return result
+
+
+def dump(locs):
+    return json.dumps([to_dict(loc) for loc in locs[:MAX_LOCATIONS]], ensure_ascii=False, separators=(",", ":"))
+
+
+def location_key(loc):
+    return f"{loc.city.lower()}|{loc.country.lower()}|{loc.region_code}"
+
+
+def madhab_school(loc):
+    # Aladhan school: 0 = Shafi, 1 = Hanafi
+    return 1 if loc.madhab == "hanafi" else 0
+
+
+def same_place(a, b):
+    return location_key(a) == location_key(b) and a.method == b.method and a.madhab == b.madhab
+
+
+def describe(loc):
+    # "Bandung, Indonesia"; the saved name when it differs from the city.
+    place = ", ".join(p for p in (loc.city, loc.country) if p)
+    if loc.name and loc.name.lower() != loc.city.lower():
+        return f"{loc.name} ({place})"
+    return place
@@ -0,0 +1,279 @@
+# Shared HTTP client for every network call the add-on makes.
+# One requests.Session per host keeps TCP/TLS connections alive between
+# calls, a per-host semaphore bounds concurrency, idempotent GETs are retried
+# with exponential backoff, and responses carrying ETag/Last-Modified are
+# revalidated with conditional requests so unchanged data comes back as 304.
+# requests is imported on the first request, not when NVDA loads the add-on;
+# it is by far the most expensive import of the plugin.
+import collections
+import os
+import random
+import threading
+import time
+import urllib.parse
+
+try:
+    from . import diagnostics
+except ImportError:
+    import diagnostics
+
+USER_AGENT = "muslimku-nvda-addon/1.0"
+BASE_URLS = {
+    "aladhan": "https://api.aladhan.com",
+    "nominatim": "https://nominatim.openstreetmap.org",
+    "emsifa": "https://www.emsifa.com/api-wilayah-indonesia",
+}
+# Points every service at one stand-in server, e.g. tools/fixture_server.py:
+# MUSLIMKU_API_BASE=http://127.0.0.1:8765 serves /aladhan/..., /emsifa/...
+BASE_URL_ENV = "MUSLIMKU_API_BASE"
+MAX_PER_HOST = 4
+MAX_ATTEMPTS = 3
+BACKOFF_SECONDS = 0.5
+MAX_RETRY_AFTER_SECONDS = 10.0
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+# Budget for a call someone is waiting on: one short attempt, after which the
+# caller falls back (offline engine, background retry) instead of retrying.
+INTERACTIVE_TIMEOUT = 3.5
+INTERACTIVE_ATTEMPTS = 1
+VALIDATOR_ENTRIES = 256
+LATENCY_SAMPLES = 64
+
+
+_http_error = None
+
+
+def _http_error_class():
+    global _http_error
+    if _http_error is None:
+        import requests
+
+        class HttpError(requests.exceptions.HTTPError):
+            pass
+
+        _http_error = HttpError
+    return _http_error
+
+
+def __getattr__(name):
+    # net.HttpError and net.OFFLINE_ERRORS import requests when first used.
+    # Both only matter once a request has been made, so an except clause
+    # naming them costs nothing until something is raised.
+    if name == "HttpError":
+        return _http_error_class()
+    if name == "OFFLINE_ERRORS":
+        import requests
+        return (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+_base_overrides = {}
+
+
+def set_base_url(service, url=None):
+    # Redirects one service; None restores the default.
+    if url:
+        _base_overrides[service] = url.rstrip("/")
+    else:
+        _base_overrides.pop(service, None)
+
+
+def service_url(service, path=""):
+    base = _base_overrides.get(service)
+    if not base:
+        root = os.environ.get(BASE_URL_ENV, "").strip().rstrip("/")
+        base = f"{root}/{service}" if root else BASE_URLS[service]
+    return base + path
+
+
+def _host(url):
+    return urllib.parse.urlsplit(url).netloc.lower()
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class _Host(object):
+
+    def __init__(self, max_connections):
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"})
+        self.slots = threading.BoundedSemaphore(max_connections)
+        self.latencies = collections.deque(maxlen=LATENCY_SAMPLES)
+        self.histogram = diagnostics.Histogram()
+        self.counters = collections.Counter()
+
+
+class HttpClient(object):
+
+    def __init__(self, max_per_host=MAX_PER_HOST, max_attempts=MAX_ATTEMPTS, sleep=None):
+        self.max_per_host = max_per_host
+        self.max_attempts = max_attempts
+        self._sleep = sleep or time.sleep
+        self._lock = threading.Lock()
+        self._hosts = {}
+        # (url, params) -> (etag, last_modified, parsed body), least recently used first.
+        self._validators = collections.OrderedDict()
+
+    def _get_host(self, url):
+        name = _host(url)
+        with self._lock:
+            host = self._hosts.get(name)
+            if host is None:
+                host = _Host(self.max_per_host)
+                self._hosts[name] = host
+            return host
+
+    def _validator_key(self, url, params):
+        return (url, tuple(sorted((params or {}).items())))
+
+    def _get_validator(self, key):
+        with self._lock:
+            entry = self._validators.get(key)
+            if entry is not None:
+                self._validators.move_to_end(key)
+            return entry
+
+    def _set_validator(self, key, response, data):
+        etag = response.headers.get("ETag")
+        modified = response.headers.get("Last-Modified")
+        with self._lock:
+            if not etag and not modified:
+                self._validators.pop(key, None)
+                return
+            self._validators[key] = (etag, modified, data)
+            self._validators.move_to_end(key)
+            while len(self._validators) > VALIDATOR_ENTRIES:
+                self._validators.popitem(last=False)
+
+    def _retry_delay(self, attempt, response=None):
+        delay = BACKOFF_SECONDS * (2 ** attempt) * (1 + random.random() * 0.25)
+        if response is not None:
+            try:
+                delay = max(delay, float(response.headers.get("Retry-After", 0)))
+            except (TypeError, ValueError):
+                pass
+        return min(delay, MAX_RETRY_AFTER_SECONDS)
+
+    def _within_budget(self, deadline, delay):
+        # Whether a retry after delay still leaves time for a useful attempt.
+        return deadline is None or time.perf_counter() + delay + 0.5 < deadline
+
+    def get_json(self, url, params=None, headers=None, timeout=10, attempts=None, budget=None):
+        # Returns the decoded JSON body; raises requests exceptions on failure.
+        # attempts overrides the client's retry count for this call; budget
+        # caps the seconds spent on it, attempts and backoff included.
+        import requests
+        max_attempts = attempts or self.max_attempts
+        deadline = time.perf_counter() + budget if budget else None
+        host = self._get_host(url)
+        key = self._validator_key(url, params)
+        cached = self._get_validator(key)
+        request_headers = dict(headers or {})
+        if cached:
+            if cached[0]:
+                request_headers["If-None-Match"] = cached[0]
+            if cached[1]:
+                request_headers["If-Modified-Since"] = cached[1]
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            attempt_timeout = timeout
+            if deadline is not None:
+                attempt_timeout = max(0.1, min(timeout, deadline - started))
+            response = None
+            try:
+                with host.slots:
+                    response = host.session.get(url, params=params, headers=request_headers, timeout=attempt_timeout)
+                    # Read the body while holding the slot so the connection returns to the pool.
+                    content = response.content
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                host.counters["errors"] += 1
+                attempt += 1
+                delay = self._retry_delay(attempt - 1)
+                if attempt >= max_attempts or not self._within_budget(deadline, delay):
+                    raise
+                host.counters["retries"] += 1
+                self._sleep(delay)
+                continue
+            finally:
+                elapsed = time.perf_counter() - started
+                host.latencies.append(elapsed)
+                host.histogram.observe(elapsed)
+            host.counters["requests"] += 1
+            host.counters[f"status_{response.status_code // 100}xx"] += 1
+            if response.status_code in RETRY_STATUSES and attempt + 1 < max_attempts:
+                delay = self._retry_delay(attempt, response)
+                if self._within_budget(deadline, delay):
+                    attempt += 1
+                    host.counters["retries"] += 1
+                    self._sleep(delay)
+                    continue
+            break
+        if response.status_code == 304 and cached:
+            host.counters["not_modified"] += 1
+            return cached[2]
+        if response.status_code >= 400:
+            host.counters["errors"] += 1
+            raise _http_error_class()(f"{response.status_code} for {url}", response=response)
+        data = response.json() if content else None
+        self._set_validator(key, response, data)
+        return data
+
+    def stats(self):
+        with self._lock:
+            hosts = dict(self._hosts)
+        report = {}
+        for name, host in hosts.items():
+            latencies = list(host.latencies)
+            report[name] = dict(
+                host.counters,
+                last_ms=round(latencies[-1] * 1000, 1) if latencies else None,
+                p50_ms=round(_percentile(latencies, 0.5) * 1000, 1) if latencies else None,
+                p95_ms=round(_percentile(latencies, 0.95) * 1000, 1) if latencies else None,
+                histogram=host.histogram.snapshot(),
+            )
+        return report
+
+    def close(self):
+        with self._lock:
+            hosts = list(self._hosts.values())
+            self._hosts = {}
+            self._validators.clear()
+        for host in hosts:
+            try:
+                host.session.close()
+            except Exception:
+                pass
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+def close_client():
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+def get_json(url, params=None, headers=None, timeout=10, attempts=None, budget=None):
+    return get_client().get_json(url, params=params, headers=headers, timeout=timeout, attempts=attempts, budget=budget)
@@ -0,0 +1,330 @@
+# Offline prayer time engine.
+# Solar position follows the PrayTimes.org formulation (equation of time,
+# declination, hour angle) and mirrors the method tables used by Aladhan so
+# results match the online API to the minute.
+import datetime
+import math
+
+# key: Aladhan method id
+# Angles are degrees below the horizon, strings ending in "min" are minutes
+# after the previous event (Maghrib after sunset, Isha after Maghrib).
+METHOD_PARAMS = {
+    0: {"fajr": 16, "maghrib": 4, "isha": 14, "midnight": "jafari"},
+    1: {"fajr": 18, "isha": 18},
+    2: {"fajr": 15, "isha": 15},
+    3: {"fajr": 18, "isha": 17},
+    4: {"fajr": 18.5, "isha": "90 min", "isha_ramadan": "120 min"},
+    5: {"fajr": 19.5, "isha": 17.5},
+    7: {"fajr": 17.7, "maghrib": 4.5, "isha": 14, "midnight": "jafari"},
+    8: {"fajr": 19.5, "isha": "90 min"},
+    9: {"fajr": 18, "isha": 17.5},
+    10: {"fajr": 18, "isha": "90 min"},
+    11: {"fajr": 20, "isha": 18},
+    13: {"fajr": 18, "isha": 17},
+    20: {"fajr": 20, "isha": 18},
+}
+DEFAULT_METHOD_ID = 11
+IMSAK_MINUTES_BEFORE_FAJR = 10
+TIMING_ORDER = (
+    "Fajr", "Sunrise", "Dhuhr", "Asr", "Sunset", "Maghrib", "Isha",
+    "Imsak", "Midnight", "Firstthird", "Lastthird",
+)
+
+WEEKDAYS_EN = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+MONTHS_EN = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+]
+
+
+def _is_minutes(value):
+    return isinstance(value, str) and value.strip().endswith("min")
+
+
+def _minutes(value):
+    try:
+        return float(str(value).split()[0])
+    except Exception:
+        return 0.0
+
+
+def parse_method_settings(method_settings):
+    # Aladhan "methodSettings" format: "fajr,maghrib,isha"; each part is an
+    # angle, "N min" or "null". A bare 0 for Maghrib means "at sunset".
+    params = {}
+    if not method_settings:
+        return params
+    parts = [p.strip() for p in str(method_settings).split(",")]
+    for name, raw in zip(("fajr", "maghrib", "isha"), parts):
+        if not raw or raw.lower() == "null":
+            continue
+        if _is_minutes(raw):
+            params[name] = raw
+            continue
+        try:
+            value = float(raw)
+        except ValueError:
+            continue
+        if name == "maghrib" and value == 0:
+            params[name] = "0 min"
+        else:
+            params[name] = value
+    return params
+
+
+def get_method_params(method_id, method_settings=None):
+    try:
+        method_id = int(method_id)
+    except Exception:
+        method_id = DEFAULT_METHOD_ID
+    base = METHOD_PARAMS.get(method_id)
+    if base is None:
+        base = METHOD_PARAMS[DEFAULT_METHOD_ID] if not method_settings else {}
+    params = {"maghrib": "0 min", "midnight": "standard"}
+    params.update(base)
+    params.update(parse_method_settings(method_settings))
+    params.setdefault("fajr", 18)
+    params.setdefault("isha", 17)
+    return params
+
+
+# Degree based trigonometry
+def _dsin(d):
+    return math.sin(math.radians(d))
+
+
+def _dcos(d):
+    return math.cos(math.radians(d))
+
+
+def _dtan(d):
+    return math.tan(math.radians(d))
+
+
+def _darcsin(x):
+    return math.degrees(math.asin(x))
+
+
+def _darccos(x):
+    return math.degrees(math.acos(x))
+
+
+def _darctan2(y, x):
+    return math.degrees(math.atan2(y, x))
+
+
+def _darccot(x):
+    return math.degrees(math.atan(1.0 / x))
+
+
+def _fix(a, b):
+    a = a - b * math.floor(a / b)
+    return a + b if a < 0 else a
+
+
+def _fix_angle(a):
+    return _fix(a, 360.0)
+
+
+def _fix_hour(a):
+    return _fix(a, 24.0)
+
+
+def julian_day(year, month, day):
+    if month <= 2:
+        year -= 1
+        month += 12
+    a = math.floor(year / 100)
+    b = 2 - a + math.floor(a / 4)
+    return math.floor(365.25 * (year + 4716)) + math.floor(30.6001 * (month + 1)) + day + b - 1524.5
+
+
+def sun_position(jd):
+    # Returns (declination in degrees, equation of time in hours).
+    d = jd - 2451545.0
+    g = _fix_angle(357.529 + 0.98560028 * d)
+    q = _fix_angle(280.459 + 0.98564736 * d)
+    ecl_lon = _fix_angle(q + 1.915 * _dsin(g) + 0.020 * _dsin(2 * g))
+    e = 23.439 - 0.00000036 * d
+    ra = _darctan2(_dcos(e) * _dsin(ecl_lon), _dcos(ecl_lon)) / 15.0
+    eqt = q / 15.0 - _fix_hour(ra)
+    decl = _darcsin(_dsin(e) * _dsin(ecl_lon))
+    return decl, eqt
+
+
+class _SolarDay(object):
+
+    def __init__(self, jdate, lat):
+        self.jdate = jdate
+        self.lat = lat
+
+    def mid_day(self, t):
+        eqt = sun_position(self.jdate + t)[1]
+        return _fix_hour(12 - eqt)
+
+    def sun_angle_time(self, angle, t, ccw=False):
+        decl = sun_position(self.jdate + t)[0]
+        noon = self.mid_day(t)
+        cos_h = (-_dsin(angle) - _dsin(decl) * _dsin(self.lat)) / (_dcos(decl) * _dcos(self.lat))
+        if cos_h < -1.0 or cos_h > 1.0:
+            # The sun never reaches this angle today (polar day/night).
+            return float("nan")
+        hour_angle = _darccos(cos_h) / 15.0
+        return noon + (-hour_angle if ccw else hour_angle)
+
+    def asr_time(self, factor, t):
+        decl = sun_position(self.jdate + t)[0]
+        angle = -_darccot(factor + _dtan(abs(self.lat - decl)))
+        return self.sun_angle_time(angle, t)
+
+
+def _time_diff(t1, t2):
+    return _fix_hour(t2 - t1)
+
+
+def _night_portion(angle, night):
+    return angle / 60.0 * night
+
+
+def _adjust_high_lat(time, base, angle, night, ccw):
+    # Aladhan default latitude adjustment: ANGLE_BASED.
+    # NaN (the sun never reaches the angle) is checked first: _time_diff
+    # cannot take it.
+    portion = _night_portion(angle, night)
+    if math.isnan(time):
+        return base + (-portion if ccw else portion)
+    diff = _time_diff(time, base) if ccw else _time_diff(base, time)
+    if diff > portion:
+        return base + (-portion if ccw else portion)
+    return time
+
+
+def compute_times(date, lat, lon, utc_offset_hours, method_id=DEFAULT_METHOD_ID, school=0,
+                  method_settings=None, elevation=0.0, ramadan=False):
+    # Returns local clock times as fractional hours keyed by Aladhan timing names.
+    params = get_method_params(method_id, method_settings)
+    jdate = julian_day(date.year, date.month, date.day) - lon / (15.0 * 24.0)
+    solar = _SolarDay(jdate, lat)
+    rise_set_angle = 0.833 + 0.0347 * math.sqrt(max(0.0, float(elevation)))
+
+    # Initial guesses as day portions, refined once like PrayTimes.
+    p = {"fajr": 5, "sunrise": 6, "dhuhr": 12, "asr": 13, "sunset": 18, "maghrib": 18, "isha": 18}
+    p = {k: v / 24.0 for k, v in p.items()}
+    fajr_angle = params["fajr"]
+    maghrib_param = params["maghrib"]
+    isha_param = params["isha"]
+    if ramadan and params.get("isha_ramadan"):
+        isha_param = params["isha_ramadan"]
+
+    times = {
+        "fajr": solar.sun_angle_time(fajr_angle, p["fajr"], ccw=True),
+        "sunrise": solar.sun_angle_time(rise_set_angle, p["sunrise"], ccw=True),
+        "dhuhr": solar.mid_day(p["dhuhr"]),
+        "asr": solar.asr_time(2 if int(school) == 1 else 1, p["asr"]),
+        "sunset": solar.sun_angle_time(rise_set_angle, p["sunset"]),
+        "maghrib": float("nan"),
+        "isha": float("nan"),
+    }
+    if not _is_minutes(maghrib_param):
+        times["maghrib"] = solar.sun_angle_time(float(maghrib_param), p["maghrib"])
+    if not _is_minutes(isha_param):
+        times["isha"] = solar.sun_angle_time(float(isha_param), p["isha"])
+
+    shift = float(utc_offset_hours) - lon / 15.0
+    for k in times:
+        times[k] += shift
+
+    night = _time_diff(times["sunset"], times["sunrise"])
+    times["fajr"] = _adjust_high_lat(times["fajr"], times["sunrise"], fajr_angle, night, ccw=True)
+    if not _is_minutes(isha_param):
+        times["isha"] = _adjust_high_lat(times["isha"], times["sunset"], isha_param, night, ccw=False)
+    if _is_minutes(maghrib_param):
+        times["maghrib"] = times["sunset"] + _minutes(maghrib_param) / 60.0
+    else:
+        times["maghrib"] = _adjust_high_lat(times["maghrib"], times["sunset"], maghrib_param, night, ccw=False)
+    if _is_minutes(isha_param):
+        times["isha"] = times["maghrib"] + _minutes(isha_param) / 60.0
+    times["imsak"] = times["fajr"] - IMSAK_MINUTES_BEFORE_FAJR / 60.0
+
+    if params.get("midnight") == "jafari":
+        midnight = times["sunset"] + _time_diff(times["sunset"], times["fajr"] + 24) / 2.0
+    else:
+        midnight = times["sunset"] + _time_diff(times["sunset"], times["sunrise"]) / 2.0
+    third = _time_diff(times["sunset"], times["fajr"] + 24) / 3.0
+
+    return {
+        "Fajr": times["fajr"],
+        "Sunrise": times["sunrise"],
+        "Dhuhr": times["dhuhr"],
+        "Asr": times["asr"],
+        "Sunset": times["sunset"],
+        "Maghrib": times["maghrib"],
+        "Isha": times["isha"],
+        "Imsak": times["imsak"],
+        "Midnight": midnight,
+        "Firstthird": times["sunset"] + third,
+        "Lastthird": times["sunset"] + 2 * third,
+    }
+
+
+def format_time(hours, tz_label=None):
+    if hours is None or math.isnan(hours):
+        return "-----"
+    hours = _fix_hour(hours + 0.5 / 60.0)
+    h = int(math.floor(hours))
+    m = int(math.floor((hours - h) * 60.0))
+    text = f"{h:02d}:{m:02d}"
+    if tz_label:
+        text = f"{text} ({tz_label})"
+    return text
+
+
+def utc_offset_hours(date, tzinfo):
+    if tzinfo is None:
+        return 0.0
+    noon = datetime.datetime(date.year, date.month, date.day, 12, 0, tzinfo=tzinfo)
+    offset = noon.utcoffset() or datetime.timedelta(0)
+    return offset.total_seconds() / 3600.0
+
+
+def build_day_payload(date, lat, lon, tzinfo, tz_name=None, method_id=DEFAULT_METHOD_ID, school=0,
+                      method_settings=None, ramadan=False):
+    # Builds a payload shaped like Aladhan's timingsByCity "data" object so
+    # existing consumers can read it unchanged.
+    offset = utc_offset_hours(date, tzinfo)
+    times = compute_times(
+        date, lat, lon, offset, method_id=method_id, school=school,
+        method_settings=method_settings, ramadan=ramadan
+    )
+    tz_label = None
+    if tzinfo is not None:
+        try:
+            tz_label = datetime.datetime(date.year, date.month, date.day, 12, tzinfo=tzinfo).tzname()
+        except Exception:
+            tz_label = None
+    timings = {name: format_time(times[name], tz_label) for name in TIMING_ORDER}
+    midnight_utc = datetime.datetime(date.year, date.month, date.day, tzinfo=datetime.timezone.utc)
+    gregorian = {
+        "date": date.strftime("%d-%m-%Y"),
+        "format": "DD-MM-YYYY",
+        "day": f"{date.day:02d}",
+        "weekday": {"en": WEEKDAYS_EN[date.weekday()]},
+        "month": {"number": date.month, "en": MONTHS_EN[date.month - 1]},
+        "year": str(date.year),
+    }
+    return {
+        "timings": timings,
+        "date": {
+            "readable": f"{date.day:02d} {MONTHS_EN[date.month - 1][:3]} {date.year}",
+            "timestamp": str(int(midnight_utc.timestamp())),
+            "gregorian": gregorian,
+        },
+        "meta": {
+            "latitude": float(lat),
+            "longitude": float(lon),
+            "timezone": tz_name,
+            "method": {"id": int(method_id), "params": get_method_params(method_id, method_settings)},
+            "school": "HANAFI" if int(school) == 1 else "STANDARD",
+            "source": "local",
+        },
+    }
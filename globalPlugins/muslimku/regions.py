@@ -0,0 +1,154 @@
+# Indonesian administrative regions (provinces, regencies, districts and
+# villages) from a packed, memory-mapped data/regions.bin built by
+# tools/build_regions.py. Rows are sorted by level and numeric code; because
+# the BPS codes used by the Emsifa dataset nest (11 > 1101 > 1101010 >
+# 1101010001) the children of any region form one contiguous, bisectable range.
+import collections
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "regions.bin")
+MAGIC = b"MKRG"
+VERSION = 1
+# magic, version, reserved, rows, rows per level (4), names bytes
+HEADER = struct.Struct("<4sHHIIIIII")
+
+LEVEL_PROVINCE = 0
+LEVEL_REGENCY = 1
+LEVEL_DISTRICT = 2
+LEVEL_VILLAGE = 3
+# Code width per level.
+LEVEL_DIGITS = (2, 4, 7, 10)
+CODE_DIGITS = {digits: level for level, digits in enumerate(LEVEL_DIGITS)}
+# Multiplier from a parent code to the first possible child code.
+CHILD_FACTOR = {
+    level: 10 ** (LEVEL_DIGITS[level + 1] - LEVEL_DIGITS[level]) for level in range(LEVEL_VILLAGE)
+}
+
+Region = collections.namedtuple("Region", ("id", "name", "level", "lat", "lon"))
+
+
+def _view(buf, offset, typecode, count):
+    size = array(typecode).itemsize * count
+    view = memoryview(buf)[offset:offset + size]
+    if sys.byteorder == "little":
+        return view.cast(typecode), offset + size
+    values = array(typecode)
+    values.frombytes(view.tobytes())
+    values.byteswap()
+    return values, offset + size
+
+
+def code_level(code):
+    return CODE_DIGITS.get(len(str(code)))
+
+
+class RegionStore(object):
+
+    def __init__(self, path=DATA_FILE):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header = HEADER.unpack_from(self._mm, 0)
+        magic, version, _reserved, rows = header[:4]
+        level_counts = header[4:8]
+        names_len = header[8]
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Unsupported regions file")
+        self.rows = rows
+        self._level_start = [0]
+        for count in level_counts:
+            self._level_start.append(self._level_start[-1] + count)
+        offset = HEADER.size
+        self._codes, offset = _view(self._mm, offset, "Q", rows)
+        self._lat, offset = _view(self._mm, offset, "f", rows)
+        self._lon, offset = _view(self._mm, offset, "f", rows)
+        self._name_offsets, offset = _view(self._mm, offset, "I", rows + 1)
+        self._names = memoryview(self._mm)[offset:offset + names_len]
+
+    def __len__(self):
+        return self.rows
+
+    def level_count(self, level):
+        return self._level_start[level + 1] - self._level_start[level]
+
+    def _bisect(self, code, lo, hi):
+        codes = self._codes
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if codes[mid] < code:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _region(self, i, level):
+        name = bytes(self._names[self._name_offsets[i]:self._name_offsets[i + 1]]).decode("utf-8")
+        lat = float(self._lat[i])
+        lon = float(self._lon[i])
+        return Region(
+            str(self._codes[i]).zfill(LEVEL_DIGITS[level]),
+            name,
+            level,
+            None if math.isnan(lat) else lat,
+            None if math.isnan(lon) else lon,
+        )
+
+    def get(self, code):
+        level = code_level(code)
+        if level is None:
+            return None
+        lo, hi = self._level_start[level], self._level_start[level + 1]
+        i = self._bisect(int(code), lo, hi)
+        if i < hi and self._codes[i] == int(code):
+            return self._region(i, level)
+        return None
+
+    def children(self, parent_code=None):
+        if not parent_code:
+            level = LEVEL_PROVINCE
+            start, end = self._level_start[0], self._level_start[1]
+        else:
+            parent_level = code_level(parent_code)
+            if parent_level is None or parent_level >= LEVEL_VILLAGE:
+                return []
+            level = parent_level + 1
+            factor = CHILD_FACTOR[parent_level]
+            lo, hi = self._level_start[level], self._level_start[level + 1]
+            start = self._bisect(int(parent_code) * factor, lo, hi)
+            end = self._bisect((int(parent_code) + 1) * factor, start, hi)
+        return [self._region(i, level) for i in range(start, end)]
+
+    def centroid(self, code):
+        # Walks up the hierarchy until a region with coordinates is found.
+        code = str(code or "")
+        while code:
+            region = self.get(code)
+            if region and region.lat is not None:
+                return region
+            level = code_level(code)
+            if not level:
+                break
+            code = code[:LEVEL_DIGITS[level - 1]]
+        return None
+
+
+_instance = None
+_instance_loaded = False
+_instance_lock = threading.Lock()
+
+
+def get_region_store():
+    # Returns None when the dataset is not bundled with this build.
+    global _instance, _instance_loaded
+    with _instance_lock:
+        if not _instance_loaded:
+            _instance_loaded = True
+            if os.path.isfile(DATA_FILE):
+                _instance = RegionStore()
+        return _instance
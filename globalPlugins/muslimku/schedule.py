@@ -0,0 +1,96 @@
+# Compiled per-day prayer schedule.
+# The "HH:MM (TZ)" strings of a timings payload are parsed once into integer
+# epoch seconds with the per-prayer offsets already applied. Events are kept
+# sorted by instant so "next event after t" is a bisect, and the reminder
+# trigger table (event instant minus its reminder offset) is precomputed.
+import bisect
+import datetime
+from array import array
+
+PRAYERS = ("Fajr", "Dhuhr", "Asr", "Maghrib", "Isha")
+# Announced times that are only reminded of when enabled.
+EXTRA_TIMES = ("Imsak", "Sunrise", "Dhuha", "Sunset")
+# Every event that can have a reminder, in the order of the day.
+REMINDER_EVENTS = ("Imsak", "Fajr", "Sunrise", "Dhuha", "Dhuhr", "Asr", "Sunset", "Maghrib", "Isha")
+DHUHA_AFTER_SUNRISE_MINUTES = 60
+
+
+def parse_clock(value):
+    # "04:35 (WIB)" -> (4, 35); None when unparseable.
+    try:
+        hour, minute = str(value).split()[0].split(":")[:2]
+        return int(hour), int(minute)
+    except Exception:
+        return None
+
+
+class DaySchedule(object):
+    __slots__ = (
+        "key", "date", "names", "times", "labels",
+        "prayer_times", "prayer_names", "reminders", "_by_name",
+    )
+
+    def __init__(self, key, date, events, reminder_offset_minutes=0, reminder_offsets=None):
+        # events: iterable of (name, epoch_seconds, "HH:MM").
+        # reminder_offsets: {name: minutes before} for the events to remind
+        # of; by default the five prayers with reminder_offset_minutes.
+        events = sorted(events, key=lambda e: (e[1], e[0]))
+        self.key = key
+        self.date = date
+        self.names = tuple(e[0] for e in events)
+        self.times = array("q", (e[1] for e in events))
+        self.labels = tuple(e[2] for e in events)
+        self._by_name = {name: i for i, name in enumerate(self.names)}
+        prayers = [e for e in events if e[0] in PRAYERS]
+        self.prayer_names = tuple(e[0] for e in prayers)
+        self.prayer_times = array("q", (e[1] for e in prayers))
+        # (trigger_ts, name, "HH:MM", event_ts) in event order.
+        if reminder_offsets is None:
+            reminder_offsets = dict.fromkeys(PRAYERS, reminder_offset_minutes)
+        self.reminders = tuple(
+            (e[1] - int(reminder_offsets[e[0]]) * 60, e[0], e[2], e[1])
+            for e in events if e[0] in reminder_offsets
+        )
+
+    def time_of(self, name):
+        i = self._by_name.get(name)
+        return None if i is None else self.times[i]
+
+    def label_of(self, name):
+        i = self._by_name.get(name)
+        return None if i is None else self.labels[i]
+
+    def next_after(self, ts):
+        # First event strictly after ts as (name, epoch_seconds, "HH:MM").
+        i = bisect.bisect_right(self.times, ts)
+        if i >= len(self.times):
+            return None
+        return self.names[i], self.times[i], self.labels[i]
+
+    def next_prayer_after(self, ts):
+        i = bisect.bisect_right(self.prayer_times, ts)
+        if i >= len(self.prayer_times):
+            return None
+        name = self.prayer_names[i]
+        return name, self.prayer_times[i], self.label_of(name)
+
+
+def build_day_schedule(key, timings, date, tzinfo, offsets=None, reminder_offset_minutes=0, reminder_offsets=None):
+    # offsets: minutes added to individual prayers (FIXED_PRAYER_OFFSETS).
+    offsets = offsets or {}
+    events = []
+    clocks = {}
+    for name in PRAYERS + EXTRA_TIMES:
+        clock = parse_clock(timings.get(name)) if timings.get(name) else None
+        if clock is None:
+            continue
+        clocks[name] = clock
+        when = datetime.datetime(date.year, date.month, date.day, clock[0], clock[1], tzinfo=tzinfo)
+        when += datetime.timedelta(minutes=int(offsets.get(name, 0)))
+        events.append((name, int(when.timestamp()), when.strftime("%H:%M")))
+    if "Dhuha" not in clocks and "Sunrise" in clocks:
+        sunrise = clocks["Sunrise"]
+        when = datetime.datetime(date.year, date.month, date.day, sunrise[0], sunrise[1], tzinfo=tzinfo)
+        when += datetime.timedelta(minutes=DHUHA_AFTER_SUNRISE_MINUTES)
+        events.append(("Dhuha", int(when.timestamp()), when.strftime("%H:%M")))
+    return DaySchedule(key, date, events, reminder_offset_minutes, reminder_offsets)
@@ -0,0 +1,234 @@
+# Deadline based reminder scheduler.
+# Keeps a min-heap of upcoming trigger instants and sleeps until the earliest
+# one instead of polling. The clock and wait functions are injectable so the
+# scheduler can be driven by a fake clock. merge() extends the queue from any
+# thread without a rebuild; keys already queued are skipped.
+# Each pass compares wall time against the monotonic clock. When they drift
+# apart (the clock was set or corrected) or the thread woke well after its
+# deadline (the computer slept), the queue is rebuilt at once from the last
+# pass onwards, so events in the gap are handed to on_missed instead of being
+# lost, and events already handled are not armed again after a backward jump.
+import heapq
+import threading
+import time
+
+try:
+    from . import diagnostics
+except ImportError:
+    import diagnostics
+
+GRACE_SECONDS = 120
+RETRY_SECONDS = 300
+# Wall/monotonic drift or oversleep beyond this counts as a jump or a resume.
+JUMP_SECONDS = 30
+# Events missed by more than this are dropped rather than announced late.
+CATCH_UP_SECONDS = 2 * 3600
+
+
+class ReminderScheduler(object):
+
+    def __init__(self, build_events, fire, clock=None, wait=None, grace_seconds=GRACE_SECONDS, on_error=None,
+                 monotonic=None, on_missed=None, catch_up_seconds=CATCH_UP_SECONDS):
+        # build_events(now_ts) -> (iterable of (trigger_ts, key, data), rebuild_at_ts)
+        # fire(key, data) is called once per due event; on_missed(key, data,
+        # trigger_ts, now_ts) once per event found more than grace_seconds late.
+        # A fake clock without a fake monotonic clock disables jump detection.
+        self._build_events = build_events
+        self._fire = fire
+        self._clock = clock or time.time
+        self._monotonic = monotonic or (time.monotonic if clock is None else self._clock)
+        self._wake = threading.Event()
+        self._wait = wait or self._wake.wait
+        self._stopped = False
+        self._dirty = True
+        self._heap = []
+        self._keys = set()
+        # Keys already fired or missed, pruned to the window on each rebuild.
+        self._done = set()
+        # (wall, monotonic) at the end of the last pass, and its deadline.
+        self._last_pass = None
+        self._expected_wake = None
+        # Wall time of the last pass before a forward jump or a resume.
+        self._catch_up_from = None
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._rebuild_at = 0.0
+        self.grace_seconds = grace_seconds
+        self.on_error = on_error
+        self.on_missed = on_missed
+        self.catch_up_seconds = catch_up_seconds
+        self.wakeups = 0
+        self.fired = 0
+        self.missed = 0
+        self.rebuilds = 0
+        self.merged = 0
+        self.late = 0
+        self.jumps = 0
+        self.resumes = 0
+        # How late each reminder fired compared to its trigger instant.
+        self.lateness = diagnostics.Histogram()
+
+    def rearm(self):
+        self._dirty = True
+        self._wake.set()
+
+    def merge(self, events):
+        # events: iterable of (trigger_ts, key, data), as from build_events.
+        # A key already queued takes the new data; one already fired or
+        # missed is ignored.
+        with self._pending_lock:
+            self._pending.extend(events)
+        self._wake.set()
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+
+    @property
+    def stopped(self):
+        return self._stopped
+
+    def stats(self):
+        return {
+            "wakeups": self.wakeups,
+            "fired": self.fired,
+            "missed": self.missed,
+            "rebuilds": self.rebuilds,
+            "merged": self.merged,
+            "late": self.late,
+            "jumps": self.jumps,
+            "resumes": self.resumes,
+            "pending": len(self._heap),
+            "next_deadline": self.next_deadline(),
+            "lateness": self.lateness.snapshot(),
+        }
+
+    def next_deadline(self):
+        if self._heap:
+            return min(self._heap[0][0], self._rebuild_at)
+        return self._rebuild_at
+
+    def _check_clock(self, now, mono):
+        # Rebuilds on the spot when the wall clock moved differently from the
+        # monotonic one, or the loop woke long after its deadline. A forward
+        # gap is caught up from the last pass; after a backward jump, events
+        # already handled stay in _done and are not armed again.
+        if self._last_pass is None:
+            return
+        last_wall, last_mono = self._last_pass
+        drift = (now - last_wall) - (mono - last_mono)
+        if abs(drift) > JUMP_SECONDS:
+            self.jumps += 1
+        elif self._expected_wake is not None and now - self._expected_wake > JUMP_SECONDS:
+            self.resumes += 1
+        else:
+            return
+        self._dirty = True
+        if last_wall < now:
+            self._catch_up_from = last_wall
+
+    def _rebuild(self, now):
+        self._dirty = False
+        self.rebuilds += 1
+        # The rebuild sees everything merged before it started.
+        with self._pending_lock:
+            self._pending = []
+        events, rebuild_at = self._build_events(now)
+        since = now - self.grace_seconds
+        gap_start = since
+        if self._catch_up_from is not None:
+            # The gap is caught up, back to the catch-up window; anything
+            # older in it counts as missed.
+            gap_start = self._catch_up_from
+            since = min(since, max(gap_start, now - self.catch_up_seconds))
+            self._catch_up_from = None
+        heap = []
+        keys = set()
+        seen = set()
+        for trigger_ts, key, data in events or ():
+            key = str(key)
+            seen.add(key)
+            if key in keys or key in self._done:
+                continue
+            if trigger_ts <= since:
+                if trigger_ts > gap_start:
+                    self.missed += 1
+                    self._done.add(key)
+                continue
+            keys.add(key)
+            heap.append((float(trigger_ts), key, data))
+        heapq.heapify(heap)
+        self._heap = heap
+        self._keys = keys
+        self._done &= seen
+        self._rebuild_at = float(rebuild_at) if rebuild_at else now + RETRY_SECONDS
+
+    def _drain_merged(self, now):
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        for trigger_ts, key, data in pending:
+            key = str(key)
+            if trigger_ts + self.grace_seconds <= now or key in self._done:
+                continue
+            if key in self._keys:
+                # Already queued: the merged data replaces what it carried.
+                for index, entry in enumerate(self._heap):
+                    if entry[1] == key:
+                        self._heap[index] = (entry[0], key, data)
+                        break
+                continue
+            self._keys.add(key)
+            heapq.heappush(self._heap, (float(trigger_ts), key, data))
+            self.merged += 1
+
+    def run_pending(self):
+        now = self._clock()
+        mono = self._monotonic()
+        self._check_clock(now, mono)
+        if self._dirty or now >= self._rebuild_at:
+            try:
+                self._rebuild(now)
+            except Exception:
+                self._heap = []
+                self._keys = set()
+                self._rebuild_at = now + RETRY_SECONDS
+                self._last_pass = (now, mono)
+                self._expected_wake = None
+                raise
+        if self._pending:
+            self._drain_merged(now)
+        while self._heap and self._heap[0][0] <= now:
+            trigger_ts, key, data = heapq.heappop(self._heap)
+            self._keys.discard(key)
+            self._done.add(key)
+            late = now - trigger_ts
+            if late < self.grace_seconds:
+                self.fired += 1
+                self.lateness.observe(max(0.0, late))
+                self._fire(key, data)
+            elif self.on_missed and late < self.catch_up_seconds:
+                self.late += 1
+                self.on_missed(key, data, trigger_ts, now)
+            else:
+                self.missed += 1
+        self._last_pass = (now, mono)
+        self._expected_wake = self.next_deadline()
+        return self._expected_wake - self._clock()
+
+    def run(self):
+        while not self._stopped:
+            # Cleared before the pass, so a stop() or merge() that lands
+            # after the checks below still cuts the wait short.
+            self._wake.clear()
+            try:
+                timeout = self.run_pending()
+            except Exception:
+                timeout = RETRY_SECONDS
+                if self.on_error:
+                    self.on_error()
+            if self._stopped:
+                break
+            if self._dirty or self._pending:
+                continue
+            self._wait(max(0.0, timeout))
+            self.wakeups += 1
@@ -0,0 +1,167 @@
+# Offline timezone resolution and cheap location-local clocks.
+# zone_for_coordinates() maps a point to an IANA zone without the network:
+# Indonesian regions use their province's zone (WIB/WITA/WIT), everything
+# else takes the zone of the nearest gazetteer place in the configured
+# country. get_clock() memoizes one ZoneClock per zone holding the UTC
+# offset transitions for about a year ahead, so "what time is it there" is a
+# bisect plus an addition.
+import bisect
+import datetime
+import threading
+import time
+from array import array
+
+try:
+    from . import gazetteer
+except ImportError:
+    import gazetteer
+
+# Kemendagri province code prefix -> zone. Checked longest prefix first.
+INDONESIA_PROVINCE_ZONES = {
+    "61": "Asia/Pontianak",  # Kalimantan Barat
+    "62": "Asia/Pontianak",  # Kalimantan Tengah
+    "63": "Asia/Makassar",
+    "64": "Asia/Makassar",
+    "65": "Asia/Makassar",
+    "1": "Asia/Jakarta",
+    "2": "Asia/Jakarta",
+    "3": "Asia/Jakarta",
+    "5": "Asia/Makassar",
+    "7": "Asia/Makassar",
+    "8": "Asia/Jayapura",
+    "9": "Asia/Jayapura",
+}
+CLOCK_HORIZON_SECONDS = 370 * 86400
+# Sampling step when scanning for transitions; no zone changes offset twice
+# within six hours.
+SCAN_STEP_SECONDS = 6 * 3600
+
+_zones = {}
+_clocks = {}
+_lock = threading.Lock()
+
+
+def get_zone(name):
+    # Memoized ZoneInfo lookup; None for unknown names or without zoneinfo.
+    # zoneinfo is imported on the first lookup rather than at add-on load.
+    if not name:
+        return None
+    with _lock:
+        if name in _zones:
+            return _zones[name]
+    try:
+        from zoneinfo import ZoneInfo
+        zone = ZoneInfo(name)
+    except Exception:
+        zone = None
+    with _lock:
+        _zones[name] = zone
+    return zone
+
+
+def _offset_seconds(zone, ts):
+    return int(datetime.datetime.fromtimestamp(ts, zone).utcoffset().total_seconds())
+
+
+class ZoneClock(object):
+    __slots__ = ("name", "zone", "valid_from", "valid_until", "_starts", "_offsets")
+
+    def __init__(self, name, zone, start_ts=None, horizon=CLOCK_HORIZON_SECONDS):
+        self.name = name
+        self.zone = zone
+        start = int(start_ts if start_ts is not None else time.time()) - 86400
+        end = start + horizon
+        starts = array("q", [start])
+        offsets = array("l", [_offset_seconds(zone, start)])
+        prev_ts = start
+        ts = start + SCAN_STEP_SECONDS
+        while ts <= end:
+            offset = _offset_seconds(zone, ts)
+            if offset != offsets[-1]:
+                # Bisect to the exact second the new offset starts.
+                lo, hi = prev_ts, ts
+                while hi - lo > 1:
+                    mid = (lo + hi) // 2
+                    if _offset_seconds(zone, mid) == offset:
+                        hi = mid
+                    else:
+                        lo = mid
+                starts.append(hi)
+                offsets.append(offset)
+            prev_ts = ts
+            ts += SCAN_STEP_SECONDS
+        self.valid_from = start
+        self.valid_until = end
+        self._starts = starts
+        self._offsets = offsets
+
+    def covers(self, ts):
+        return self.valid_from <= ts < self.valid_until
+
+    def offset_at(self, ts):
+        return self._offsets[bisect.bisect_right(self._starts, ts) - 1]
+
+    def transitions(self):
+        return list(zip(self._starts[1:], self._offsets[1:]))
+
+    def local_seconds(self, ts=None):
+        # Seconds since the epoch on the location's wall clock.
+        ts = time.time() if ts is None else ts
+        return ts + self.offset_at(ts)
+
+    def local_date(self, ts=None):
+        return datetime.date(1970, 1, 1) + datetime.timedelta(days=int(self.local_seconds(ts) // 86400))
+
+    def now(self, ts=None):
+        # Aware datetime in the real zone, so wall-clock arithmetic across a
+        # DST change stays correct.
+        return datetime.datetime.fromtimestamp(time.time() if ts is None else ts, self.zone)
+
+    def next_local_midnight(self, ts=None):
+        # Epoch seconds of the next wall-clock midnight, from the offset table.
+        ts = time.time() if ts is None else ts
+        local = self.local_seconds(ts)
+        midnight_local = (int(local // 86400) + 1) * 86400
+        guess = midnight_local - self.offset_at(ts)
+        return midnight_local - self.offset_at(guess)
+
+
+def get_clock(name, ts=None):
+    zone = get_zone(name)
+    if zone is None:
+        return None
+    ts = time.time() if ts is None else ts
+    with _lock:
+        clock = _clocks.get(name)
+        if clock is not None and clock.covers(ts):
+            return clock
+    clock = ZoneClock(name, zone, ts)
+    with _lock:
+        _clocks[name] = clock
+    return clock
+
+
+def indonesia_zone(region_code):
+    code = str(region_code or "").strip()
+    for length in (2, 1):
+        zone = INDONESIA_PROVINCE_ZONES.get(code[:length]) if len(code) >= 2 else None
+        if zone:
+            return zone
+    return None
+
+
+def zone_for_coordinates(lat, lon, country=None, region_code=None):
+    if region_code and gazetteer.COUNTRY_CODES.get(country, country) == "ID":
+        zone = indonesia_zone(region_code)
+        if zone:
+            return zone
+    try:
+        gaz = gazetteer.get_gazetteer()
+    except Exception:
+        return None
+    place = None
+    if country:
+        place = gaz.nearest(lat, lon, country)
+    if place is None:
+        place = gaz.nearest(lat, lon, None, max_radius=64)
+    return place.timezone if place else None
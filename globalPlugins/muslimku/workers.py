@@ -0,0 +1,204 @@
+# Concurrency helpers shared by the plugin.
+# SingleFlight coalesces concurrent calls that ask for the same thing: the
+# first caller for a key runs the function and every caller that arrives
+# while it is running waits for, and shares, that one result.
+# BoundedExecutor runs background work (hotkeys, settings panel loads) on a
+# few long-lived threads instead of a new thread per request.
+import threading
+import time
+from concurrent.futures import Future
+
+try:
+    from . import diagnostics
+except ImportError:
+    import diagnostics
+
+
+class SingleFlight(object):
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                self.calls += 1
+            else:
+                self.shared += 1
+        if not leader:
+            return future.result()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def inflight(self):
+        with self._lock:
+            return len(self._inflight)
+
+
+class QueueFull(RuntimeError):
+    pass
+
+
+class _Task(object):
+    __slots__ = ("fn", "args", "kwargs", "key", "future", "queued_at")
+
+    def __init__(self, fn, args, kwargs, key):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.key = key
+        self.future = Future()
+        self.queued_at = time.perf_counter()
+
+
+class BoundedExecutor(object):
+    # Fixed number of daemon worker threads (started on first use) fed by a
+    # bounded FIFO queue. Submitting with a key replaces a still-queued task
+    # with the same key, so a newer key press supersedes an older pending one;
+    # a task that is already running is left to finish.
+
+    def __init__(self, max_workers=3, max_queue=16, name="muslimku-worker"):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.name = name
+        self._cond = threading.Condition()
+        self._queue = []
+        self._pending = {}
+        self._threads = []
+        self._idle = 0
+        self._shutdown = False
+        self.submitted = 0
+        self.superseded = 0
+        self.rejected = 0
+        self.max_depth = 0
+        # Time tasks spent queued, and running.
+        self.wait_times = diagnostics.Histogram()
+        self.run_times = diagnostics.Histogram()
+
+    def submit(self, fn, *args, key=None, **kwargs):
+        task = _Task(fn, args, kwargs, key)
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("Executor is shut down")
+            old = self._pending.pop(key, None) if key is not None else None
+            if old is not None:
+                self._queue.remove(old)
+                old.future.cancel()
+                self.superseded += 1
+            elif len(self._queue) >= self.max_queue:
+                self.rejected += 1
+                raise QueueFull("Worker queue is full")
+            self._queue.append(task)
+            self.max_depth = max(self.max_depth, len(self._queue))
+            if key is not None:
+                self._pending[key] = task
+            self.submitted += 1
+            if self._idle == 0 and len(self._threads) < self.max_workers:
+                thread = threading.Thread(
+                    target=self._work, name=f"{self.name}-{len(self._threads) + 1}", daemon=True
+                )
+                self._threads.append(thread)
+                thread.start()
+            else:
+                self._cond.notify()
+        return task.future
+
+    def _work(self):
+        while True:
+            with self._cond:
+                self._idle += 1
+                while not self._queue and not self._shutdown:
+                    self._cond.wait()
+                self._idle -= 1
+                if not self._queue:
+                    return
+                task = self._queue.pop(0)
+                if task.key is not None and self._pending.get(task.key) is task:
+                    del self._pending[task.key]
+            if not task.future.set_running_or_notify_cancel():
+                continue
+            started = time.perf_counter()
+            self.wait_times.observe(started - task.queued_at)
+            try:
+                result = task.fn(*task.args, **task.kwargs)
+            except BaseException as e:
+                task.future.set_exception(e)
+            else:
+                task.future.set_result(result)
+            finally:
+                self.run_times.observe(time.perf_counter() - started)
+
+    def queued(self):
+        with self._cond:
+            return len(self._queue)
+
+    def stats(self):
+        with self._cond:
+            report = {
+                "threads": len(self._threads),
+                "idle": self._idle,
+                "queued": len(self._queue),
+                "max_depth": self.max_depth,
+                "submitted": self.submitted,
+                "superseded": self.superseded,
+                "rejected": self.rejected,
+            }
+        report["wait"] = self.wait_times.snapshot()
+        report["run"] = self.run_times.snapshot()
+        return report
+
+    def shutdown(self, wait=True, timeout=2.0):
+        # Drops queued work; running tasks are given up to timeout to finish.
+        with self._cond:
+            self._shutdown = True
+            for task in self._queue:
+                task.future.cancel()
+            self._queue = []
+            self._pending = {}
+            threads = list(self._threads)
+            self._cond.notify_all()
+        if wait:
+            deadline = time.monotonic() + timeout
+            for thread in threads:
+                if thread is not threading.current_thread():
+                    thread.join(max(0.0, deadline - time.monotonic()))
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = BoundedExecutor()
+        return _executor
+
+
+def shutdown_executor(wait=True, timeout=2.0):
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait, timeout=timeout)
+
+
+def submit(fn, *args, key=None, **kwargs):
+    return get_executor().submit(fn, *args, key=key, **kwargs)
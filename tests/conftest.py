@@ -0,0 +1,110 @@
+# Puts the add-on modules and the headless tooling on sys.path. Tests that
+# drive the plugin get it loaded against tools/nvda_stubs.py, with every web
+# service pointed at an in-process tools/fixture_server.py.
+import datetime
+import os
+import sys
+import time
+import types
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+sys.path.insert(0, os.path.join(ROOT, "globalPlugins", "muslimku"))
+sys.path.insert(0, os.path.join(ROOT, "globalPlugins"))
+
+import fixture_server  # noqa: E402
+import nvda_stubs  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def nvda(tmp_path_factory):
+    return nvda_stubs.install(str(tmp_path_factory.mktemp("nvda")))
+
+
+@pytest.fixture
+def muslimku(nvda):
+    import muslimku
+    return muslimku
+
+
+@pytest.fixture
+def api_server(monkeypatch):
+    # start(*fixture_server args) -> server; the server's stats count requests.
+    servers = []
+
+    def start(*argv):
+        server, base_url = fixture_server.start(["--quiet"] + list(argv), port=0)
+        servers.append(server)
+        monkeypatch.setenv("MUSLIMKU_API_BASE", base_url)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def plugin(muslimku, nvda, tmp_path, monkeypatch):
+    # A fresh plugin with its own configuration directory and cache.
+    monkeypatch.setattr(sys.modules["globalVars"].appArgs, "configPath", str(tmp_path))
+    section = nvda["muslimku"]
+    section.clear()
+    section.update({"country": "Indonesia", "city": "Jakarta", "language": "en", "locations": "[]"})
+    instance = muslimku.GlobalPlugin()
+    yield instance
+    instance.terminate()
+    nvda_stubs.pump()
+
+
+@pytest.fixture
+def online_plugin(plugin, monkeypatch):
+    # The active location is unknown offline, so timings come from Aladhan.
+    for name in ("_find_region_centroid", "_find_gazetteer_place", "_find_city_index_place"):
+        monkeypatch.setattr(plugin, name, lambda loc: None)
+    return plugin
+
+
+@pytest.fixture
+def clock(muslimku, monkeypatch):
+    # A wall clock that only moves when the test sets clock.now: time.time,
+    # datetime.now and date.today all follow it.
+    state = types.SimpleNamespace(now=time.time())
+
+    class FakeDatetime(datetime.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.datetime.fromtimestamp(state.now, tz)
+
+    class FakeDate(datetime.date):
+        @classmethod
+        def today(cls):
+            return datetime.datetime.fromtimestamp(state.now).date()
+
+    shim = types.ModuleType("datetime")
+    shim.__dict__.update(vars(datetime))
+    shim.datetime = FakeDatetime
+    shim.date = FakeDate
+    monkeypatch.setattr(muslimku, "datetime", shim)
+    monkeypatch.setattr(time, "time", lambda: state.now)
+    return state
+
+
+@pytest.fixture
+def background(muslimku, monkeypatch):
+    # Holds background work until the test runs it with background.run().
+    queued = []
+
+    def submit(fn, *args, key=None):
+        queued.append((fn, args))
+        return True
+
+    def run():
+        while queued:
+            fn, args = queued.pop(0)
+            fn(*args)
+
+    monkeypatch.setattr(muslimku, "_run_in_background", submit)
+    return types.SimpleNamespace(queued=queued, run=run)
@@ -0,0 +1,72 @@
+import cache
+
+
+def traced_store(tmp_path, **kwargs):
+    store = cache.PersistentCache(str(tmp_path / "cache.sqlite3"), **kwargs)
+    statements = []
+    store._conn.set_trace_callback(statements.append)
+    return store, statements
+
+
+def stored_accessed(path, key):
+    import sqlite3
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT accessed FROM entries WHERE key=?", (key,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_reads_do_not_write(tmp_path):
+    store, statements = traced_store(tmp_path)
+    store.set("timings", "a", {"fajr": "04:30"})
+    del statements[:]
+    for _ in range(50):
+        assert store.get("timings", "a") == {"fajr": "04:30"}
+    assert statements and all(s.lstrip().upper().startswith("SELECT") for s in statements)
+    store.close()
+
+
+def test_access_times_are_written_on_close(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.sqlite3")
+    clock = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: clock[0])
+    store = cache.PersistentCache(path)
+    store.set("timings", "a", 1)
+    clock[0] = 2000.0
+    store.get("timings", "a")
+    assert stored_accessed(path, "a") == 1000.0
+    store.close()
+    assert stored_accessed(path, "a") == 2000.0
+
+
+def test_access_times_are_written_every_few_minutes(tmp_path, monkeypatch):
+    store, statements = traced_store(tmp_path)
+    store.set("timings", "a", 1)
+    mono = [store._accessed_flushed + cache.ACCESS_FLUSH_SECONDS - 1]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: mono[0])
+    del statements[:]
+    store.get("timings", "a")
+    assert not [s for s in statements if "UPDATE" in s]
+    mono[0] += 1
+    store.get("timings", "a")
+    assert len([s for s in statements if "UPDATE" in s]) == 1
+    store.close()
+
+
+def test_eviction_counts_unwritten_reads(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: clock[0])
+    value = "x" * 400
+    store = cache.PersistentCache(str(tmp_path / "cache.sqlite3"), budget_bytes=1500)
+    for key in ("a", "b", "c"):
+        clock[0] += 1
+        store.set("timings", key, value)
+    # "a" is the oldest write but was read last, so "b" is evicted instead.
+    clock[0] += 1
+    store.get("timings", "a")
+    clock[0] += 1
+    store.set("timings", "d", value)
+    assert store.get("timings", "a") == value
+    assert store.get("timings", "b") is None
+    store.close()
@@ -0,0 +1,34 @@
+import collections
+
+import build_gazetteer
+import gazetteer
+import regions
+
+
+def _regencies():
+    store = regions.get_region_store()
+    for province in store.children(None):
+        for regency in store.children(province.id):
+            yield build_gazetteer.regency_name(regency.name), store.centroid(regency.id)
+
+
+def test_every_regency_resolves_offline():
+    gaz = gazetteer.get_gazetteer()
+    regencies = list(_regencies())
+    assert len(regencies) >= 514
+    counts = collections.Counter(gazetteer.normalize_name(name) for name, _point in regencies)
+    for name, point in regencies:
+        place = gaz.find(name, "Indonesia")
+        assert place is not None, name
+        assert place.timezone.startswith("Asia/")
+        if counts[gazetteer.normalize_name(name)] == 1:
+            # Kota and Kabupaten sharing a name resolve to the city.
+            assert gazetteer.distance_km(place.lat, place.lon, point.lat, point.lon) < 1, name
+
+
+def test_regency_is_not_matched_to_a_village_prefix():
+    gaz = gazetteer.get_gazetteer()
+    regency = gaz.find("Bolaang Mongondow", "Indonesia")
+    village = gaz.find("Bolaang", "Indonesia")
+    assert regency.name == "Bolaang Mongondow"
+    assert gazetteer.distance_km(regency.lat, regency.lon, village.lat, village.lon) > 10
@@ -0,0 +1,14 @@
+import statistics
+
+import import_budget
+
+
+def test_import_stays_lazy_and_within_budget():
+    # Fresh interpreters under tools/nvda_stubs.py, as tools/import_budget.py.
+    result = import_budget.measure(3)
+    assert result is not None
+    totals, by_module, eager = result
+    assert not eager, "imported at load time but must be lazy: " + ", ".join(sorted(eager))
+    for name in ("requests", "sqlite3", "zoneinfo"):
+        assert name in import_budget.LAZY_MODULES
+    assert statistics.median(totals) <= import_budget.DEFAULT_BUDGET_MS
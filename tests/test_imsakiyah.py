@@ -0,0 +1,64 @@
+import datetime
+
+import pytest
+
+import hijricalendar
+import imsakiyah
+
+SHABAN = imsakiyah.RAMADAN - 1
+
+
+def test_shaban_shows_the_coming_ramadan():
+    year = 1447
+    shaban_first = hijricalendar.hijri_to_gregorian(year, SHABAN, 1)
+    ramadan_first = hijricalendar.hijri_to_gregorian(year, imsakiyah.RAMADAN, 1)
+    shawwal_first = hijricalendar.hijri_to_gregorian(year, 10, 1)
+    one_day = datetime.timedelta(days=1)
+    assert imsakiyah.month_for(shaban_first - one_day) == (year, SHABAN - 1)
+    assert imsakiyah.month_for(shaban_first) == (year, imsakiyah.RAMADAN)
+    assert imsakiyah.month_for(ramadan_first - one_day) == (year, imsakiyah.RAMADAN)
+    assert imsakiyah.month_for(shawwal_first - one_day) == (year, imsakiyah.RAMADAN)
+    assert imsakiyah.month_for(shawwal_first) == (year, 10)
+    # A one-day sighting adjustment moves the switch by a day.
+    assert imsakiyah.month_for(shaban_first - one_day, adjustment=1) == (year, imsakiyah.RAMADAN)
+
+
+def check_month(year, month, adjustment=0):
+    days = imsakiyah.month_days(year, month, adjustment)
+    assert len(days) in (29, 30)
+    assert [hijri_day for hijri_day, day in days] == list(range(1, len(days) + 1))
+    for hijri_day, day in days:
+        assert hijricalendar.gregorian_to_hijri(day, adjustment) == (year, month, hijri_day)
+    following = days[-1][1] + datetime.timedelta(days=1)
+    assert hijricalendar.gregorian_to_hijri(following, adjustment)[2] == 1
+
+
+@pytest.mark.parametrize("year, month", [(1447, 9), (1447, 12), (1448, 1), (1342, 12), (1343, 1), (1500, 12), (1501, 1)])
+def test_month_days_cover_the_month(year, month):
+    check_month(year, month)
+    check_month(year, month, adjustment=-1)
+
+
+def test_months_at_the_table_seams():
+    # The tabular calendar meets the Umm al-Qura table without a short month.
+    first, last = hijricalendar.UMM_AL_QURA_FIRST_YEAR, 1500
+    for year, month in ((first - 1, 11), (first - 1, 12), (first, 1), (last, 12), (last + 1, 1)):
+        assert hijricalendar.month_length(year, month) in (29, 30), (year, month)
+    assert hijricalendar.hijri_to_gregorian(first, 1, 1) == hijricalendar.UMM_AL_QURA_FIRST_DAY
+    seam = hijricalendar.UMM_AL_QURA_FIRST_DAY
+    assert hijricalendar.gregorian_to_hijri(seam - datetime.timedelta(days=1)) == (
+        first - 1, 12, hijricalendar.month_length(first - 1, 12)
+    )
+
+
+def test_render_escapes_text():
+    html = imsakiyah.render(
+        "Imsakiyah <Ramadan> & more", "Jakarta & <sekitarnya>",
+        ("Date", "Fajr <"), [("1 Ramadan & <b>", "04:30 & <i>")],
+    )
+    assert "<b>" not in html and "<i>" not in html
+    assert "<h1>Imsakiyah &lt;Ramadan&gt; &amp; more</h1>" in html
+    assert "<p>Jakarta &amp; &lt;sekitarnya&gt;</p>" in html
+    assert '<th scope="col">Fajr &lt;</th>' in html
+    assert '<tr><th scope="row">1 Ramadan &amp; &lt;b&gt;</th><td>04:30 &amp; &lt;i&gt;</td></tr>' in html
+    assert "<p>" not in imsakiyah.render("Title", "", ("Date",), [])
@@ -0,0 +1,106 @@
+import datetime
+import json
+
+import itinerary
+import locations
+
+D = datetime.date
+
+
+def place(city, country="Indonesia"):
+    return {"name": city, "country": country, "city": city}
+
+
+def legs_json(*legs):
+    return json.dumps([{"start": start, "end": end, "location": location} for start, end, location in legs])
+
+
+def test_parse_drops_bad_legs_and_sorts():
+    text = legs_json(
+        ("2026-03-10", "2026-03-12", place("Surabaya")),
+        ("2026-03-01", "2026-03-05", place("Bandung")),
+        ("2026-03-08", "2026-03-07", place("Medan")),
+        ("not a date", "2026-03-07", place("Medan")),
+        ("2026-03-01", "2026-03-02", {"city": "Nowhere"}),
+    )
+    legs = itinerary.parse(text)
+    assert [(leg.start, leg.location.city) for leg in legs] == [(D(2026, 3, 1), "Bandung"), (D(2026, 3, 10), "Surabaya")]
+    assert itinerary.parse(itinerary.dump(legs)) == legs
+    assert itinerary.parse("{") == [] and itinerary.parse("{}") == []
+    many = legs_json(*[("2026-01-01", "2026-01-02", place("Bandung"))] * (itinerary.MAX_LEGS + 5))
+    assert len(itinerary.parse(many)) == itinerary.MAX_LEGS
+
+
+def test_leg_for_switches_at_date_boundaries():
+    legs = itinerary.parse(legs_json(
+        ("2026-03-01", "2026-03-05", place("Bandung")),
+        # Travel day: the 5th belongs to both, the later leg wins.
+        ("2026-03-05", "2026-03-08", place("Surabaya")),
+        ("2026-03-10", "2026-03-10", place("Medan")),
+    ))
+
+    def city(day):
+        leg = itinerary.leg_for(legs, day)
+        return leg.location.city if leg else None
+
+    assert city(D(2026, 2, 28)) is None
+    assert city(D(2026, 3, 1)) == "Bandung"
+    assert city(D(2026, 3, 4)) == "Bandung"
+    assert city(D(2026, 3, 5)) == "Surabaya"
+    assert city(D(2026, 3, 8)) == "Surabaya"
+    # A gap between legs and the day after the trip fall back to home.
+    assert city(D(2026, 3, 9)) is None
+    assert city(D(2026, 3, 10)) == "Medan"
+    assert city(D(2026, 3, 11)) is None
+    assert itinerary.leg_for([], D(2026, 3, 1)) is None
+
+
+def test_leg_inside_a_longer_leg():
+    legs = itinerary.parse(legs_json(
+        ("2026-03-01", "2026-03-20", place("Bandung")),
+        ("2026-03-05", "2026-03-06", place("Surabaya")),
+    ))
+    cities = [itinerary.leg_for(legs, D(2026, 3, day)).location.city for day in (4, 5, 6, 7)]
+    # The short trip wins while it lasts; the long stay covers the rest.
+    assert cities == ["Bandung", "Surabaya", "Surabaya", "Bandung"]
+
+
+def test_upcoming_and_months():
+    legs = itinerary.parse(legs_json(
+        ("2026-01-01", "2026-01-03", place("Bandung")),
+        ("2026-01-03", "2026-02-02", place("Surabaya")),
+    ))
+    assert itinerary.upcoming(legs, D(2026, 1, 3)) == legs
+    assert itinerary.upcoming(legs, D(2026, 1, 4)) == legs[1:]
+    assert itinerary.upcoming(legs, D(2026, 2, 3)) == []
+    assert list(itinerary.months(D(2025, 12, 31), D(2026, 2, 1))) == [D(2025, 12, 1), D(2026, 1, 1), D(2026, 2, 1)]
+
+
+def test_plugin_follows_the_itinerary_and_falls_back_home(plugin, nvda, clock):
+    nvda["muslimku"]["itinerary"] = legs_json(("2026-03-01", "2026-03-05", place("Bandung")))
+    for day, city in ((D(2026, 2, 28), "Jakarta"), (D(2026, 3, 1), "Bandung"), (D(2026, 3, 5), "Bandung"), (D(2026, 3, 6), "Jakarta")):
+        clock.now = datetime.datetime(day.year, day.month, day.day, 12).timestamp()
+        assert plugin._primary_location().city == city
+    nvda["muslimku"]["itinerary"] = "[]"
+    assert plugin._primary_location().city == "Jakarta"
+
+
+def test_prepare_itinerary_resolves_remaining_legs(plugin, nvda, clock, api_server, muslimku, monkeypatch):
+    server = api_server("--error-rate", "1")
+    monkeypatch.setattr(muslimku.net, "BACKOFF_SECONDS", 0.01)
+    clock.now = datetime.datetime(2026, 3, 3, 12).timestamp()
+    nvda["muslimku"]["itinerary"] = legs_json(
+        ("2026-02-01", "2026-02-05", place("Medan")),
+        ("2026-03-01", "2026-03-05", place("Bandung")),
+        ("2026-03-06", "2026-03-08", place("Surabaya")),
+        # Unknown offline and the timetable service is down.
+        ("2026-03-09", "2026-03-10", place("Atlantis", "Nowhere")),
+    )
+    plugin._prepare_itinerary()
+    # The past leg is skipped; both known places are ready offline.
+    assert plugin._itinerary_ready == (3, 2)
+    store = muslimku._get_cache_store()
+    for city in ("Bandung", "Surabaya"):
+        loc = locations.make_location(country="Indonesia", city=city)
+        assert store.get("geocode", plugin._get_location_key(loc))
+    assert server.stats["requests"] >= 1
@@ -0,0 +1,36 @@
+import threading
+import time
+
+import pytest
+
+
+def test_terminate_lets_workers_finish_before_closing_store(plugin, muslimku):
+    started = threading.Event()
+    written = []
+
+    def worker():
+        started.set()
+        time.sleep(0.2)
+        muslimku._get_cache_store().set("geocode", "late-worker", {"ok": True})
+        written.append(muslimku._cache_store)
+
+    muslimku._run_in_background(worker)
+    assert started.wait(5)
+    plugin.terminate()
+    # The worker wrote to the open store; only then was it closed.
+    assert len(written) == 1 and written[0] is not None
+    assert muslimku._cache_store is None
+
+
+def test_store_is_not_reopened_after_terminate(plugin, muslimku):
+    muslimku._get_cache_store()
+    plugin.terminate()
+    with pytest.raises(RuntimeError):
+        muslimku._get_cache_store()
+    assert muslimku._cache_store is None
+    # A new plugin instance (NVDA reloading add-ons) may open it again.
+    again = muslimku.GlobalPlugin()
+    try:
+        assert muslimku._get_cache_store() is not None
+    finally:
+        again.terminate()
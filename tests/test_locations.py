@@ -0,0 +1,88 @@
+import datetime
+
+import pytest
+
+import locations
+import nvda_stubs
+from test_reminders import DAY, PRAYERS, Harness, local_ts
+
+SAVED = [
+    {"name": "Office", "country": "Indonesia", "city": "Bandung"},
+    # The primary location under another name: not a separate entry.
+    {"name": "Home", "country": "Indonesia", "city": "Jakarta"},
+    {"name": "Mosque", "country": "Indonesia", "city": "Jakarta", "madhab": "hanafi"},
+]
+
+
+def save_locations(nvda, entries):
+    nvda["muslimku"]["locations"] = locations.dump([locations.from_dict(entry) for entry in entries])
+
+
+def spoken_after(count):
+    return [text for ts, text in nvda_stubs.spoken[count:]]
+
+
+def test_cycling_wraps_around_distinct_locations(plugin, nvda, background):
+    save_locations(nvda, SAVED)
+    assert [loc.name for loc in plugin._all_locations()] == ["Jakarta", "Office", "Mosque"]
+    count = len(nvda_stubs.spoken)
+    for step in (1, 1, 1, -1):
+        plugin._cycle_location(step)
+    assert spoken_after(count) == [
+        "Location 2 of 3: Office (Bandung, Indonesia).",
+        "Location 3 of 3: Mosque (Jakarta, Indonesia).",
+        "Location 1 of 3: Jakarta, Indonesia.",
+        "Location 3 of 3: Mosque (Jakarta, Indonesia).",
+    ]
+    assert plugin._active_location().name == "Mosque"
+    # Announcements speak about the selected location, named.
+    count = len(nvda_stubs.spoken)
+    plugin.announce_location()
+    assert spoken_after(count) == ["Mosque: Your current location is: Jakarta, Indonesia."]
+
+
+def test_cycling_without_saved_locations(plugin, nvda):
+    plugin._active_location_index = 2
+    count = len(nvda_stubs.spoken)
+    plugin._cycle_location(1)
+    assert spoken_after(count) == ["No other saved locations. Add them in Muslimku settings."]
+    assert plugin._active_location_index == 0
+
+
+def test_reminder_locations_skip_disabled_and_duplicates(plugin, nvda):
+    save_locations(nvda, SAVED[:2] + [dict(SAVED[2], reminders=False)])
+    assert [(loc.name, place) for loc, place in plugin._reminder_locations()] == [
+        ("Jakarta", None), ("Office", "Office"),
+    ]
+    nvda["muslimku"]["reminder_enabled"] = False
+    assert plugin._reminder_locations() == []
+
+
+@pytest.fixture
+def harness(clock, background, plugin, api_server, monkeypatch):
+    api_server()
+    clock.now = local_ts(DAY, 0, 0, 1)
+    return Harness(plugin, clock, monkeypatch)
+
+
+def test_locations_share_one_reminder_at_the_same_instant(harness, nvda, background):
+    # Jakarta with the Hanafi Asr: every reminder but Asr lands on the same
+    # instant as the primary's.
+    save_locations(nvda, SAVED[2:])
+    harness.run(local_ts(DAY, 23, 59))
+    notified = [(prayer, places) for prayer, time_str, places, late, when in harness.notified]
+    shared = [(prayer, (None, "Mosque")) for prayer in PRAYERS if prayer != "Asr"]
+    assert [n for n in notified if n[0] != "Asr"] == shared
+    assert [n for n in notified if n[0] == "Asr"] == [("Asr", (None,)), ("Asr", ("Mosque",))]
+    # One scheduler event, one wake and one announcement per shared instant.
+    assert len(harness.fires) == len(PRAYERS) + 1
+    assert len({when for key, when in harness.fires}) == len(PRAYERS) + 1
+
+
+def test_shared_reminder_names_every_place(plugin, nvda, monkeypatch):
+    save_locations(nvda, SAVED[:1])
+    messages = []
+    monkeypatch.setattr(plugin, "_deliver_notification", lambda prayer, message, title: messages.append(message))
+    plugin._notify("Dhuhr", "11:52", [None, "Office"])
+    nvda_stubs.pump()
+    assert messages == ["Reminder: Dhuhr at 11:52 in Jakarta, Office."]
@@ -0,0 +1,45 @@
+import time
+
+import pytest
+
+import net
+
+
+def _client():
+    return net.HttpClient(sleep=lambda seconds: None)
+
+
+def test_single_attempt_gives_up_after_its_timeout(api_server):
+    server = api_server("--timeout-rate", "1", "--hang-seconds", "1")
+    url = net.service_url("aladhan", "/v1/timingsByCity")
+    started = time.perf_counter()
+    with pytest.raises(net.OFFLINE_ERRORS):
+        _client().get_json(url, timeout=0.2, attempts=1)
+    assert time.perf_counter() - started < 0.9
+    assert server.stats["timeouts"] == 1
+
+
+def test_budget_stops_retries(api_server):
+    server = api_server("--error-rate", "1")
+    url = net.service_url("aladhan", "/v1/timingsByCity")
+    with pytest.raises(net.HttpError):
+        _client().get_json(url)
+    assert server.stats["requests"] == net.MAX_ATTEMPTS
+    # No room for a backoff and another attempt within the budget.
+    with pytest.raises(net.HttpError):
+        _client().get_json(url, budget=0.3)
+    assert server.stats["requests"] == net.MAX_ATTEMPTS + 1
+
+
+def test_interactive_announce_makes_one_attempt(online_plugin, api_server, muslimku, monkeypatch):
+    plugin = online_plugin
+    server = api_server("--error-rate", "1")
+    monkeypatch.setattr(muslimku.net, "BACKOFF_SECONDS", 0.01)
+    assert plugin._get_cached_snapshot(interactive=True) is None
+    assert server.stats["requests"] == 1
+    # The background refresh keeps the full retries.
+    deadline = time.perf_counter() + 5
+    while server.stats["requests"] < 1 + net.MAX_ATTEMPTS and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    assert server.stats["requests"] == 1 + net.MAX_ATTEMPTS
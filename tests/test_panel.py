@@ -0,0 +1,77 @@
+import time
+
+import nvda_stubs
+
+
+class FakeChoice(object):
+
+    def __init__(self, items=(), selection=0):
+        self.items = list(items)
+        self.selection = selection
+        self.enabled = True
+
+    def SetItems(self, items):
+        self.items = list(items)
+
+    def SetSelection(self, index):
+        self.selection = index
+
+    def SetStringSelection(self, name):
+        self.selection = self.items.index(name)
+
+    def GetStringSelection(self):
+        return self.items[self.selection] if 0 <= self.selection < len(self.items) else ""
+
+    def Enable(self, enabled=True):
+        self.enabled = enabled
+
+
+def make_panel(muslimku):
+    # The region controls alone, without building the whole settings page.
+    panel = muslimku.MuslimkuSettingsPanel.__new__(muslimku.MuslimkuSettingsPanel)
+    panel._panelClosed = False
+    panel._regencyMap = {"KOTA ADM. JAKARTA SELATAN": "3171"}
+    panel._fineLoadTokens = {"district": 0, "village": 0}
+    panel._fineMaps = {"district": {}, "village": {}}
+    panel._labels = {"not_selected": {"id": "(Tidak dipilih)", "en": "(Not selected)"}}
+    panel.regencyChoice = FakeChoice(["KOTA ADM. JAKARTA SELATAN"])
+    panel.districtChoice = FakeChoice()
+    panel.villageChoice = FakeChoice()
+    panel._bundledRegionItems = lambda parent_id=None: None
+    return panel
+
+
+def test_stale_region_list_is_replaced_after_refresh(plugin, muslimku, api_server):
+    api_server()
+    store = muslimku._get_cache_store()
+    store.set("regions", "idn:districts:3171", [{"id": "3171010", "name": "JAGAKARSA"}])
+    store.ttls["regions"] = -1
+    panel = make_panel(muslimku)
+    panel._startFineRegionLoad("district")
+    deadline = time.perf_counter() + 10
+    while len(panel._fineMaps["district"]) < 2 and time.perf_counter() < deadline:
+        nvda_stubs.pump(0.1)
+    # The cached list was shown first, then swapped for the fetched one.
+    assert panel._fineMaps["district"]["CILANDAK"] == "3171030"
+    assert panel.districtChoice.items[1:] == list(panel._fineMaps["district"])
+    assert panel.districtChoice.GetStringSelection() == "(Not selected)"
+
+
+def test_refresh_keeps_selection_and_ignores_stale_tokens(muslimku, nvda):
+    panel = make_panel(muslimku)
+    panel._fineMaps["district"] = {"JAGAKARSA": "3171010"}
+    panel.districtChoice = FakeChoice(["(Not selected)", "JAGAKARSA"], selection=1)
+    reloads = []
+    panel._startFineRegionLoad = lambda level, initial=False: reloads.append(level)
+    fresh = [{"id": "3171030", "name": "CILANDAK"}, {"id": "3171010", "name": "JAGAKARSA"}]
+    # A refresh for an older load does nothing.
+    panel._applyRefreshedRegions("district", -1, fresh)
+    assert panel.districtChoice.items == ["(Not selected)", "JAGAKARSA"]
+    panel._applyRefreshedRegions("district", 0, fresh)
+    assert panel.districtChoice.items == ["(Not selected)", "CILANDAK", "JAGAKARSA"]
+    assert panel.districtChoice.GetStringSelection() == "JAGAKARSA"
+    assert reloads == []
+    # The selected district changed its code: its villages are reloaded.
+    panel._applyRefreshedRegions("district", 0, [{"id": "3171011", "name": "JAGAKARSA"}])
+    assert panel.districtChoice.GetStringSelection() == "JAGAKARSA"
+    assert reloads == ["village"]
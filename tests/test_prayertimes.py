@@ -0,0 +1,52 @@
+import datetime
+from zoneinfo import ZoneInfo
+
+import prayertimes
+
+LONDON = (51.5074, -0.1278)
+ORDER = ("Imsak", "Fajr", "Sunrise", "Dhuhr", "Asr", "Sunset", "Maghrib", "Isha")
+
+
+def minutes(label):
+    hours, mins = label.split()[0].split(":")
+    return int(hours) * 60 + int(mins)
+
+
+def test_midsummer_london_uses_the_high_latitude_rule():
+    # At 51.5N the sun stays above -18 degrees all night around the solstice:
+    # Fajr and Isha have no angle time and come from the night portion.
+    day = datetime.date(2026, 6, 21)
+    for method_id in (3, 5, 20):
+        payload = prayertimes.build_day_payload(day, *LONDON, ZoneInfo("Europe/London"), method_id=method_id)
+        timings = [minutes(payload["timings"][name]) for name in ORDER]
+        assert timings == sorted(timings), method_id
+        times = prayertimes.compute_times(day, *LONDON, 1, method_id=method_id)
+        night = (times["Sunrise"] - times["Sunset"]) % 24
+        angle = prayertimes.get_method_params(method_id)["fajr"]
+        assert abs(times["Sunrise"] - times["Fajr"] - angle / 60.0 * night) < 1e-9
+
+
+def test_failed_engine_falls_back_to_the_network(plugin, api_server, muslimku, monkeypatch):
+    server = api_server()
+
+    def fail(*args, **kwargs):
+        raise ValueError("engine")
+
+    monkeypatch.setattr(muslimku.prayertimes, "build_day_payload", fail)
+    payload = plugin._load_today_payload(target_date=datetime.date(2026, 6, 21))
+    assert payload and payload["timings"]["Fajr"]
+    assert server.stats["requests"] >= 1
+
+
+def test_every_day_of_the_year_at_high_latitudes():
+    cities = {
+        "Europe/London": LONDON, "Europe/Berlin": (52.52, 13.405), "America/Edmonton": (53.5461, -113.4938),
+        "Europe/Amsterdam": (52.3676, 4.9041), "Europe/Paris": (48.8566, 2.3522),
+    }
+    day = datetime.date(2026, 1, 1)
+    while day.year == 2026:
+        for tz_name, (lat, lon) in cities.items():
+            for method_id in (2, 3, 5, 20):
+                payload = prayertimes.build_day_payload(day, lat, lon, ZoneInfo(tz_name), method_id=method_id)
+                assert all(payload["timings"][name] for name in ORDER)
+        day += datetime.timedelta(days=1)
@@ -0,0 +1,41 @@
+import regions
+
+
+def test_bundled_file_covers_every_level():
+    store = regions.get_region_store()
+    assert store is not None
+    assert store.level_count(regions.LEVEL_PROVINCE) >= 34
+    assert store.level_count(regions.LEVEL_REGENCY) >= 514
+    assert store.level_count(regions.LEVEL_DISTRICT) > 7000
+    assert store.level_count(regions.LEVEL_VILLAGE) > 80000
+
+
+def test_village_resolves_to_coordinates():
+    store = regions.get_region_store()
+    # Cipedak, Jagakarsa, Jakarta Selatan.
+    village = store.get("3171010001")
+    assert village.level == regions.LEVEL_VILLAGE
+    assert village.name == "CIPEDAK"
+    point = store.centroid(village.id)
+    assert point is not None
+    assert abs(point.lat - -6.3) < 0.3
+    assert abs(point.lon - 106.8) < 0.3
+
+
+def test_children_nest_under_parent():
+    store = regions.get_region_store()
+    districts = store.children("3171")
+    assert districts
+    assert all(d.id.startswith("3171") and d.level == regions.LEVEL_DISTRICT for d in districts)
+    villages = store.children(districts[0].id)
+    assert villages
+    assert all(v.id.startswith(districts[0].id) for v in villages)
+
+
+def test_every_regency_has_coordinates():
+    store = regions.get_region_store()
+    for province in store.children(None):
+        for regency in store.children(province.id):
+            point = store.centroid(regency.id)
+            assert point is not None and point.id == regency.id
+            assert -11.5 < point.lat < 6.5 and 94 < point.lon < 141.5
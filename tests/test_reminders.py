@@ -0,0 +1,133 @@
+import collections
+import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+import scheduler
+
+JAKARTA = ZoneInfo("Asia/Jakarta")
+DAY = datetime.date(2026, 5, 4)
+PRAYERS = ("Fajr", "Dhuhr", "Asr", "Maghrib", "Isha")
+
+
+def local_ts(day, hour, minute=0, second=0):
+    return datetime.datetime(day.year, day.month, day.day, hour, minute, second, tzinfo=JAKARTA).timestamp()
+
+
+class Harness(object):
+    # Runs the plugin's reminders on a ReminderScheduler driven by the fake
+    # clock; actions are (wall instant, fn) run when the clock passes them.
+
+    def __init__(self, plugin, clock, monkeypatch):
+        self.plugin = plugin
+        self.clock = clock
+        self.fires = []
+        self.notified = []
+        monkeypatch.setattr(plugin, "_notify", lambda prayer, time_str, places=None, late=False: self.notified.append(
+            (prayer, time_str, tuple(places or ()), late, self.clock.now)
+        ))
+        self.sched = scheduler.ReminderScheduler(
+            plugin._build_reminder_events, self._fire, clock=lambda: clock.now,
+            on_missed=plugin._fire_missed_reminder
+        )
+        plugin._reminder_scheduler = self.sched
+
+    def _fire(self, key, data):
+        self.fires.append((key, self.clock.now))
+        self.plugin._fire_reminder(key, data)
+
+    def run(self, end_ts, actions=()):
+        actions = sorted(actions, key=lambda action: action[0])
+        while True:
+            target = self.clock.now + max(0.0, self.sched.run_pending())
+            if actions and actions[0][0] < min(target, end_ts):
+                self.clock.now = actions[0][0]
+                actions.pop(0)[1]()
+                continue
+            if target > end_ts:
+                return
+            self.clock.now = target
+
+    def queued_keys(self):
+        return [entry[1] for entry in self.sched._heap]
+
+
+@pytest.fixture
+def harness(clock, background, plugin, api_server, monkeypatch):
+    api_server()
+    clock.now = local_ts(DAY, 0, 0, 1)
+    return Harness(plugin, clock, monkeypatch)
+
+
+def prayer_instants(plugin, day):
+    schedule = plugin._get_cached_snapshot().schedule
+    if schedule.date != day:
+        schedule = plugin._get_cached_snapshot().next_day.schedule
+    return {name: trigger_ts for trigger_ts, name, time_str, event_ts in schedule.reminders}
+
+
+def test_rolling_window_fires_each_reminder_once(harness, background):
+    tomorrow = DAY + datetime.timedelta(days=1)
+    # Tomorrow is pre-warmed in the evening and merged into the queue.
+    harness.run(local_ts(tomorrow, 23, 59), [(local_ts(DAY, 20), background.run)])
+    fired = [key for key, when in harness.fires]
+    assert len(fired) == len(set(fired)) == 2 * len(PRAYERS)
+    assert [n[0] for n in harness.notified] == list(PRAYERS) * 2
+    # Each reminder is spoken at its instant, never late.
+    for key, when in harness.fires:
+        assert when == int(key.split(":")[0])
+    assert not any(n[3] for n in harness.notified)
+    assert harness.sched.merged == len(PRAYERS)
+
+
+def test_tomorrow_is_queued_once_before_midnight(harness, background):
+    plugin = harness.plugin
+
+    def merge_again():
+        plugin._merge_next_day_reminders(plugin._active_location(), plugin._get_cached_snapshot())
+
+    actions = [
+        (local_ts(DAY, 20), background.run),
+        (local_ts(DAY, 20, 1), harness.sched.rearm),
+        # A merge for an instant the rebuild already queued.
+        (local_ts(DAY, 20, 2), merge_again),
+    ]
+    harness.run(local_ts(DAY, 20, 3), actions)
+    keys = harness.queued_keys()
+    tomorrow = DAY + datetime.timedelta(days=1)
+    assert sum(1 for key in keys if local_ts(tomorrow, 0) <= int(key.split(":")[0])) == len(PRAYERS)
+    # One event per instant, whichever path queued it.
+    assert len(keys) == len({key.split(":")[0] for key in keys})
+
+
+def test_offset_before_midnight_fires_once(harness, background, nvda):
+    # Five hours early, tomorrow's Fajr reminder falls on this evening: it
+    # comes in with the merge and is also in tomorrow's own schedule.
+    nvda["muslimku"]["reminder_offset_minutes"] = 300
+    tomorrow = DAY + datetime.timedelta(days=1)
+    harness.run(local_ts(tomorrow, 3), [(local_ts(DAY, 20), background.run)])
+    fajr = prayer_instants(harness.plugin, tomorrow)["Fajr"]
+    assert fajr < local_ts(tomorrow, 0)
+    fired = [key for key, when in harness.fires]
+    assert fired.count(f"{int(fajr)}:Fajr") == 1
+    assert len(fired) == len(set(fired))
+    assert [n for n in harness.notified if n[4] == fajr] == [
+        ("Fajr", datetime.datetime.fromtimestamp(fajr + 300 * 60, JAKARTA).strftime("%H:%M"), (None,), False, fajr)
+    ]
+
+
+def test_rebuild_after_merge_does_not_fire_again(harness, background):
+    tomorrow = DAY + datetime.timedelta(days=1)
+    actions = [
+        (local_ts(DAY, 20), background.run),
+        # A settings change after the merge rebuilds the whole queue.
+        (local_ts(DAY, 21), harness.sched.rearm),
+        # And again after tomorrow's Fajr has been given.
+        (local_ts(tomorrow, 6), harness.sched.rearm),
+    ]
+    harness.run(local_ts(tomorrow, 23, 59), actions)
+    fired = collections.Counter(key for key, when in harness.fires)
+    assert set(fired.values()) == {1}
+    assert len(fired) == 2 * len(PRAYERS)
+    assert len(harness.notified) == 2 * len(PRAYERS)
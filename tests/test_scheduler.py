@@ -0,0 +1,221 @@
+import collections
+import datetime
+import threading
+from zoneinfo import ZoneInfo
+
+import scheduler
+
+UTC = datetime.timezone.utc
+DAY = 86400
+# Local reminder times, as (hour, minute).
+TIMES = ((4, 30), (12, 0), (15, 30), (18, 0), (19, 30))
+
+
+class FakeClocks(object):
+    # Wall and monotonic clocks that only move when the scheduler waits.
+    # Clock changes are queued as (wall instant, delta): when a wait passes
+    # the instant, the wall clock alone moves by delta.
+
+    def __init__(self, start_ts, end_ts):
+        self.wall = float(start_ts)
+        self.mono = 1000.0
+        self.end_ts = end_ts
+        self.changes = []
+        self.wakes = []
+        self.scheduler = None
+
+    def time(self):
+        return self.wall
+
+    def monotonic(self):
+        return self.mono
+
+    def wait(self, timeout):
+        if self.wall + timeout > self.end_ts:
+            self.scheduler.stop()
+            return
+        start = self.wall
+        self.wall += timeout
+        self.mono += timeout
+        for change in list(self.changes):
+            if start < change[0] <= start + timeout:
+                self.changes.remove(change)
+                self.wall += change[1]
+        self.wakes.append(self.wall)
+
+
+def local_ts(day, hour, minute, tz):
+    return datetime.datetime(day.year, day.month, day.day, hour, minute, tzinfo=tz).timestamp()
+
+
+def make_builder(tz, times=TIMES):
+    # Today's and tomorrow's reminders at the scheduler's now, rebuilt a
+    # second after the next local midnight, like the plugin's.
+    builds = []
+
+    def build(now_ts):
+        today = datetime.datetime.fromtimestamp(now_ts, tz).date()
+        events = []
+        for offset in (0, 1):
+            day = today + datetime.timedelta(days=offset)
+            for hour, minute in times:
+                ts = local_ts(day, hour, minute, tz)
+                events.append((ts, f"{int(ts)}", None))
+        tomorrow = today + datetime.timedelta(days=1)
+        builds.append(now_ts)
+        return events, local_ts(tomorrow, 0, 0, tz) + 1
+
+    build.builds = builds
+    return build
+
+
+def run(start_ts, end_ts, tz=UTC, changes=(), times=TIMES):
+    clocks = FakeClocks(start_ts, end_ts)
+    clocks.changes = list(changes)
+    fired = []
+    late = []
+    build = make_builder(tz, times)
+    sched = scheduler.ReminderScheduler(
+        build, lambda key, data: fired.append(key),
+        clock=clocks.time, monotonic=clocks.monotonic, wait=clocks.wait,
+        on_missed=lambda key, data, trigger_ts, now_ts: late.append(key),
+    )
+    clocks.scheduler = sched
+    sched.run()
+    return sched, clocks, fired, late, build
+
+
+def instants(day, tz=UTC, times=TIMES):
+    return [local_ts(day, hour, minute, tz) for hour, minute in times]
+
+
+def test_wakes_only_at_events_and_midnight():
+    day = datetime.date(2026, 5, 4)
+    start = local_ts(day, 0, 0, UTC) + 1
+    end = start + DAY + 60
+    sched, clocks, fired, late, build = run(start, end)
+    midnight = local_ts(day + datetime.timedelta(days=1), 0, 0, UTC) + 1
+    # No polling: one wake per reminder and one for the midnight rebuild.
+    assert clocks.wakes == instants(day) + [midnight]
+    assert fired == [str(int(ts)) for ts in instants(day)]
+    assert late == []
+    assert build.builds == [start, midnight]
+    assert sched.stats()["rebuilds"] == 2
+
+
+def keys(timestamps):
+    return [str(int(ts)) for ts in timestamps]
+
+
+def assert_each_once(fired, late, expected):
+    counts = collections.Counter(fired + late)
+    assert sorted(counts) == sorted(expected)
+    assert set(counts.values()) == {1}
+
+
+def test_forward_jump_catches_up_once():
+    day = datetime.date(2026, 5, 4)
+    start = local_ts(day, 0, 0, UTC) + 1
+    # At 11:30 the clock is set an hour ahead, skipping over 12:00.
+    jump_at = local_ts(day, 11, 30, UTC)
+    sched, clocks, fired, late, build = run(start, start + DAY - 120, changes=[(jump_at, 3600)])
+    noon, = keys([local_ts(day, 12, 0, UTC)])
+    assert sched.jumps == 1
+    assert late == [noon]
+    assert noon not in fired
+    assert_each_once(fired, late, keys(instants(day)))
+
+
+def test_backward_jump_does_not_repeat():
+    day = datetime.date(2026, 5, 4)
+    start = local_ts(day, 0, 0, UTC) + 1
+    # After noon fired, the clock is set back to before it.
+    jump_at = local_ts(day, 13, 0, UTC)
+    sched, clocks, fired, late, build = run(start, start + DAY - 120, changes=[(jump_at, -5 * 3600)])
+    assert sched.jumps == 1
+    assert late == []
+    assert_each_once(fired, late, keys(instants(day)))
+    # The wall clock passed 12:00 twice; the second pass woke for nothing.
+    assert clocks.wakes.count(local_ts(day, 12, 0, UTC)) == 1
+
+
+def test_dst_changes_fire_each_reminder_once():
+    berlin = ZoneInfo("Europe/Berlin")
+    # 02:30 does not exist on the spring day and happens twice in autumn.
+    times = ((2, 30),) + TIMES
+    for day in (datetime.date(2026, 3, 29), datetime.date(2026, 10, 25)):
+        start = local_ts(day, 0, 0, berlin) + 1
+        tomorrow = day + datetime.timedelta(days=1)
+        end = local_ts(tomorrow, 0, 0, berlin) + 60
+        sched, clocks, fired, late, build = run(start, end, tz=berlin, times=times)
+        # Epoch time has no jump at a DST change; only the midnight moves.
+        assert sched.jumps == 0 and sched.resumes == 0
+        assert late == []
+        assert_each_once(fired, late, keys(instants(day, berlin, times)))
+        assert build.builds == [start, local_ts(tomorrow, 0, 0, berlin) + 1]
+        assert clocks.wakes == sorted(set(instants(day, berlin, times))) + [build.builds[-1]]
+
+
+def test_catch_up_only_inside_window():
+    day = datetime.date(2026, 5, 4)
+    start = local_ts(day, 0, 0, UTC) + 1
+    # Waiting from 12:00 for 15:30, the clock leaps three hours at 13:00 and
+    # the loop wakes at 18:30: 18:00 is inside the catch-up window, 15:30 is
+    # not, and 12:00 was already given.
+    jump_at = local_ts(day, 13, 0, UTC)
+    sched, clocks, fired, late, build = run(start, start + DAY - 120, changes=[(jump_at, 3 * 3600)])
+    skipped, evening = keys([local_ts(day, 15, 30, UTC), local_ts(day, 18, 0, UTC)])
+    assert clocks.wakes[2] == local_ts(day, 18, 30, UTC)
+    assert 3 * 3600 > scheduler.CATCH_UP_SECONDS > 1800
+    assert late == [evening]
+    assert skipped not in fired
+    assert sched.missed == 1
+    assert_each_once(fired, late, [k for k in keys(instants(day)) if k != skipped])
+
+
+class StopBeforeClear(threading.Event):
+    # Delivers a stop() right before the loop clears its wake event, the
+    # moment another thread's stop could otherwise be erased.
+
+    def __init__(self):
+        super().__init__()
+        self.scheduler = None
+
+    def clear(self):
+        if self.scheduler is not None and not self.scheduler.stopped:
+            self.scheduler.stop()
+        super().clear()
+
+
+def test_stop_is_not_lost_while_the_loop_clears_its_wake():
+    sched = scheduler.ReminderScheduler(
+        lambda now_ts: ([(now_ts + 3600, "later", None)], now_ts + DAY), lambda key, data: None
+    )
+    wake = StopBeforeClear()
+    sched._wake, sched._wait = wake, wake.wait
+    wake.scheduler = sched
+    thread = threading.Thread(target=sched.run, daemon=True)
+    thread.start()
+    thread.join(2)
+    alive = thread.is_alive()
+    sched.stop()
+    assert not alive
+
+
+def test_merge_updates_a_queued_event_and_skips_a_fired_one():
+    now = [1000.0]
+    fired = []
+    sched = scheduler.ReminderScheduler(
+        lambda now_ts: ([(1100.0, "1100:Fajr", "home")], now_ts + DAY),
+        lambda key, data: fired.append((key, data)), clock=lambda: now[0],
+    )
+    sched.run_pending()
+    sched.merge([(1100.0, "1100:Fajr", "home and away")])
+    sched.run_pending()
+    assert sched.merged == 0
+    now[0] = 1100.0
+    sched.run_pending()
+    assert fired == [("1100:Fajr", "home and away")]
+    sched.merge([(1100.0, "1100:Fajr", "again")])
+    sched.run_pending()
+    assert fired == [("1100:Fajr", "home and away")]
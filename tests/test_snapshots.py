@@ -0,0 +1,67 @@
+import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+import nvda_stubs
+
+JAKARTA = ZoneInfo("Asia/Jakarta")
+DAY = datetime.date(2026, 5, 4)
+TOMORROW = DAY + datetime.timedelta(days=1)
+
+
+def local_ts(day, hour, minute=0, second=0):
+    return datetime.datetime(day.year, day.month, day.day, hour, minute, second, tzinfo=JAKARTA).timestamp()
+
+
+@pytest.fixture
+def today(clock, background, plugin, api_server):
+    # Today's snapshot loaded in the evening, tomorrow pre-warmed after it.
+    api_server()
+    clock.now = local_ts(DAY, 21)
+    plugin._get_cached_snapshot()
+    background.run()
+    return plugin._get_today_snapshot()
+
+
+def spoken_after(count):
+    return [text for ts, text in nvda_stubs.spoken[count:]]
+
+
+def test_midnight_switches_to_the_prewarmed_day(today, plugin, clock, background, monkeypatch):
+    assert today.schedule.date == DAY
+    next_day = today.next_day
+    assert next_day is not None and next_day.schedule.date == TOMORROW
+    loads = []
+    monkeypatch.setattr(plugin, "_load_today_payload", lambda *args, **kwargs: loads.append(args))
+    clock.now = local_ts(DAY, 23, 59, 59)
+    assert plugin._get_today_snapshot() is today
+    clock.now = local_ts(TOMORROW, 0, 0, 1)
+    # The pre-warmed day takes over as is, without loading anything.
+    assert plugin._get_today_snapshot() is next_day
+    assert plugin._get_today_snapshot() is next_day
+    assert loads == []
+    # The day after is pre-warmed in the background, not on this thread.
+    assert [fn.__name__ for fn, args in background.queued] == ["_prewarm_next_day"]
+
+
+def test_next_prayer_after_isha_is_tomorrows_fajr(today, plugin, clock):
+    fajr_ts = today.next_day.schedule.time_of("Fajr")
+    assert today.schedule.time_of("Isha") < local_ts(DAY, 23)
+    for now_ts in (local_ts(DAY, 23), local_ts(TOMORROW, 0, 30)):
+        clock.now = now_ts
+        count = len(nvda_stubs.spoken)
+        plugin.announce_next_prayer()
+        minutes = int((fajr_ts - now_ts) // 60)
+        assert spoken_after(count) == [f"Next prayer is Fajr: In {minutes // 60} hours and {minutes % 60} minutes."]
+
+
+def test_next_prayer_without_prewarm_uses_todays_fajr_plus_a_day(clock, background, plugin, api_server):
+    api_server()
+    clock.now = local_ts(DAY, 23)
+    snapshot = plugin._get_cached_snapshot()
+    assert snapshot.next_day is None
+    count = len(nvda_stubs.spoken)
+    plugin.announce_next_prayer()
+    minutes = int((snapshot.schedule.time_of("Fajr") + 86400 - clock.now) // 60)
+    assert spoken_after(count) == [f"Next prayer is Fajr: In {minutes // 60} hours and {minutes % 60} minutes."]
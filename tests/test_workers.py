@@ -0,0 +1,48 @@
+import threading
+
+import workers
+
+
+def test_single_flight_shares_one_call():
+    flights = workers.SingleFlight()
+    gate = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        gate.wait(5)
+        return "timings"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do("k", fetch))) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    while flights.shared < 19:
+        threading.Event().wait(0.001)
+    gate.set()
+    for thread in threads:
+        thread.join(5)
+    assert calls == [1]
+    assert results == ["timings"] * 20
+    assert flights.inflight() == 0
+
+
+def test_concurrent_announces_make_one_request(online_plugin, api_server):
+    # Every announce misses the snapshot and needs the same month of timings.
+    plugin = online_plugin
+    server = api_server("--latency-ms", "300")
+    start = threading.Barrier(50)
+    snapshots = []
+
+    def announce():
+        start.wait(5)
+        snapshots.append(plugin._get_cached_snapshot())
+
+    threads = [threading.Thread(target=announce) for _ in range(50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(15)
+    assert len(snapshots) == 50 and all(snapshots)
+    assert server.stats["requests"] == 1
+    assert plugin._flights.shared >= 1
@@ -0,0 +1,489 @@
+# Headless benchmark suite for the add-on.
+# Usage:
+#   python tools/benchmark.py [--output result.json] [--baseline baseline.json]
+#       [--repeats 20] [--days 7] [--latency-ms 0] [--country Indonesia --city Jakarta]
+#       [--saved-locations 0]
+# Loads the plugin against the stub NVDA runtime in tools/nvda_stubs.py and
+# points every web service at an in-process tools/fixture_server.py. Measures
+# import/startup time, keypress-to-speech latency of every script (cold and
+# warm), the first press after a simulated midnight, reminder loop CPU per
+# simulated day, how reminders survive sleep and clock jumps, cache and
+# single-flight hit ratios, thread counts and peak memory. --saved-locations adds that many
+# saved locations with reminders, to see how the loop scales. With --baseline, timings that grew
+# by more than --tolerance (and --min-delta-ms) are reported as regressions
+# and the exit code is 1.
+import argparse
+import collections
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PLUGINS = os.path.join(HERE, os.pardir, "globalPlugins")
+sys.path.insert(0, HERE)
+
+import fixture_server  # noqa: E402
+import nvda_stubs  # noqa: E402
+
+# Saved locations for --saved-locations, all known to the bundled gazetteer.
+# They share the default location's timezone, so the simulated day's fake
+# clock agrees with every location's midnight.
+SAVED_CITIES = (
+    "Depok", "Bekasi", "Tangerang", "Bogor", "Serang", "Bandung",
+    "Cirebon", "Semarang", "Yogyakarta", "Surabaya", "Palembang", "Medan",
+)
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def _summary_ms(samples):
+    ms = [s * 1000.0 for s in samples]
+    if not ms:
+        return None
+    return {
+        "n": len(ms),
+        "min": round(min(ms), 3),
+        "p50": round(_percentile(ms, 0.5), 3),
+        "p95": round(_percentile(ms, 0.95), 3),
+        "max": round(max(ms), 3),
+    }
+
+
+class ThreadSampler(object):
+    # Records the highest thread count seen while running.
+
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="benchmark-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            # Exclude the sampler itself.
+            self.peak = max(self.peak, threading.active_count() - 1)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def reset_day_state(plugin):
+    # Forgets everything derived for today, but keeps the persistent cache.
+    plugin._today = {}
+    plugin._location_infos = {}
+    plugin._local_payload_cache = collections.OrderedDict()
+    plugin._imsakiyah_memo = collections.OrderedDict()
+    plugin._notified_keys = set()
+
+
+def press(plugin, name, timeout):
+    plugin._last_invoke.clear()
+    count = len(nvda_stubs.spoken)
+    started = time.perf_counter()
+    getattr(plugin, name)(None)
+    entry = nvda_stubs.wait_for_speech(count, timeout)
+    if entry is None:
+        return None, None
+    # Let trailing work (a second message, a finishing worker) settle.
+    nvda_stubs.pump()
+    return entry[0] - started, entry[1]
+
+
+def bench_keypresses(plugin, repeats, cold_repeats, timeout):
+    results = {}
+    names = sorted(n for n in dir(type(plugin)) if n.startswith("script_"))
+    for name in names:
+        cold, warm, failures = [], [], 0
+        message = None
+        for _ in range(cold_repeats):
+            reset_day_state(plugin)
+            latency, message = press(plugin, name, timeout)
+            if latency is None:
+                failures += 1
+            else:
+                cold.append(latency)
+        for _ in range(repeats):
+            latency, message = press(plugin, name, timeout)
+            if latency is None:
+                failures += 1
+            else:
+                warm.append(latency)
+        # The location gestures move the active location; later scripts
+        # are measured on the primary one.
+        plugin._active_location_index = 0
+        results[name] = {
+            "cold_ms": _summary_ms(cold),
+            "warm_ms": _summary_ms(warm),
+            "failures": failures,
+            "message": message,
+        }
+    return results
+
+
+def wait_for_prewarm(plugin, profile, timeout):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        snapshot = plugin._today.get(profile)
+        if snapshot is not None and snapshot.next_day is not None:
+            return snapshot
+        nvda_stubs.pump(0.002)
+    return None
+
+
+def bench_rollover(plugin, repeats, timeout):
+    # Expires today's snapshot once tomorrow is pre-warmed, as at midnight,
+    # and times the first press after it.
+    results = {}
+    for name in ("script_next_prayer", "script_hari", "script_subuh"):
+        samples, failures = [], 0
+        for _ in range(repeats):
+            reset_day_state(plugin)
+            snapshot = plugin._get_cached_snapshot()
+            snapshot = wait_for_prewarm(plugin, snapshot.profile, timeout) if snapshot else None
+            if snapshot is None:
+                failures += 1
+                continue
+            plugin._today = {snapshot.profile: snapshot._replace(expires_ts=time.time() - 1)}
+            latency, _ = press(plugin, name, timeout)
+            if latency is None:
+                failures += 1
+            else:
+                samples.append(latency)
+        results[name] = {"first_press_ms": _summary_ms(samples), "failures": failures}
+    return results
+
+
+def bench_reminder_loop(plugin, scheduler_module, days):
+    # Drives a scheduler with a fake clock across the location's current day,
+    # once per simulated day, and measures the CPU the loop spends.
+    fired = []
+    now = [0.0]
+
+    def fire(key, data):
+        fired.append(key)
+        plugin._fire_reminder(key, data)
+
+    cpu, wakeups, rebuilds = [], [], []
+    for _ in range(days):
+        reset_day_state(plugin)
+        snapshot = plugin._get_cached_snapshot()
+        if snapshot is None:
+            return {"error": "no schedule for today"}
+        day_end = snapshot.expires_ts + 1
+        now[0] = day_end - 86400
+        builds = [0]
+
+        def build(now_ts):
+            builds[0] += 1
+            return plugin._build_reminder_events(now_ts)
+
+        loop = scheduler_module.ReminderScheduler(build, fire, clock=lambda: now[0])
+        reset_day_state(plugin)
+        fired_before = len(fired)
+        steps = 0
+        started = time.thread_time()
+        while now[0] < day_end and steps < 1000:
+            timeout = loop.run_pending()
+            nvda_stubs.pump()
+            now[0] += max(timeout, 0.001)
+            steps += 1
+        cpu.append(time.thread_time() - started)
+        wakeups.append(steps)
+        rebuilds.append(builds[0])
+        if len(fired) == fired_before:
+            return {"error": "no reminders fired in a simulated day"}
+    return {
+        "days": days,
+        "cpu_ms_per_day": _summary_ms(cpu),
+        "wakeups_per_day": max(wakeups),
+        "rebuilds_per_day": max(rebuilds),
+        "reminders_per_day": len(fired) // days,
+    }
+
+
+def bench_clock_changes(plugin, scheduler_module):
+    # Replays suspend/resume and clock changes against a fake wall clock and
+    # a fake monotonic clock, and reports what the scheduler made of them.
+    # Every scenario starts a minute before one of today's reminders.
+    def scenario(pick, change):
+        reset_day_state(plugin)
+        clock = {"wall": 0.0, "mono": 0.0}
+        spoken = []
+
+        def fire(key, data):
+            spoken.append(key)
+            plugin._fire_reminder(key, data)
+
+        def missed(key, data, trigger_ts, now_ts):
+            spoken.append(key)
+            plugin._fire_missed_reminder(key, data, trigger_ts, now_ts)
+
+        snapshot = plugin._get_cached_snapshot()
+        if snapshot is None:
+            return {"error": "no schedule for today"}
+        events = sorted(plugin._build_reminder_events(snapshot.expires_ts + 1 - 86400)[0])
+        if len(events) <= pick:
+            return {"error": "too few reminders today"}
+        target = events[pick][0]
+        loop = scheduler_module.ReminderScheduler(
+            plugin._build_reminder_events, fire,
+            clock=lambda: clock["wall"], monotonic=lambda: clock["mono"], on_missed=missed
+        )
+        clock["wall"] = clock["mono"] = target - 60
+        loop.run_pending()
+        change(loop, clock, target)
+        # Then run on normally for a while.
+        for _ in range(20):
+            step = max(min(loop.run_pending(), 600.0), 0.001)
+            nvda_stubs.pump()
+            clock["wall"] += step
+            clock["mono"] += step
+        nvda_stubs.pump()
+        stats = loop.stats()
+        return {
+            "jumps": stats["jumps"],
+            "resumes": stats["resumes"],
+            "fired": stats["fired"],
+            "late": stats["late"],
+            "missed": stats["missed"],
+            "repeated": len(spoken) - len(set(spoken)),
+        }
+
+    def sleep(loop, clock, target):
+        # Monotonic time keeps counting through sleep (as on Windows).
+        clock["wall"] += 1800
+        clock["mono"] += 1800
+
+    def hibernate(loop, clock, target):
+        # Monotonic time stands still while the computer is off.
+        clock["wall"] += 1800
+
+    def clock_back(loop, clock, target):
+        # The reminder fires, then the clock is corrected ten minutes back.
+        clock["wall"] = clock["mono"] = target + 1
+        loop.run_pending()
+        clock["wall"] -= 600
+
+    def clock_forward(loop, clock, target):
+        # Beyond the catch-up window: dropped, not announced.
+        clock["wall"] += scheduler_module.CATCH_UP_SECONDS + 3600
+
+    return {
+        "sleep": scenario(0, sleep),
+        "hibernate": scenario(1, hibernate),
+        "clock_back": scenario(1, clock_back),
+        "clock_forward": scenario(0, clock_forward),
+    }
+
+
+def ratio(part, whole):
+    return round(part / whole, 3) if whole else None
+
+
+def collect_cache_stats(plugin, net, workers, diagnostics):
+    stats = plugin.get_cache_stats()
+    store = {}
+    for ns, counters in (stats.get("store") or {}).items():
+        total = sum(counters.values())
+        store[ns] = dict(counters, hit_ratio=ratio(counters.get("hit", 0), total))
+    executor = workers.get_executor()
+    flights = plugin._flights
+    return {
+        "timings": stats.get("timings", {}),
+        "store": store,
+        "http": net.get_client().stats(),
+        "single_flight": {
+            "calls": flights.calls,
+            "shared": flights.shared,
+            "shared_ratio": ratio(flights.shared, flights.calls + flights.shared),
+        },
+        "executor": executor.stats(),
+        "timings_ms": diagnostics.snapshot(),
+    }
+
+
+def configure(conf, options):
+    section = conf["muslimku"]
+    section["language"] = options.language
+    section["country"] = options.country
+    section["city"] = options.city
+    section["province"] = options.province
+    section["regency"] = options.regency
+    section["region_code"] = options.region_code
+    if options.method is not None:
+        section["calculation_method"] = options.method
+    saved = [
+        {"name": city, "city": city, "country": "Indonesia"}
+        for city in SAVED_CITIES[:max(0, options.saved_locations)]
+    ]
+    section["locations"] = json.dumps(saved)
+
+
+def run(options):
+    result = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "started": datetime.datetime.now().isoformat(timespec="seconds"),
+            "location": f"{options.city}, {options.country}",
+            "saved_locations": options.saved_locations,
+        }
+    }
+    server, base_url = fixture_server.start(
+        ["--quiet", "--latency-ms", str(options.latency_ms), "--jitter-ms", str(options.jitter_ms)], port=0
+    )
+    os.environ["MUSLIMKU_API_BASE"] = base_url
+    config_path = tempfile.mkdtemp(prefix="muslimku-bench-")
+    threads_before = threading.active_count()
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    conf = nvda_stubs.install(config_path)
+    sys.path.insert(0, PLUGINS)
+    import muslimku
+    from muslimku import diagnostics, net, scheduler, workers
+    configure(conf, options)
+    imported = time.perf_counter()
+    plugin = muslimku.GlobalPlugin()
+    initialized = time.perf_counter()
+    startup_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    threads_after_init = threading.active_count()
+
+    result["startup"] = {
+        "import_ms": round((imported - started) * 1000, 3),
+        "init_ms": round((initialized - imported) * 1000, 3),
+        "peak_python_kib": round(startup_peak / 1024, 1),
+    }
+
+    # NVDA signals it is ready; the live reminder thread starts here and is
+    # then stopped, as it would race the simulated one.
+    started = time.perf_counter()
+    sys.modules["core"].postNvdaStartup.notify()
+    result["startup"]["ready_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    threads_after_ready = threading.active_count()
+    plugin._reminder_scheduler.stop()
+    plugin._reminder_thread.join(2)
+    nvda_stubs.pump()
+
+    with ThreadSampler() as sampler:
+        result["keypress"] = bench_keypresses(plugin, options.repeats, options.cold_repeats, options.timeout)
+        result["rollover"] = bench_rollover(plugin, options.rollover_repeats, options.timeout)
+        result["reminder_loop"] = bench_reminder_loop(plugin, scheduler, options.days)
+        result["clock_changes"] = bench_clock_changes(plugin, scheduler)
+    result["cache"] = collect_cache_stats(plugin, net, workers, diagnostics)
+
+    started = time.perf_counter()
+    plugin.terminate()
+    terminate_ms = (time.perf_counter() - started) * 1000
+    server.shutdown()
+    server.server_close()
+    time.sleep(0.05)
+    result["threads"] = {
+        "before": threads_before,
+        "after_init": threads_after_init,
+        "after_ready": threads_after_ready,
+        "peak": sampler.peak,
+        "after_terminate": threading.active_count(),
+        "alive": sorted(t.name for t in threading.enumerate()),
+    }
+    result["startup"]["terminate_ms"] = round(terminate_ms, 3)
+    result["memory"] = {"peak_python_startup_kib": result["startup"]["peak_python_kib"]}
+    if resource is not None:
+        # ru_maxrss is KiB on Linux.
+        result["memory"]["max_rss_kib"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result["log"] = [r for r in sys.modules["logHandler"].log.records if r[0] in ("exception", "error")]
+    return result
+
+
+def flatten_timings(result):
+    # Comparable "lower is better" numbers, keyed by dotted path.
+    flat = {}
+    for key in ("import_ms", "init_ms", "ready_ms", "terminate_ms"):
+        flat[f"startup.{key}"] = result.get("startup", {}).get(key)
+    for name, entry in result.get("keypress", {}).items():
+        for phase in ("cold_ms", "warm_ms"):
+            flat[f"keypress.{name}.{phase}.p50"] = (entry.get(phase) or {}).get("p50")
+    for name, entry in result.get("rollover", {}).items():
+        flat[f"rollover.{name}.first_press_ms.p50"] = (entry.get("first_press_ms") or {}).get("p50")
+    loop = result.get("reminder_loop", {}).get("cpu_ms_per_day") or {}
+    flat["reminder_loop.cpu_ms_per_day.p50"] = loop.get("p50")
+    return {k: v for k, v in flat.items() if v is not None}
+
+
+def compare(result, baseline, tolerance, min_delta_ms):
+    regressions = []
+    current = flatten_timings(result)
+    for key, old in flatten_timings(baseline).items():
+        new = current.get(key)
+        if new is None:
+            continue
+        if new > old * tolerance and new - old > min_delta_ms:
+            regressions.append({"metric": key, "baseline": old, "current": new, "ratio": round(new / old, 2) if old else None})
+    return regressions
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Muslimku headless benchmarks")
+    parser.add_argument("--output", help="write the result JSON here")
+    parser.add_argument("--baseline", help="compare against a previously saved result")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="allowed slowdown factor")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="ignore smaller absolute slowdowns")
+    parser.add_argument("--repeats", type=int, default=20, help="warm presses per script")
+    parser.add_argument("--cold-repeats", type=int, default=3, help="presses per script after clearing today's state")
+    parser.add_argument("--rollover-repeats", type=int, default=5, help="simulated midnights per script")
+    parser.add_argument("--days", type=int, default=7, help="simulated reminder days")
+    parser.add_argument("--timeout", type=float, default=15.0, help="seconds to wait for speech")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="fixture server latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--country", default="Indonesia")
+    parser.add_argument("--city", default="Jakarta")
+    parser.add_argument("--province", default="DKI Jakarta")
+    parser.add_argument("--regency", default="Jakarta Selatan")
+    parser.add_argument("--region-code", default="")
+    parser.add_argument("--method", type=int)
+    parser.add_argument("--saved-locations", type=int, default=0, help=f"extra saved locations (max {len(SAVED_CITIES)})")
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    options = parse_args(argv[1:])
+    result = run(options)
+    status = 0
+    if options.baseline:
+        with open(options.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        result["regressions"] = compare(result, baseline, options.tolerance, options.min_delta_ms)
+        status = 1 if result["regressions"] else 0
+    text = json.dumps(result, indent=1, ensure_ascii=False)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,77 @@
+# Builds globalPlugins/muslimku/data/cities.bin from a GeoNames city dump.
+# Usage: python tools/build_cities.py cities1000.json
+# The JSON file is the one shipped by the geonamescache package. One block is
+# written per country in gazetteer.COUNTRY_CODES; names that normalize to the
+# same key keep only the most populous place.
+import json
+import os
+import sys
+import zlib
+from array import array
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PACKAGE = os.path.join(HERE, os.pardir, "globalPlugins", "muslimku")
+sys.path.insert(0, PACKAGE)
+
+import cityindex  # noqa: E402
+import gazetteer  # noqa: E402
+
+
+def load_countries(path):
+    codes = set(gazetteer.COUNTRY_CODES.values())
+    with open(path, encoding="utf-8") as f:
+        cities = json.load(f).values()
+    by_country = {code: {} for code in codes}
+    for c in cities:
+        if c["countrycode"] not in codes:
+            continue
+        name = c["name"].strip()
+        key = cityindex.normalize_name(name)
+        if not key or "\n" in name:
+            continue
+        best = by_country[c["countrycode"]].get(key)
+        if best is None or int(c.get("population", 0)) > int(best.get("population", 0)):
+            by_country[c["countrycode"]][key] = dict(c, name=name)
+    return by_country
+
+
+def pack_block(rows):
+    lat = array("h", (round(c["latitude"] * cityindex.COORD_SCALE) for c in rows))
+    lon = array("h", (round(c["longitude"] * cityindex.COORD_SCALE) for c in rows))
+    if sys.byteorder != "little":
+        lat.byteswap()
+        lon.byteswap()
+    names = "\n".join(c["name"] for c in rows).encode("utf-8")
+    return zlib.compress(lat.tobytes() + lon.tobytes() + names, 9)
+
+
+def build(by_country, out_path):
+    codes = sorted(by_country)
+    blocks = []
+    for code in codes:
+        keyed = by_country[code]
+        rows = [keyed[key] for key in sorted(keyed)]
+        blocks.append((code, len(rows), pack_block(rows)))
+    offset = cityindex.HEADER.size + cityindex.ENTRY.size * len(blocks)
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    with open(out_path, "wb") as f:
+        f.write(cityindex.HEADER.pack(cityindex.MAGIC, cityindex.VERSION, 0, len(blocks)))
+        for code, rows, block in blocks:
+            f.write(cityindex.ENTRY.pack(code.encode("ascii"), rows, offset, len(block)))
+            offset += len(block)
+        for _code, _rows, block in blocks:
+            f.write(block)
+    return sum(rows for _code, rows, _block in blocks)
+
+
+def main(argv):
+    if len(argv) < 2:
+        print("usage: build_cities.py cities1000.json")
+        return 2
+    count = build(load_countries(argv[1]), cityindex.DATA_FILE)
+    print(f"Wrote {count} cities to {os.path.normpath(cityindex.DATA_FILE)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,129 @@
+# Builds globalPlugins/muslimku/data/gazetteer.bin from GeoNames city dumps.
+# Usage: python tools/build_gazetteer.py cities15000.json [cities1000.json]
+# The JSON files are the ones shipped by the geonamescache package. Indonesian
+# rows are taken from the second (denser) file when it is given so regencies
+# named after small towns still resolve offline. Every BPS regency and city in
+# the bundled data/regions.bin is added under the name the settings panel
+# saves ("Gunung Kidul", "Jakarta Selatan") at its seat, and sorts ahead of
+# GeoNames places of the same name; cities (kota) sort ahead of regencies.
+import json
+import os
+import sys
+from array import array
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PACKAGE = os.path.join(HERE, os.pardir, "globalPlugins", "muslimku")
+sys.path.insert(0, PACKAGE)
+
+import gazetteer  # noqa: E402
+import regions  # noqa: E402
+import timezones  # noqa: E402
+
+DENSE_COUNTRIES = {"ID"}
+# Name-order rank of regency rows; GeoNames rows rank 0.
+RANK_REGENCY = 1
+RANK_CITY = 2
+
+
+def regency_name(name):
+    # Same normalization as the settings panel: "KABUPATEN GUNUNG KIDUL" -> "Gunung Kidul".
+    name = name.strip()
+    for prefix in ("KABUPATEN ", "KOTA "):
+        if name.upper().startswith(prefix):
+            return name[len(prefix):].strip().title()
+    return name.title()
+
+
+def regency_rows(store):
+    rows = []
+    for province in store.children(None):
+        for regency in store.children(province.id):
+            point = store.centroid(regency.id)
+            zone = timezones.indonesia_zone(regency.id)
+            if point is None or not zone:
+                continue
+            rows.append({
+                "name": regency_name(regency.name),
+                "latitude": point.lat,
+                "longitude": point.lon,
+                "countrycode": "ID",
+                "timezone": zone,
+                "population": 0,
+                "rank": RANK_CITY if regency.name.upper().startswith("KOTA ") else RANK_REGENCY,
+            })
+    return rows
+
+
+def load_rows(main_path, dense_path=None):
+    codes = set(gazetteer.COUNTRY_CODES.values())
+    with open(main_path, encoding="utf-8") as f:
+        cities = list(json.load(f).values())
+    rows = [c for c in cities if c["countrycode"] in codes and (not dense_path or c["countrycode"] not in DENSE_COUNTRIES)]
+    if dense_path:
+        with open(dense_path, encoding="utf-8") as f:
+            dense = json.load(f).values()
+        rows.extend(c for c in dense if c["countrycode"] in DENSE_COUNTRIES)
+    store = regions.get_region_store()
+    if store is not None:
+        rows.extend(regency_rows(store))
+    return rows
+
+
+def build(rows, out_path):
+    # Sort on the float32 values the reader sees so grid cells agree exactly.
+    for c in rows:
+        c["latitude"], c["longitude"] = array("f", (c["latitude"], c["longitude"])).tolist()
+    rows.sort(key=lambda c: (gazetteer.grid_cell(c["latitude"], c["longitude"]), -int(c.get("population", 0))))
+    countries = sorted({c["countrycode"] for c in rows})
+    timezones = sorted({c["timezone"] for c in rows})
+    if len(countries) > 255 or len(timezones) > 255:
+        raise ValueError("Too many countries or timezones for one-byte indexes")
+    c_index = {c: i for i, c in enumerate(countries)}
+    tz_index = {t: i for i, t in enumerate(timezones)}
+
+    lat = array("f", (c["latitude"] for c in rows))
+    lon = array("f", (c["longitude"] for c in rows))
+    country = array("B", (c_index[c["countrycode"]] for c in rows))
+    tz = array("B", (tz_index[c["timezone"]] for c in rows))
+    names = bytearray()
+    offsets = array("I", [0])
+    for c in rows:
+        names.extend(c["name"].encode("utf-8"))
+        offsets.append(len(names))
+    order_flag = 1 if len(rows) >= 65536 else 0
+    order = array("I" if order_flag else "H", sorted(
+        range(len(rows)),
+        key=lambda i: (
+            gazetteer.normalize_name(rows[i]["name"]),
+            -rows[i].get("rank", 0),
+            -int(rows[i].get("population", 0)),
+        )
+    ))
+    meta = json.dumps({"countries": countries, "timezones": timezones}, separators=(",", ":")).encode("utf-8")
+
+    parts = [lat, lon, country, tz, offsets, order]
+    if sys.byteorder != "little":
+        for part in parts:
+            part.byteswap()
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    with open(out_path, "wb") as f:
+        f.write(gazetteer.HEADER.pack(gazetteer.MAGIC, gazetteer.VERSION, order_flag, len(rows), len(names), len(meta)))
+        f.write(meta)
+        for part in parts:
+            f.write(part.tobytes())
+        f.write(bytes(names))
+    return len(rows)
+
+
+def main(argv):
+    if len(argv) < 2:
+        print("usage: build_gazetteer.py cities15000.json [cities1000.json]")
+        return 2
+    rows = load_rows(argv[1], argv[2] if len(argv) > 2 else None)
+    count = build(rows, gazetteer.DATA_FILE)
+    print(f"Wrote {count} places to {os.path.normpath(gazetteer.DATA_FILE)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,264 @@
+# Builds the centroids CSV consumed by tools/build_regions.py.
+# Usage: python tools/build_region_centroids.py <csv dir> geo-boundaries.csv
+#        data.db cities500.json [centroids.csv]
+# geo-boundaries.csv and data.db are the geoBoundaries ADM2 centroids and
+# WKB outlines shipped by the python-gazetteer package (CC BY 4.0);
+# cities500.json is the GeoNames dump shipped by geonamescache (CC BY 4.0).
+# Regencies take the most populous GeoNames place inside their outline (the
+# seat in practice) and fall back to the geoBoundaries centroid. Districts and
+# villages take the GeoNames place of the same name inside their regency; a
+# district without one takes the mean of its matched villages. Anything left
+# unmatched is omitted and resolves through its parent at runtime.
+import collections
+import csv
+import json
+import os
+import sqlite3
+import struct
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PACKAGE = os.path.join(HERE, os.pardir, "globalPlugins", "muslimku")
+sys.path.insert(0, PACKAGE)
+
+import regions  # noqa: E402
+from build_regions import LEVEL_FILES  # noqa: E402
+
+COUNTRY = "Indonesia"
+COUNTRY_CODE = "ID"
+# Regencies missing from geoBoundaries, placed at their seat's GeoNames entry.
+SEAT_OVERRIDES = {
+    "8108": "Tiakur",  # Maluku Barat Daya
+}
+# Places this close (degrees) to an override seat stand in for its outline.
+OVERRIDE_RADIUS = 2.0
+
+
+def name_key(name):
+    # "KABUPATEN BANYUASIN" and "Banyu Asin" compare equal; cities keep "kota".
+    text = " ".join(str(name).lower().replace(".", " ").split())
+    for prefix in ("kabupaten ", "kab "):
+        if text.startswith(prefix):
+            text = text[len(prefix):]
+    return "".join(c for c in text if c.isalnum())
+
+
+def read_level(path, with_parent=True):
+    rows = []
+    with open(path, encoding="utf-8", newline="") as f:
+        for record in csv.reader(f):
+            if not record or not record[0].strip().isdigit():
+                continue
+            parent = record[1].strip() if with_parent and len(record) > 2 else None
+            rows.append((record[0].strip(), parent, record[-1].strip()))
+    return rows
+
+
+def _rings(blob):
+    # Polygon rings from a WKB Polygon or MultiPolygon, as lists of (lon, lat).
+    rings = []
+
+    def parse(offset):
+        order = "<" if blob[offset] == 1 else ">"
+        kind = struct.unpack_from(order + "I", blob, offset + 1)[0]
+        offset += 5
+        if kind == 6:
+            count = struct.unpack_from(order + "I", blob, offset)[0]
+            offset += 4
+            for _ in range(count):
+                offset = parse(offset)
+            return offset
+        if kind != 3:
+            raise ValueError("Unsupported WKB type {}".format(kind))
+        ring_count = struct.unpack_from(order + "I", blob, offset)[0]
+        offset += 4
+        for _ in range(ring_count):
+            points = struct.unpack_from(order + "I", blob, offset)[0]
+            offset += 4
+            values = struct.unpack_from(order + "{}d".format(points * 2), blob, offset)
+            offset += points * 16
+            rings.append(list(zip(values[0::2], values[1::2])))
+        return offset
+
+    parse(0)
+    return rings
+
+
+class Outline(object):
+
+    def __init__(self, rings):
+        self.rings = rings
+        xs = [x for ring in rings for x, _y in ring]
+        ys = [y for ring in rings for _x, y in ring]
+        self.bbox = (min(xs), min(ys), max(xs), max(ys))
+
+    def contains(self, lon, lat):
+        west, south, east, north = self.bbox
+        if not (west <= lon <= east and south <= lat <= north):
+            return False
+        # Even-odd rule over every ring handles holes and multipolygons.
+        inside = False
+        for ring in self.rings:
+            j = len(ring) - 1
+            for i in range(len(ring)):
+                xi, yi = ring[i]
+                xj, yj = ring[j]
+                if (yi > lat) != (yj > lat) and lon < (xj - xi) * (lat - yi) / (yj - yi) + xi:
+                    inside = not inside
+                j = i
+        return inside
+
+
+def load_boundaries(csv_path, db_path):
+    shapes = {}
+    with open(csv_path, encoding="utf-8", newline="") as f:
+        # name,shape_id,lon,lat,country,province
+        for record in csv.reader(f):
+            if len(record) < 6 or record[4] != COUNTRY:
+                continue
+            shapes[record[1]] = {
+                "name": record[0], "lat": float(record[3]), "lon": float(record[2]),
+            }
+    conn = sqlite3.connect(db_path)
+    try:
+        ids = list(shapes)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            query = "SELECT shape_id, coordinates FROM location_data WHERE shape_id IN ({})".format(
+                ",".join("?" * len(chunk))
+            )
+            for shape_id, blob in conn.execute(query, chunk):
+                shapes[shape_id]["outline"] = Outline(_rings(blob))
+    finally:
+        conn.close()
+    return [s for s in shapes.values() if "outline" in s]
+
+
+def load_places(path):
+    with open(path, encoding="utf-8") as f:
+        cities = json.load(f).values()
+    places = []
+    for c in cities:
+        if c["countrycode"] != COUNTRY_CODE:
+            continue
+        keys = {name_key(c["name"])}
+        keys.update(name_key(n) for n in c.get("alternatenames") or () if n.isascii())
+        keys.discard("")
+        places.append({
+            "name": c["name"], "lat": float(c["latitude"]), "lon": float(c["longitude"]),
+            "population": int(c.get("population") or 0), "keys": keys,
+        })
+    return places
+
+
+def match_regencies(regencies, boundaries):
+    by_key = collections.defaultdict(list)
+    for shape in boundaries:
+        by_key[name_key(shape["name"])].append(shape)
+    matched = {}
+    for code, _parent, name in regencies:
+        candidates = by_key.get(name_key(name))
+        if candidates and len(candidates) == 1:
+            matched[code] = candidates[0]
+    return matched
+
+
+def build(csv_dir, boundaries_csv, boundaries_db, places_path):
+    levels = [
+        read_level(os.path.join(csv_dir, LEVEL_FILES[0]), with_parent=False),
+    ] + [read_level(os.path.join(csv_dir, name)) for name in LEVEL_FILES[1:]]
+    provinces, regencies, districts, villages = levels
+    boundaries = load_boundaries(boundaries_csv, boundaries_db)
+    places = load_places(places_path)
+    shapes = match_regencies(regencies, boundaries)
+
+    centroids = {}
+    inside = collections.defaultdict(list)
+    for code, shape in shapes.items():
+        outline = shape["outline"]
+        within = [p for p in places if outline.contains(p["lon"], p["lat"])]
+        inside[code] = within
+        seat = max(within, key=lambda p: p["population"], default=None)
+        if seat is not None and seat["population"] > 0:
+            centroids[code] = (seat["lat"], seat["lon"])
+        else:
+            centroids[code] = (shape["lat"], shape["lon"])
+    for code, seat_name in SEAT_OVERRIDES.items():
+        seat = next((p for p in places if p["name"] == seat_name), None)
+        if code in shapes or seat is None:
+            continue
+        centroids[code] = (seat["lat"], seat["lon"])
+        inside[code] = [
+            p for p in places
+            if abs(p["lat"] - seat["lat"]) <= OVERRIDE_RADIUS and abs(p["lon"] - seat["lon"]) <= OVERRIDE_RADIUS
+        ]
+
+    def unique_match(regency, name):
+        hits = [p for p in inside.get(regency, ()) if name_key(name) in p["keys"]]
+        if len(hits) == 1:
+            return hits[0]["lat"], hits[0]["lon"]
+        return None
+
+    district_regency = {code: parent for code, parent, _name in districts}
+    village_points = collections.defaultdict(list)
+    names_in_regency = collections.Counter(
+        (district_regency.get(parent), name_key(name)) for _code, parent, name in villages
+    )
+    for code, parent, name in villages:
+        regency = district_regency.get(parent)
+        if names_in_regency[(regency, name_key(name))] != 1:
+            continue
+        point = unique_match(regency, name)
+        if point:
+            centroids[code] = point
+            village_points[parent].append(point)
+    for code, parent, name in districts:
+        point = unique_match(parent, name)
+        if point is None and village_points.get(code):
+            points = village_points[code]
+            point = (
+                sum(p[0] for p in points) / len(points),
+                sum(p[1] for p in points) / len(points),
+            )
+        if point:
+            centroids[code] = point
+
+    # Provinces: mean of their regency coordinates.
+    by_province = collections.defaultdict(list)
+    for code, parent, _name in regencies:
+        if code in centroids:
+            by_province[parent].append(centroids[code])
+    for code, _parent, _name in provinces:
+        points = by_province.get(code)
+        if points:
+            centroids[code] = (
+                sum(p[0] for p in points) / len(points),
+                sum(p[1] for p in points) / len(points),
+            )
+    unmatched = [name for code, _parent, name in regencies if code not in centroids]
+    return centroids, [len(level) for level in levels], unmatched
+
+
+def main(argv):
+    if len(argv) < 5:
+        print("usage: build_region_centroids.py <csv dir> geo-boundaries.csv data.db cities500.json [centroids.csv]")
+        return 2
+    out_path = argv[5] if len(argv) > 5 else os.path.join(argv[1], "centroids.csv")
+    centroids, counts, unmatched = build(argv[1], argv[2], argv[3], argv[4])
+    with open(out_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        for code in sorted(centroids, key=lambda c: (len(c), int(c))):
+            lat, lon = centroids[code]
+            writer.writerow((code, "{:.5f}".format(lat), "{:.5f}".format(lon)))
+    for level, total in enumerate(counts):
+        digits = regions.LEVEL_DIGITS[level]
+        found = sum(1 for code in centroids if len(code) == digits)
+        print("Level {}: {} of {} regions placed".format(level, found, total))
+    for name in unmatched:
+        print("No outline for " + name)
+    print("Wrote " + os.path.normpath(out_path))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,91 @@
+# Builds globalPlugins/muslimku/data/regions.bin from the emsifa
+# api-wilayah-indonesia CSV exports (provinces.csv, regencies.csv,
+# districts.csv, villages.csv in one directory).
+# Usage: python tools/build_regions.py <csv dir> [centroids.csv]
+# centroids.csv is optional with rows "code,lat,lon"; regions without a
+# centroid are stored as NaN and resolved through their parent at runtime.
+import csv
+import os
+import sys
+from array import array
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PACKAGE = os.path.join(HERE, os.pardir, "globalPlugins", "muslimku")
+sys.path.insert(0, PACKAGE)
+
+import regions  # noqa: E402
+
+LEVEL_FILES = ("provinces.csv", "regencies.csv", "districts.csv", "villages.csv")
+
+
+def read_level(path):
+    rows = []
+    with open(path, encoding="utf-8", newline="") as f:
+        for record in csv.reader(f):
+            if not record or not record[0].strip().isdigit():
+                continue
+            # provinces: id,name; others: id,parent_id,name
+            rows.append((record[0].strip(), record[-1].strip()))
+    rows.sort(key=lambda r: int(r[0]))
+    return rows
+
+
+def read_centroids(path):
+    centroids = {}
+    if not path:
+        return centroids
+    with open(path, encoding="utf-8", newline="") as f:
+        for record in csv.reader(f):
+            try:
+                centroids[record[0].strip()] = (float(record[1]), float(record[2]))
+            except (IndexError, ValueError):
+                continue
+    return centroids
+
+
+def build(csv_dir, centroids_path=None):
+    centroids = read_centroids(centroids_path)
+    levels = [read_level(os.path.join(csv_dir, name)) for name in LEVEL_FILES]
+    codes = array("Q")
+    lat = array("f")
+    lon = array("f")
+    offsets = array("I", [0])
+    names = bytearray()
+    nan = float("nan")
+    for level in levels:
+        for code, name in level:
+            codes.append(int(code))
+            point = centroids.get(code, (nan, nan))
+            lat.append(point[0])
+            lon.append(point[1])
+            names.extend(name.encode("utf-8"))
+            offsets.append(len(names))
+    parts = [codes, lat, lon, offsets]
+    if sys.byteorder != "little":
+        for part in parts:
+            part.byteswap()
+    os.makedirs(os.path.dirname(regions.DATA_FILE), exist_ok=True)
+    with open(regions.DATA_FILE, "wb") as f:
+        f.write(regions.HEADER.pack(
+            regions.MAGIC, regions.VERSION, 0, len(codes),
+            *[len(level) for level in levels], len(names)
+        ))
+        for part in parts:
+            f.write(part.tobytes())
+        f.write(bytes(names))
+    return [len(level) for level in levels]
+
+
+def main(argv):
+    if len(argv) < 2:
+        print("usage: build_regions.py <csv dir> [centroids.csv]")
+        return 2
+    counts = build(argv[1], argv[2] if len(argv) > 2 else None)
+    print("Wrote {} provinces, {} regencies, {} districts, {} villages to {}".format(
+        *counts, os.path.normpath(regions.DATA_FILE)
+    ))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
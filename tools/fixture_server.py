@@ -0,0 +1,301 @@
+# Local stand-in for the web services the add-on calls (Aladhan, Nominatim and
+# the Emsifa Indonesian region API), for offline latency and resilience runs.
+#
+# Usage:
+#   python tools/fixture_server.py [--port 8765] [--latency-ms 80] [--jitter-ms 40]
+#       [--error-rate 0.05] [--timeout-rate 0.02] [--hang-seconds 30]
+#       [--rate-limit 5] [--seed 1] [--record] [--no-synthesize]
+# then start NVDA (or tools/benchmark.py) with
+#   MUSLIMKU_API_BASE=http://127.0.0.1:8765
+# so every service is served from /aladhan/..., /nominatim/... and /emsifa/...
+#
+# Responses are replayed from tools/fixtures/<service>/<path>.json. A fixture
+# recorded for one query string is stored as <path>@<query hash>.json and wins
+# over the path-only file. Misses are recorded from the real service with
+# --record; otherwise Aladhan and Nominatim misses are synthesized from the
+# add-on's offline engine and gazetteer so the server works with no network.
+import argparse
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PACKAGE = os.path.join(HERE, os.pardir, "globalPlugins", "muslimku")
+FIXTURES = os.path.join(HERE, "fixtures")
+UPSTREAMS = {
+    "aladhan": "https://api.aladhan.com",
+    "nominatim": "https://nominatim.openstreetmap.org",
+    "emsifa": "https://www.emsifa.com/api-wilayah-indonesia",
+}
+USER_AGENT = "muslimku-nvda-addon/1.0 (fixture recorder)"
+
+
+def fixture_paths(service, path, query):
+    base = os.path.join(FIXTURES, service, *[p for p in path.split("/") if p])
+    if base.endswith(".json"):
+        base = base[:-5]
+    paths = []
+    if query:
+        digest = hashlib.sha1(query.encode("utf-8")).hexdigest()[:10]
+        paths.append(f"{base}@{digest}.json")
+    paths.append(base + ".json")
+    return paths
+
+
+class Synthesizer(object):
+    # Builds Aladhan/Nominatim shaped answers from the add-on's own modules.
+
+    def __init__(self):
+        sys.path.insert(0, PACKAGE)
+        import gazetteer
+        import hijricalendar
+        import prayertimes
+        import timezones
+        self.gazetteer = gazetteer.get_gazetteer()
+        self.hijricalendar = hijricalendar
+        self.prayertimes = prayertimes
+        self.timezones = timezones
+
+    def _place(self, city, country):
+        place = self.gazetteer.find(city, country or None)
+        return place or self.gazetteer.find(city)
+
+    def _day(self, place, date, method, school):
+        zone = self.timezones.get_zone(place.timezone)
+        hijri = self.hijricalendar.to_aladhan_dict(date)
+        payload = self.prayertimes.build_day_payload(
+            date, place.lat, place.lon, zone, tz_name=place.timezone,
+            method_id=method, school=school, ramadan=hijri["month"]["number"] == 9
+        )
+        payload["date"]["hijri"] = hijri
+        payload["meta"].pop("source", None)
+        return payload
+
+    def aladhan(self, path, params):
+        place = self._place(params.get("city", ""), params.get("country", ""))
+        if place is None:
+            return 400, {"code": 400, "status": "BAD_REQUEST", "data": "Unable to find city."}
+        method = int(params.get("method", 3) or 3)
+        school = int(params.get("school", 0) or 0)
+        parts = [p for p in path.split("/") if p]
+        if len(parts) >= 4 and parts[1] == "calendarByCity":
+            year, month = int(parts[2]), int(parts[3])
+            days = []
+            date = datetime.date(year, month, 1)
+            while date.month == month:
+                days.append(self._day(place, date, method, school))
+                date += datetime.timedelta(days=1)
+            return 200, {"code": 200, "status": "OK", "data": days}
+        if len(parts) >= 2 and parts[1] == "timingsByCity":
+            date = datetime.date.today()
+            if len(parts) >= 3:
+                date = datetime.datetime.strptime(parts[2], "%d-%m-%Y").date()
+            return 200, {"code": 200, "status": "OK", "data": self._day(place, date, method, school)}
+        return 404, {"code": 404, "status": "NOT_FOUND", "data": "Unknown endpoint."}
+
+    def nominatim(self, path, params):
+        query = [p.strip() for p in params.get("q", "").split(",") if p.strip()]
+        country = query[-1] if len(query) > 1 else None
+        for name in query:
+            place = self._place(name, country)
+            if place:
+                return 200, [{
+                    "lat": f"{place.lat:.7f}", "lon": f"{place.lon:.7f}",
+                    "display_name": ", ".join(query), "name": place.name,
+                }]
+        return 200, []
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, options):
+        super().__init__(address, FixtureHandler)
+        self.options = options
+        self.rng = random.Random(options.seed)
+        self.rng_lock = threading.Lock()
+        self.rate_lock = threading.Lock()
+        self.window = {}
+        self.synthesizer = None
+        if options.synthesize:
+            try:
+                self.synthesizer = Synthesizer()
+            except Exception as e:
+                print(f"Synthesis unavailable: {e}", file=sys.stderr)
+        self.stats = {"requests": 0, "replayed": 0, "recorded": 0, "synthesized": 0,
+                      "errors": 0, "timeouts": 0, "rate_limited": 0, "not_found": 0, "not_modified": 0}
+
+    def random(self):
+        with self.rng_lock:
+            return self.rng.random()
+
+    def count(self, name):
+        with self.rate_lock:
+            self.stats[name] += 1
+
+    def over_rate(self, service):
+        limit = self.options.rate_limit
+        if not limit:
+            return False
+        now = int(time.monotonic())
+        with self.rate_lock:
+            second, count = self.window.get(service, (now, 0))
+            if second != now:
+                second, count = now, 0
+            count += 1
+            self.window[service] = (second, count)
+            return count > limit
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "MuslimkuFixtures/1.0"
+    # Headers and body are written separately; without this Nagle adds ~40 ms.
+    disable_nagle_algorithm = True
+
+    def log_message(self, fmt, *args):
+        if not self.server.options.quiet:
+            super().log_message(fmt, *args)
+
+    def do_GET(self):
+        server = self.server
+        options = server.options
+        server.count("requests")
+        parsed = urllib.parse.urlsplit(self.path)
+        if parsed.path == "/__stats__":
+            return self._send(200, server.stats)
+        parts = parsed.path.lstrip("/").split("/", 1)
+        service = parts[0]
+        path = "/" + (parts[1] if len(parts) > 1 else "")
+        if service not in UPSTREAMS:
+            server.count("not_found")
+            return self._send(404, {"error": f"unknown service {service}"})
+
+        delay = max(0.0, options.latency_ms + (server.random() * 2 - 1) * options.jitter_ms) / 1000.0
+        if delay:
+            time.sleep(delay)
+        if server.over_rate(service):
+            server.count("rate_limited")
+            return self._send(429, {"error": "rate limited"}, {"Retry-After": "1"})
+        if options.timeout_rate and server.random() < options.timeout_rate:
+            server.count("timeouts")
+            time.sleep(options.hang_seconds)
+            self.close_connection = True
+            return
+        if options.error_rate and server.random() < options.error_rate:
+            server.count("errors")
+            return self._send(503, {"error": "injected failure"})
+
+        status, body = self._resolve(service, path, parsed.query)
+        if status is None:
+            server.count("not_found")
+            return self._send(404, {"error": "no fixture", "path": self.path})
+        raw = json.dumps(body, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        etag = '"%s"' % hashlib.sha1(raw).hexdigest()[:16]
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            server.count("not_modified")
+            return self._send_raw(304, b"", {"ETag": etag})
+        return self._send_raw(status, raw, {"ETag": etag, "Content-Type": "application/json; charset=utf-8"})
+
+    def _resolve(self, service, path, query):
+        server = self.server
+        for candidate in fixture_paths(service, path, query):
+            if os.path.isfile(candidate):
+                with open(candidate, encoding="utf-8") as f:
+                    server.count("replayed")
+                    return 200, json.load(f)
+        if server.options.record:
+            status, body = self._record(service, path, query)
+            if status is not None:
+                return status, body
+        synthesizer = server.synthesizer
+        if synthesizer is not None and service in ("aladhan", "nominatim"):
+            params = dict(urllib.parse.parse_qsl(query))
+            server.count("synthesized")
+            return getattr(synthesizer, service)(path, params)
+        return None, None
+
+    def _record(self, service, path, query):
+        url = UPSTREAMS[service] + path + (f"?{query}" if query else "")
+        request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+        try:
+            with urllib.request.urlopen(request, timeout=20) as response:
+                body = json.loads(response.read().decode("utf-8"))
+        except Exception as e:
+            print(f"Record failed for {url}: {e}", file=sys.stderr)
+            return None, None
+        target = fixture_paths(service, path, query)[0]
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "w", encoding="utf-8") as f:
+            json.dump(body, f, ensure_ascii=False, indent=1)
+        self.server.count("recorded")
+        return 200, body
+
+    def _send(self, status, body, headers=None):
+        raw = json.dumps(body, separators=(",", ":")).encode("utf-8")
+        self._send_raw(status, raw, dict(headers or {}, **{"Content-Type": "application/json"}))
+
+    def _send_raw(self, status, raw, headers):
+        if raw and "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            raw = gzip.compress(raw)
+            headers = dict(headers, **{"Content-Encoding": "gzip"})
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        if raw:
+            self.wfile.write(raw)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Muslimku fixture server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="share of requests that hang")
+    parser.add_argument("--hang-seconds", type=float, default=30.0)
+    parser.add_argument("--rate-limit", type=int, default=0, help="requests per second per service before 429")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--record", action="store_true", help="fetch and save missing fixtures upstream")
+    parser.add_argument("--no-synthesize", dest="synthesize", action="store_false")
+    parser.add_argument("--quiet", action="store_true")
+    return parser.parse_args(argv)
+
+
+def start(argv=(), port=None):
+    # Starts a server on a background thread; returns (server, base_url).
+    options = parse_args(list(argv))
+    if port is not None:
+        options.port = port
+    server = FixtureServer((options.host, options.port), options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, bound_port = server.server_address[:2]
+    return server, f"http://{host}:{bound_port}"
+
+
+def main(argv):
+    options = parse_args(argv[1:])
+    server = FixtureServer((options.host, options.port), options)
+    print(f"Serving fixtures on http://{options.host}:{server.server_address[1]} "
+          f"(set MUSLIMKU_API_BASE to this URL)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,135 @@
+# Import-time budget for the add-on, measured with python -X importtime.
+# Usage: python tools/import_budget.py [--budget-ms 25] [--runs 5] [--top 15]
+# Loads the plugin package under the stub NVDA runtime in a fresh interpreter
+# per run, after pre-importing the standard modules NVDA itself has already
+# loaded, so only what loading Muslimku adds is counted. The package is
+# byte-compiled first, as it is in an installed add-on. Fails (exit code 1) when the median cumulative
+# import time exceeds the budget or when a module that must stay lazy is
+# imported at load time.
+import argparse
+import compileall
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PLUGINS = os.path.join(HERE, os.pardir, "globalPlugins")
+PACKAGE = "muslimku"
+# Loaded by NVDA before any global plugin.
+NVDA_PRELOADED = (
+    "collections", "concurrent.futures", "ctypes", "datetime", "hashlib", "json",
+    "logging", "math", "re", "struct", "threading", "urllib.parse", "zlib",
+)
+# Must only be imported on first use.
+LAZY_MODULES = ("requests", "urllib3", "zoneinfo", "sqlite3")
+DEFAULT_BUDGET_MS = 25.0
+
+LOADER = """
+import sys, tempfile
+sys.path[:0] = [{tools!r}, {plugins!r}]
+import nvda_stubs
+nvda_stubs.install(tempfile.mkdtemp(prefix="muslimku-import-"))
+for name in {preloaded!r}:
+    __import__(name)
+import {package}
+print("LOADED", ",".join(m for m in {lazy!r} if m in sys.modules))
+"""
+
+
+def parse_importtime(stderr, package):
+    # Returns (cumulative_us, [(self_us, name)]) for the package's import tree.
+    # -X importtime prints children before their parent, indented two spaces
+    # per level.
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            entries.append((int(self_us), int(cumulative_us), name))
+        except ValueError:
+            continue
+    for i, (self_us, cumulative_us, name) in enumerate(entries):
+        if name.strip() == package and not name.startswith("  "):
+            subtree = []
+            j = i - 1
+            while j >= 0 and entries[j][2].startswith("  "):
+                subtree.append((entries[j][0], entries[j][2].strip()))
+                j -= 1
+            subtree.append((self_us, package))
+            return cumulative_us, subtree
+    return None, []
+
+
+def measure_once():
+    code = LOADER.format(
+        tools=HERE, plugins=PLUGINS, preloaded=NVDA_PRELOADED, package=PACKAGE, lazy=LAZY_MODULES
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+    loaded = ""
+    for line in proc.stdout.splitlines():
+        if line.startswith("LOADED"):
+            loaded = line[len("LOADED"):].strip()
+    cumulative_us, subtree = parse_importtime(proc.stderr, PACKAGE)
+    return cumulative_us, subtree, [m for m in loaded.split(",") if m]
+
+
+def measure(runs):
+    # Byte-compiles the package and loads it runs times. Returns (totals in
+    # ms, {module: [self ms]}, lazy modules that were imported), or None
+    # when the package is missing from the trace.
+    compileall.compile_dir(os.path.join(PLUGINS, PACKAGE), quiet=1)
+    totals = []
+    by_module = {}
+    eager = set()
+    for _ in range(max(1, runs)):
+        cumulative_us, subtree, loaded = measure_once()
+        if cumulative_us is None:
+            return None
+        totals.append(cumulative_us / 1000.0)
+        for self_us, name in subtree:
+            by_module.setdefault(name, []).append(self_us / 1000.0)
+        eager.update(loaded)
+    return totals, by_module, eager
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Muslimku import-time budget")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    options = parser.parse_args(argv[1:])
+
+    result = measure(options.runs)
+    if result is None:
+        print(f"{PACKAGE} did not appear in the import trace.")
+        return 1
+    totals, by_module, eager = result
+    median_ms = statistics.median(totals)
+    print(f"{PACKAGE} import: median {median_ms:.1f} ms over {len(totals)} runs "
+          f"(min {min(totals):.1f}, max {max(totals):.1f}), budget {options.budget_ms:.1f} ms")
+    print("Slowest modules (median self time):")
+    ranked = sorted(((statistics.median(v), k) for k, v in by_module.items()), reverse=True)
+    for ms, name in ranked[:options.top]:
+        print(f"  {ms:8.2f} ms  {name}")
+
+    status = 0
+    if eager:
+        print("FAIL: imported at load time but must be lazy: " + ", ".join(sorted(eager)))
+        status = 1
+    if median_ms > options.budget_ms:
+        print(f"FAIL: import time {median_ms:.1f} ms exceeds the {options.budget_ms:.1f} ms budget")
+        status = 1
+    if status == 0:
+        print("OK")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,229 @@
+# Minimal stand-ins for the NVDA runtime modules the add-on imports, so the
+# plugin can be loaded and driven headless (Linux CI, benchmarks).
+# install() must run before the plugin package is imported. Speech is
+# recorded instead of spoken, and wx.CallAfter queues work for a fake main
+# thread that the caller drains with pump().
+import ast
+import os
+import queue
+import re
+import sys
+import tempfile
+import threading
+import time
+import types
+
+spoken = []
+_spoken_cond = threading.Condition()
+_main_queue = queue.Queue()
+_main_thread = threading.main_thread()
+
+
+def _module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def _spec_default(spec):
+    # "integer(default=0, min=-3, max=3)" -> 0
+    match = re.search(r"default=('[^']*'|\"[^\"]*\"|[^,)]*)", spec or "")
+    if not match:
+        return None
+    value = match.group(1).strip()
+    if value in ("True", "False"):
+        return value == "True"
+    try:
+        return ast.literal_eval(value)
+    except Exception:
+        return value
+
+
+class _Section(dict):
+
+    def __init__(self, spec):
+        super().__init__()
+        self._spec = spec
+
+    def __missing__(self, key):
+        if key in self._spec:
+            return _spec_default(self._spec[key])
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+class _Config(dict):
+
+    def __init__(self):
+        super().__init__()
+        self.spec = {}
+
+    def __missing__(self, key):
+        if key not in self.spec:
+            raise KeyError(key)
+        section = _Section(self.spec[key])
+        self[key] = section
+        return section
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+class _Action(object):
+
+    def __init__(self):
+        self._handlers = []
+
+    def register(self, handler):
+        if handler not in self._handlers:
+            self._handlers.append(handler)
+
+    def unregister(self, handler):
+        try:
+            self._handlers.remove(handler)
+        except ValueError:
+            pass
+
+    def notify(self, **kwargs):
+        for handler in list(self._handlers):
+            handler(**kwargs)
+
+
+class _Log(object):
+
+    def __init__(self):
+        self.records = []
+
+    def _record(self, level, msg, *args, **kwargs):
+        self.records.append((level, str(msg)))
+
+    def debug(self, msg, *args, **kwargs):
+        self._record("debug", msg)
+
+    def debugWarning(self, msg, *args, **kwargs):
+        self._record("debugWarning", msg)
+
+    def info(self, msg, *args, **kwargs):
+        self._record("info", msg)
+
+    def warning(self, msg, *args, **kwargs):
+        self._record("warning", msg)
+
+    def error(self, msg, *args, **kwargs):
+        self._record("error", msg)
+
+    def exception(self, msg="", *args, **kwargs):
+        self._record("exception", msg)
+
+
+class _Anything(object):
+    # Accepts any construction, attribute access or call (wx widgets, toasts).
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return _Anything()
+
+    def __call__(self, *args, **kwargs):
+        return _Anything()
+
+
+class _GlobalPlugin(object):
+
+    def __init__(self):
+        pass
+
+    def terminate(self):
+        pass
+
+
+def _script(**kwargs):
+    def decorate(fn):
+        fn.__doc__ = kwargs.get("description")
+        fn.gestures = [kwargs["gesture"]] if kwargs.get("gesture") else []
+        return fn
+    return decorate
+
+
+def _message(text, *args, **kwargs):
+    with _spoken_cond:
+        spoken.append((time.perf_counter(), str(text)))
+        _spoken_cond.notify_all()
+
+
+def _call_after(fn, *args, **kwargs):
+    _main_queue.put((fn, args, kwargs))
+
+
+def _is_main_thread():
+    return threading.current_thread() is _main_thread
+
+
+def pump(timeout=0.0):
+    # Runs queued wx.CallAfter work on the calling (main) thread. Waits up to
+    # timeout for the first item; returns how many items ran.
+    ran = 0
+    block = timeout > 0
+    while True:
+        try:
+            fn, args, kwargs = _main_queue.get(block, timeout if block else None)
+        except queue.Empty:
+            return ran
+        block = False
+        fn(*args, **kwargs)
+        ran += 1
+
+
+def wait_for_speech(count, timeout=15.0):
+    # Pumps the main queue until len(spoken) > count; returns the new entry or None.
+    deadline = time.perf_counter() + timeout
+    while True:
+        with _spoken_cond:
+            if len(spoken) > count:
+                return spoken[count]
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return None
+        pump(min(remaining, 0.005))
+
+
+def install(config_path=None):
+    # Registers the stub modules and returns the config object.
+    if "globalPluginHandler" in sys.modules and getattr(sys.modules["globalPluginHandler"], "_stub", False):
+        return sys.modules["config"].conf
+    config_path = config_path or tempfile.mkdtemp(prefix="muslimku-nvda-")
+    os.makedirs(config_path, exist_ok=True)
+    conf = _Config()
+    _module("globalPluginHandler", GlobalPlugin=_GlobalPlugin, _stub=True)
+    _module("scriptHandler", script=_script)
+    _module("ui", message=_message, browseableMessage=_message)
+    _module("config", conf=conf, post_configProfileSwitch=_Action())
+    _module("extensionPoints", Action=_Action)
+    _module("core", postNvdaStartup=_Action())
+    _module("globalVars", appArgs=types.SimpleNamespace(configPath=config_path))
+    _module("addonHandler", initTranslation=lambda: None)
+    _module("logHandler", log=_Log())
+    _module("tones", beep=lambda *args, **kwargs: None)
+    settings = _module(
+        "gui.settingsDialogs",
+        SettingsPanel=type("SettingsPanel", (object,), {}),
+        NVDASettingsDialog=type("NVDASettingsDialog", (object,), {"categoryClasses": []}),
+    )
+    gui = _module("gui", settingsDialogs=settings, guiHelper=_Anything(), notification=lambda *a, **k: None)
+    gui.mainFrame = _Anything()
+    adv = _module("wx.adv", NotificationMessage=_Anything)
+    _module(
+        "wx", adv=adv, CallAfter=_call_after, IsMainThread=_is_main_thread, Bell=lambda: None,
+        ICON_INFORMATION=0, TheClipboard=_Anything(), TextDataObject=_Anything, Clipboard=_Anything(),
+    )
+    return conf